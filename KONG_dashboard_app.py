@@ -1,27 +1,38 @@
 # kong_dashboard_app.py
 
-import requests
+import numpy as np
 import pandas as pd
 import streamlit as st
 import plotly.express as px
-from pathlib import Path
+import plotly.graph_objects as go
+import time
+from functools import partial
+
+from kong import compute_metrics, tier_breakdown
+from kong.concentration import concentration_metrics, lorenz_curve
+from kong.history import TIME_COLUMN, HistoryStore
+from kong.histogram import histogram
+from kong.index import StakeIndex
+from kong.movers import movers_counts, movers_dates, read_movers
+from kong.quantiles import RANK_ERROR, read_sketch, sketch_dates, stake_sketch
+from kong.derived import DerivedHistory, time_moving_averages
+from kong.distinct import KINDS, distinct_dates, union, wallet_sketches
+from kong.downsample import downsample_rows
+from kong.exports import MIME_TYPES, ExportCache, frame_chunks
+from kong.http import ConditionalFetcher, fetch_concurrently
+from kong.ingest import read_leaderboard_body
+from kong.refresh import BackgroundRefresher
+from kong.rolling import STAT_LABELS, STATS, WINDOWS, rolling_stats
+from kong.rollups import Rollups
+from kong.transitions import STATE_LABELS, TransitionHistory
+from kong.table import WalletTable
+from kong.wallets import WalletDictionary
 
 # ========= Secrets =========
 API_URL = st.secrets["KONG_API_URL"]
 SUMMARY_URL = st.secrets["KONG_SUMMARY_URL"]
 
 # ========= Helpers =========
-def classify_tier(x: float) -> int:
-    if x < 25_000:
-        return 0
-    if x < 62_500:
-        return 1
-    if x < 125_000:
-        return 2
-    if x < 250_000:
-        return 3
-    return 4
-
 def format_kong(x):
     """Short number formatting: 1k, 1.2M. Used everywhere EXCEPT 'Wallets staking' KPI."""
     try:
@@ -34,57 +45,180 @@ def format_kong(x):
         return f"{x/1_000:.0f}k"
     return str(int(round(x)))
 
-@st.cache_data(ttl=120)
-def fetch_leaderboard(url: str) -> pd.DataFrame:
-    r = requests.get(url, timeout=30)
-    r.raise_for_status()
-    data = r.json().get("leaderboard", [])
-    df = pd.DataFrame(data)
-    if df.empty:
-        return df
-    df["stakedAmount"] = pd.to_numeric(df["stakedAmount"], errors="coerce").fillna(0.0)
-    df["tier"] = df["stakedAmount"].apply(classify_tier)
-    return df
-
-@st.cache_data(ttl=120)
-def fetch_summary(url: str) -> dict:
-    r = requests.get(url, timeout=30)
-    r.raise_for_status()
-    return r.json()
+@st.cache_resource
+def get_fetcher() -> ConditionalFetcher:
+    # shared by every session: pooled keep-alive connections, last bodies on disk
+    # and their parsed values in memory
+    return ConditionalFetcher(".cache/http")
+
+@st.cache_resource
+def get_wallet_ids() -> WalletDictionary:
+    # address <-> int32 ID, persisted so IDs stay stable across restarts
+    return WalletDictionary(".cache/wallet_ids.bin")
+
+@st.cache_resource
+def get_exports() -> ExportCache:
+    # download files, built on first click and shared by every session until the data changes
+    return ExportCache(".cache/exports")
+
+def with_addresses(frame: pd.DataFrame) -> pd.DataFrame:
+    # `user` holds int32 wallet IDs; decode only the rows that are actually shown
+    return frame.assign(user=get_wallet_ids().decode(frame["user"].to_numpy()))
+
+def fetch_data(api_url: str, summary_url: str, fetcher: ConditionalFetcher, wallet_ids: WalletDictionary,
+               previous: dict | None = None) -> dict:
+    # both endpoints at once; the leaderboard is streamed straight into columns
+    # (wallets interned to int32 IDs) and a 304 reuses the frame parsed last time.
+    # Per-fetch work (metrics) happens here too. When both answers are the objects
+    # of the `previous` load (all 304s), `previous` is returned as is, so the data
+    # version (exports, histogram caches) only moves when upstream data changed.
+    # Runs on the refresher's thread: the shared fetcher / wallet IDs are passed
+    # in from the script thread rather than looked up through st.cache_resource
+    values, timings = fetch_concurrently(fetcher.fetch, {
+        "leaderboard": (api_url, partial(read_leaderboard_body, dictionary=wallet_ids)),
+        "summary": (summary_url, None),
+    })
+    wallet_ids.save()
+    if previous is not None and all(values[name] is previous[name] for name in values):
+        return previous
+    leaderboard = values["leaderboard"]
+    index = StakeIndex.from_frame(leaderboard)
+    addresses = wallet_ids.addresses[leaderboard["user"].to_numpy()]
+    return {
+        **values,
+        "metrics": compute_metrics(leaderboard),
+        "index": index,  # sorted active stakes
+        "concentration": concentration_metrics(index.stakes, index.cumsum),
+        "lorenz": lorenz_curve(index.stakes, index.cumsum),
+        "sketch": stake_sketch(index.stakes),  # any percentile is a binary search in ~3k items
+        "distinct": wallet_sketches(addresses, leaderboard["stakedAmount"].to_numpy()),  # HLL, merged with stored days
+        "table": WalletTable.from_frame(leaderboard, addresses),
+        "timings": timings,
+    }
+
+@st.cache_resource
+def get_refresher() -> BackgroundRefresher:
+    # one per process: viewers always get the last good data without waiting on
+    # upstream; after 120s the next viewer triggers a single background reload
+    return BackgroundRefresher(partial(fetch_data, API_URL, SUMMARY_URL, get_fetcher(), get_wallet_ids()), ttl=120)
 
 def show_plotly(fig, height: int | None = None):
     if height is not None:
         fig.update_layout(height=height)   # set height on the figure itself
     st.plotly_chart(
         fig,
-        use_container_width=True,
+        width="stretch",
         config={
             "displayModeBar": False,
             "responsive": True,
         },
     )
 
+@st.cache_data(max_entries=512)
+def segment_histogram(_index: StakeIndex, data_version: int, i: int, j: int, nbins: int):
+    # binned server-side and cached per (data version, cutoff slice, nbins):
+    # only edges + counts are kept and sent, never the raw stakes
+    return histogram(_index.stakes[i:j], nbins)
+
+def histogram_figure(edges, counts, title: str, color: str, bargap: float):
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2, y=counts, marker_color=color,
+        customdata=np.column_stack([edges[:-1], edges[1:]]),
+        hovertemplate="%{customdata[0]:,.0f} – %{customdata[1]:,.0f} KONG<br>%{y:,} wallets<extra></extra>",
+    ))
+    fig.update_layout(title=title, xaxis_title="Staked KONG", yaxis_title="Wallets",
+                      xaxis_tickformat="~s", yaxis_tickformat="~s",
+                      bargap=bargap, margin=dict(t=30, l=40, r=20, b=40),
+                      plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)")
+    return fig
+
 # ========= History loader for time series =========
+HISTORY_ROOT = "data/summaries"
+
 @st.cache_data(ttl=60)
-def load_daily_history(path: str = "data/summaries/daily.csv") -> pd.DataFrame:
-    p = Path(path)
-    if not p.exists():
-        return pd.DataFrame()
-    hist = pd.read_csv(p)
-    if hist.empty:
+def load_daily_history(level: str = "day", root: str = HISTORY_ROOT) -> pd.DataFrame:
+    # typed columns straight from disk, one row per bucket in order. Daily rows
+    # come with the DoD / 7dma columns the snapshot job stores next to them (any
+    # days it hasn't covered yet are computed here from the last few rows only);
+    # the hour and week rollups get their 7-day MAs here
+    if level == "day":
+        return DerivedHistory(HistoryStore(f"{root}/daily"), f"{root}/daily_derived").load()
+    return time_moving_averages(Rollups(root).store(level).load())
+
+@st.cache_data(ttl=60)
+def stat_columns(root: str = HISTORY_ROOT) -> list[str]:
+    # every summary column in the daily store, including the ones the snapshot
+    # job added after the original schema (gini, top-N shares, percentiles, ...)
+    return [c for c in HistoryStore(f"{root}/daily").schema if c != TIME_COLUMN]
+
+CHART_POINTS = 1000  # per series; about 2 points per pixel of a half-width chart
+LEVEL_MAX_ROWS = 2 * CHART_POINTS
+
+def history_window(hist: pd.DataFrame, period: str) -> pd.DataFrame:
+    if period == "All":
         return hist
-    hist["snapshot_date"] = pd.to_datetime(hist["snapshot_date"])
-    hist = hist.sort_values("snapshot_date").reset_index(drop=True)
+    start = hist["snapshot_date"].max() - pd.Timedelta(days={"30d": 30, "90d": 90}[period])
+    return hist[hist["snapshot_date"] >= start]
 
-    # derived changes
-    for col in ["total_staked", "tvl_usd", "active_wallets", "percentage_supply", "median_stake", "max_stake"]:
-        hist[f"{col}_dod"] = hist[col].diff()
+@st.cache_data(ttl=60)
+def history_level(period: str) -> str:
+    # finest rollup (hour / day / week) that covers the whole window in at most
+    # LEVEL_MAX_ROWS rows: hourly detail for short windows, weeks for years
+    daily = load_daily_history()
+    if daily.empty:
+        return "day"
+    start = np.datetime64(history_window(daily, period)["snapshot_date"].iloc[0], "s")
+    rollups = Rollups(HISTORY_ROOT)
+    for level in rollups.levels():
+        times = rollups.store(level).column(TIME_COLUMN)
+        if len(times) and times[0] <= start and np.count_nonzero(times >= start) <= LEVEL_MAX_ROWS:
+            return level
+    return "day"
+
+@st.cache_data(ttl=60, max_entries=64)
+def chart_frame(period: str, columns: tuple[str, ...]) -> pd.DataFrame:
+    # rows of the window at the rollup level picked for it, cut down with LTTB to
+    # ~CHART_POINTS per series so the Plotly payload stays small; peaks are kept
+    view = history_window(load_daily_history(history_level(period)), period)
+    view = view.assign(**{c: np.nan for c in columns if c not in view})  # added after this level's store
+    rows = downsample_rows(view, columns, CHART_POINTS, x_column="snapshot_date")
+    return view.iloc[rows][["snapshot_date", *columns]]
+
+@st.cache_data(ttl=60, max_entries=len(WINDOWS))
+def history_stats(window: int) -> dict[str, pd.DataFrame]:
+    # every statistic for every summary column at this window in one batched pass,
+    # over the full history (so windows reach back before the visible range);
+    # picking another metric or statistic is then just a lookup
+    return rolling_stats(load_daily_history()[stat_columns()], window)
+
+@st.cache_data(ttl=60)
+def tier_flows(start, end, path: str = "data/summaries/transitions") -> np.ndarray:
+    # any range is a difference of two stored running totals
+    return TransitionHistory(path).total(start, end)
 
-    # smoothers
-    hist["total_staked_7dma"] = hist["total_staked"].rolling(7).mean()
-    hist["active_wallets_7dma"] = hist["active_wallets"].rolling(7).mean()
-    hist["tvl_usd_7dma"] = hist["tvl_usd"].rolling(7).mean()
-    return hist
+@st.cache_data(ttl=60)
+def load_movers(directory: str, date: str) -> pd.DataFrame:
+    return read_movers(directory, date)
+
+@st.cache_data(ttl=60, max_entries=16)
+def sketch_percentile(percentile: float, directory: str = f"{HISTORY_ROOT}/quantiles") -> pd.DataFrame:
+    # any percentile over history from the stored per-day sketches (a few KB each),
+    # never the per-wallet data
+    dates = sketch_dates(directory)
+    return pd.DataFrame({"snapshot_date": pd.to_datetime(dates),
+                         "stake": [read_sketch(directory, d).quantile(percentile / 100) for d in dates]})
+
+@st.cache_data(ttl=60, max_entries=8)
+def stored_union(days: int | None, directory: str = f"{HISTORY_ROOT}/distinct") -> tuple[dict, int]:
+    # union of the stored daily HLL sketches over the last `days` days (None = all):
+    # an elementwise max of 16 KB register arrays per day, no per-wallet data.
+    # The window ends at the newest stored day (like the history charts), so a
+    # job that hasn't run for a while still gets `days` days, not fewer
+    dates = distinct_dates(directory)
+    if days is not None and dates:
+        start = (pd.Timestamp(dates[-1]) - pd.Timedelta(days=days - 1)).date().isoformat()
+        dates = [d for d in dates if d >= start]
+    return {kind: union(directory, dates, kind) for kind in KINDS}, len(dates)
 
 # ========= Page setup =========
 st.set_page_config(page_title="KONG Staking Dashboard", layout="wide")
@@ -120,52 +254,57 @@ div[data-testid="stMetricValue"]{ color:#F1F5F9; font-weight:700; }
 """, unsafe_allow_html=True)
 
 # ========= Fetch data =========
-df_all = fetch_leaderboard(API_URL)   # raw list (may include zero-stake rows)
-summary = fetch_summary(SUMMARY_URL)  # official totals
+# shared across sessions, treat as read-only
+refresher = get_refresher()
+data, loaded_at, data_version = refresher.snapshot()
+df_all = data["leaderboard"]   # raw list (may include zero-stake rows)
+summary = data["summary"]      # official totals
+metrics = data["metrics"]      # every KPI below, computed once per fetch
+stake_index = data["index"]    # active stakes sorted once per fetch; cutoffs are binary searches
+wallet_table = data["table"]   # every row, pre-sorted by stake and address for paging/search
+concentration = data["concentration"]  # Gini / HHI / Nakamoto / top-N shares of the sorted stakes
 
 if df_all.empty or not summary:
     st.info("No data returned from the API yet.")
     st.stop()
 
-# ---- ACTIVE VIEW (exclude zero-stake) ----
-df = df_all[df_all["stakedAmount"] > 0].copy()
-
 # ========= Top: KPIs as tiles =========
 st.title("KONG Staking Dashboard")
+http_stats = get_fetcher().stats
+st.caption(f"Upstream: {http_stats['misses']} downloads, {http_stats['hits']} unchanged (304), "
+           f"{http_stats['bytes_saved'] / 2**20:,.1f} MB not re-downloaded · last fetch: "
+           + ", ".join(f"{name} {secs:.2f}s" for name, secs in data["timings"].items())
+           + f" · data age {time.time() - loaded_at:.0f}s")
+if refresher.last_error is not None:
+    st.warning(f"Refreshing from the API failed ({type(refresher.last_error).__name__}: {refresher.last_error}); "
+               f"showing data from {time.time() - loaded_at:.0f}s ago. Retrying on the next load.")
 
 c1, c2, c3, c4, c5, c6 = st.columns(6)
-active_wallets_count = df["user"].nunique()
-c1.metric("Wallets staking", f"{active_wallets_count:,}")
+c1.metric("Wallets staking", f"{metrics['active_wallets']:,}")
 
-total_staked = summary.get("totalStaked", float(df["stakedAmount"].sum()))
+total_staked = summary.get("totalStaked", metrics["leaderboard_staked"])
 tvl_usd = summary.get("tvlUsd", 0)
 perc_supply = summary.get("percentageOfCurrentSupply", 0.0)
 
 c2.metric("Total KONG staked", format_kong(total_staked))
-c3.metric("Median per wallet", format_kong(df["stakedAmount"].median() if not df.empty else 0))
-c4.metric("Max per wallet", format_kong(df["stakedAmount"].max() if not df.empty else 0))
+c3.metric("Median per wallet", format_kong(metrics["median_stake"]))
+c4.metric("Max per wallet", format_kong(metrics["max_stake"]))
 c5.metric("TVL", f"${tvl_usd:,.0f}")
 c6.metric("Percentage of circulating supply staked", f"{perc_supply:.2f}%")
 
 # ---- Tier quick glance ----
 st.subheader("Wallets per Tier")
 
-tier_counts = (
-    df.groupby("tier", as_index=False)
-      .agg(wallets=("user", "nunique"), total_kong=("stakedAmount", "sum"))
-      .sort_values("tier")
-)
-
-tc = dict(zip(tier_counts["tier"], tier_counts["wallets"]))
-zero_stake_wallets = df_all.loc[df_all["stakedAmount"] <= 0, "user"].nunique()
+tier_counts = tier_breakdown(metrics)
 
 t0, t1, t2, t3, t4, t5 = st.columns(6)
-t0.metric("Tier 0", f"{tc.get(0, 0):,}")
-t1.metric("Tier 1", f"{tc.get(1, 0):,}")
-t2.metric("Tier 2", f"{tc.get(2, 0):,}")
-t3.metric("Tier 3", f"{tc.get(3, 0):,}")
-t4.metric("Tier 4", f"{tc.get(4, 0):,}")
-t5.metric("Wallets with KP but 0 KONG staked", f"{zero_stake_wallets:,}")
+tc = metrics["tier_counts"]
+t0.metric("Tier 0", f"{tc[0]:,}")
+t1.metric("Tier 1", f"{tc[1]:,}")
+t2.metric("Tier 2", f"{tc[2]:,}")
+t3.metric("Tier 3", f"{tc[3]:,}")
+t4.metric("Tier 4", f"{tc[4]:,}")
+t5.metric("Wallets with KP but 0 KONG staked", f"{metrics['zero_stake_wallets']:,}")
 
 # ========= Tier charts =========
 st.markdown('<div class="stCard">', unsafe_allow_html=True)
@@ -200,179 +339,388 @@ with right:
     show_plotly(fig_pie)
 st.markdown('</div>', unsafe_allow_html=True)
 
-# ========= Distribution: rice / retail / whales =========
+# ========= Concentration =========
 st.markdown('<div class="stCard">', unsafe_allow_html=True)
-st.subheader("Distribution of KONG staked — Rice, Retail, and Whales")
-
-rice_cutoff = st.slider("Define the cutoff between rice and retail (KONG staked)",
-                        min_value=1_000, max_value=100_000, value=10_000, step=1_000)
-whale_cutoff = st.slider("Define the cutoff between retail and whales (KONG staked)",
-                         min_value=100_000, max_value=int(df["stakedAmount"].max()),
-                         value=1_000_000, step=50_000)
-if rice_cutoff >= whale_cutoff:
-    st.error("Rice cutoff must be lower than whale cutoff.")
-    st.stop()
-
-rice_df   = df[df["stakedAmount"] < rice_cutoff]
-retail_df = df[(df["stakedAmount"] >= rice_cutoff) & (df["stakedAmount"] <= whale_cutoff)]
-whale_df  = df[df["stakedAmount"] > whale_cutoff]
-
-c1, c2, c3 = st.columns(3)
-with c1:
-    st.caption(f"🍚 Rice stakers (< {format_kong(rice_cutoff)} KONG)")
-    if not rice_df.empty:
-        fig_rice = px.histogram(rice_df, x="stakedAmount", nbins=30,
-                                title="Rice distribution",
-                                color_discrete_sequence=["#636EFA"])
-        fig_rice.update_layout(xaxis_title="Staked KONG", yaxis_title="Wallets",
-                               xaxis_tickformat="~s", yaxis_tickformat="~s",
-                               bargap=0.1, margin=dict(t=30, l=40, r=20, b=40),
-                               plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)")
-        show_plotly(fig_rice)
-    else:
-        st.info("No rice stakers.")
-
-with c2:
-    st.caption(f"Retail wallets ({format_kong(rice_cutoff)} – {format_kong(whale_cutoff)} KONG)")
-    if not retail_df.empty:
-        fig_retail = px.histogram(retail_df, x="stakedAmount", nbins=50,
-                                  title="Retail distribution",
-                                  color_discrete_sequence=["#00CC96"])
-        fig_retail.update_layout(xaxis_title="Staked KONG", yaxis_title="Wallets",
-                                 xaxis_tickformat="~s", yaxis_tickformat="~s",
-                                 bargap=0.05, margin=dict(t=30, l=40, r=20, b=40),
-                                 plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)")
-        show_plotly(fig_retail)
-    else:
-        st.info("No retail wallets in this range.")
-
-with c3:
-    st.caption(f"Whales (> {format_kong(whale_cutoff)} KONG)")
-    if not whale_df.empty:
-        fig_whales = px.histogram(whale_df, x="stakedAmount", nbins=20,
-                                  title="Whale distribution",
-                                  color_discrete_sequence=["#EF553B"])
-        fig_whales.update_layout(xaxis_title="Staked KONG", yaxis_title="Wallets",
-                                 xaxis_tickformat="~s", yaxis_tickformat="~s",
-                                 bargap=0.2, margin=dict(t=30, l=40, r=20, b=40),
-                                 plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)")
-        show_plotly(fig_whales)
-    else:
-        st.info("No whales above this cutoff.")
+st.subheader("Stake concentration")
+k1, k2, k3, k4, k5, k6 = st.columns(6)
+k1.metric("Gini", f"{concentration['gini']:.3f}")
+k2.metric("HHI", f"{concentration['hhi']:.4f}")
+k3.metric("Nakamoto (33%)", f"{concentration['nakamoto_33']:,.0f}", help="Fewest wallets holding more than 33% of the stake")
+k4.metric("Nakamoto (51%)", f"{concentration['nakamoto_51']:,.0f}", help="Fewest wallets holding more than 51% of the stake")
+k5.metric("Top 10 share", f"{concentration['top10_share']:.1%}")
+k6.metric("Top 100 share", f"{concentration['top100_share']:.1%}")
+
+wallet_share, stake_share = data["lorenz"]
+fig_lorenz = go.Figure([
+    go.Scatter(x=wallet_share, y=stake_share, name="Lorenz curve", fill="tozeroy",
+               hovertemplate="Bottom %{x:.0%} of wallets hold %{y:.1%} of the stake<extra></extra>"),
+    go.Scatter(x=[0, 1], y=[0, 1], name="Equal stakes", line=dict(dash="dot", color="#9AA4B2")),
+])
+fig_lorenz.update_layout(xaxis_title="Share of wallets (smallest first)", yaxis_title="Share of KONG staked",
+                         xaxis_tickformat=".0%", yaxis_tickformat=".0%",
+                         margin=dict(t=30, l=40, r=20, b=40),
+                         plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)")
+show_plotly(fig_lorenz)
+
+st.caption(f"Stake percentiles (active wallets, KLL sketch: rank error within {RANK_ERROR:.2%})")
+percentiles = [10, 25, 50, 75, 90, 99]
+for col, p, value in zip(st.columns(len(percentiles)), percentiles, data["sketch"].quantile(np.array(percentiles) / 100)):
+    col.metric(f"p{p}", format_kong(value))
 st.markdown('</div>', unsafe_allow_html=True)
 
-# ========= Tables side-by-side =========
-st.markdown('<div class="stCard">', unsafe_allow_html=True)
-st.subheader("Wallets overview")
+# ========= All-wallets table =========
+@st.fragment
+def wallet_table_section(df_all: pd.DataFrame, wallet_table: WalletTable):
+    # nested fragment: searching or paging reruns only this table. Filtered, sorted
+    # and paged server-side; only the visible page is decoded and sent
+    st.markdown("#### All staking wallets (raw, may include 0)")
+    f1, f2, f3, f4 = st.columns([3, 3, 2, 2])
+    prefix = f1.text_input("Search wallet", placeholder="0x12ab…")
+    tier_filter = f2.multiselect("Tiers", list(range(5)), default=list(range(5)),
+                                 format_func=lambda t: f"Tier {t}")
+    sort_by = f3.selectbox("Sort by", ["stake", "tier"])
+    descending = f4.selectbox("Order", ["desc", "asc"]) == "desc"
+    page_size = 100
+    n_matches = wallet_table.count(prefix, tier_filter)
+    n_pages = max(1, -(-n_matches // page_size))
+    page = st.number_input("Page", min_value=1, max_value=n_pages, value=1, step=1)
+    rows, _ = wallet_table.query(prefix, tier_filter, sort_by, descending, page - 1, page_size)
+    df_display = with_addresses(df_all[["user", "stakedAmount", "tier"]].iloc[rows])
+    st.dataframe(df_display, width="stretch", hide_index=True)
+    st.caption(f"{n_matches:,} wallets · page {page:,} of {n_pages:,}")
 
-left, right = st.columns([1, 2])
+# ========= Distribution: rice / retail / whales =========
+# a fragment: moving a cutoff reruns only the histograms and the wallet tables
+# under them, not the KPIs, tier charts or downloads
+@st.fragment
+def distribution_section(stake_index: StakeIndex, data_version: int, max_stake: float,
+                         df_all: pd.DataFrame, wallet_table: WalletTable):
+    st.markdown('<div class="stCard">', unsafe_allow_html=True)
+    st.subheader("Distribution of KONG staked — Rice, Retail, and Whales")
+
+    rice_cutoff = st.slider("Define the cutoff between rice and retail (KONG staked)",
+                            min_value=1_000, max_value=100_000, value=10_000, step=1_000)
+    whale_cutoff = st.slider("Define the cutoff between retail and whales (KONG staked)",
+                             min_value=100_000, max_value=int(max_stake),
+                             value=1_000_000, step=50_000)
+    if rice_cutoff >= whale_cutoff:
+        st.error("Rice cutoff must be lower than whale cutoff.")
+        return
+
+    # segments are index ranges into the sorted active stakes (no row scans)
+    rice_i, rice_j     = stake_index.bounds(hi=rice_cutoff)                             # < rice
+    retail_i, retail_j = stake_index.bounds(rice_cutoff, whale_cutoff, include_hi=True) # rice..whale
+    whale_i, whale_j   = stake_index.bounds(whale_cutoff, include_lo=False)            # > whale
+
+    def segment_note(i: int, j: int) -> str:
+        return f"{j - i:,} wallets · {format_kong(stake_index.total(i, j))} KONG"
+
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        st.caption(f"🍚 Rice stakers (< {format_kong(rice_cutoff)} KONG) — {segment_note(rice_i, rice_j)}")
+        if rice_j > rice_i:
+            fig_rice = histogram_figure(*segment_histogram(stake_index, data_version, rice_i, rice_j, 30),
+                                        title="Rice distribution", color="#636EFA", bargap=0.1)
+            show_plotly(fig_rice)
+        else:
+            st.info("No rice stakers.")
 
-with left:
-    st.markdown("#### Top 20 whales (active wallets)")
-    top_whales = whale_df.nlargest(20, "stakedAmount")[["user", "stakedAmount"]].copy()
-    top_whales["stakedAmount"] = top_whales["stakedAmount"].apply(format_kong)
-    st.dataframe(top_whales, use_container_width=True)
+    with c2:
+        st.caption(f"Retail wallets ({format_kong(rice_cutoff)} – {format_kong(whale_cutoff)} KONG)"
+                   f" — {segment_note(retail_i, retail_j)}")
+        if retail_j > retail_i:
+            fig_retail = histogram_figure(*segment_histogram(stake_index, data_version, retail_i, retail_j, 50),
+                                          title="Retail distribution", color="#00CC96", bargap=0.05)
+            show_plotly(fig_retail)
+        else:
+            st.info("No retail wallets in this range.")
 
-with right:
-    st.markdown("#### All staking wallets (raw, may include 0)")
-    df_display = df_all[["user", "stakedAmount", "tier"]].copy()
-    df_display = df_display.sort_values("stakedAmount", ascending=False)
-    st.dataframe(df_display, use_container_width=True)
-st.markdown('</div>', unsafe_allow_html=True)
+    with c3:
+        st.caption(f"Whales (> {format_kong(whale_cutoff)} KONG) — {segment_note(whale_i, whale_j)}")
+        if whale_j > whale_i:
+            fig_whales = histogram_figure(*segment_histogram(stake_index, data_version, whale_i, whale_j, 20),
+                                          title="Whale distribution", color="#EF553B", bargap=0.2)
+            show_plotly(fig_whales)
+        else:
+            st.info("No whales above this cutoff.")
+    st.markdown('</div>', unsafe_allow_html=True)
+
+    # ---- Tables side-by-side ----
+    st.markdown('<div class="stCard">', unsafe_allow_html=True)
+    st.subheader("Wallets overview")
+
+    left, right = st.columns([1, 2])
+
+    with left:
+        st.markdown("#### Top 20 whales (active wallets)")
+        top_whales = with_addresses(stake_index.top(20, whale_i, whale_j))
+        top_whales["stakedAmount"] = top_whales["stakedAmount"].apply(format_kong)
+        st.dataframe(top_whales, width="stretch")
+
+    with right:
+        wallet_table_section(df_all, wallet_table)
+    st.markdown('</div>', unsafe_allow_html=True)
+
+distribution_section(stake_index, data_version, metrics["max_stake"], df_all, wallet_table)
 
 # ========= Downloads =========
+# files are generated only when a button is clicked, written in chunks and kept
+# per data version, so reruns cost nothing and repeated downloads are a file read
 st.markdown('<div class="stCard">', unsafe_allow_html=True)
-st.caption("Downloads (wallets CSV includes zero-stake wallets)")
-st.download_button(
-    "Download tiers (CSV, active wallets only)",
-    tier_counts.to_csv(index=False).encode(),
-    file_name="kong_tiers_active.csv",
-    mime="text/csv"
-)
-st.download_button(
-    "Download wallets (CSV, all wallets)",
-    df_all.to_csv(index=False).encode(),
-    file_name="kong_wallets_all.csv",
-    mime="text/csv"
-)
+st.caption("Downloads (wallets files include zero-stake wallets)")
+exports = get_exports()
+wallet_ids = get_wallet_ids()
+export_sources = {
+    "kong_tiers_active": ("tiers", "active wallets only", lambda: frame_chunks(tier_counts)),
+    "kong_wallets_all": ("wallets", "all wallets", lambda: frame_chunks(
+        df_all, lambda chunk: chunk.assign(user=wallet_ids.decode(chunk["user"].to_numpy())))),
+}
+format_labels = {"csv": "CSV", "csv.gz": "CSV, gzip", "parquet": "Parquet"}
+for name, (what, scope, chunks) in export_sources.items():
+    for col, (fmt, mime) in zip(st.columns(len(MIME_TYPES)), MIME_TYPES.items()):
+        col.download_button(
+            f"Download {what} ({format_labels[fmt]}, {scope})",
+            partial(exports.read, name, fmt, data_version, chunks),
+            file_name=f"{name}.{fmt}",
+            mime=mime,
+            on_click="ignore",
+        )
 st.markdown('</div>', unsafe_allow_html=True)
 
+# ========= Movers =========
+@st.fragment
+def movers_section(directory: str = "data/wallets/movers"):
+    # precomputed by the snapshot job (per-wallet diff against the previous day)
+    st.markdown('<div class="stCard">', unsafe_allow_html=True)
+    st.subheader("Movers")
+    dates = movers_dates(directory)
+    if not dates:
+        st.info("No movers report yet. The snapshot job writes one once it has stored two days of wallets.")
+    else:
+        date = st.selectbox("Changes up to", dates[::-1])
+        table = load_movers(directory, date)
+        counts = movers_counts(table)
+        k1, k2, k3, k4 = st.columns(4)
+        k1.metric("New stakers", f"{counts['new']:,}")
+        k2.metric("Fully unstaked", f"{counts['exited']:,}")
+        k3.metric("Moved up a tier", f"{counts['tier_up']:,}")
+        k4.metric("Moved down a tier", f"{counts['tier_down']:,}")
+        labels = {"new": "New stakers", "exited": "Unstakers", "gainer": "Top gainers",
+                  "loser": "Top losers", "tier_up": "Tier upgrades", "tier_down": "Tier downgrades"}
+        for tab, kind in zip(st.tabs(list(labels.values())), labels):
+            tab.dataframe(table[table["kind"] == kind].drop(columns="kind"),
+                          width="stretch", hide_index=True)
+    st.markdown('</div>', unsafe_allow_html=True)
+
+movers_section()
+
+# ========= Tier flows =========
+@st.fragment
+def tier_flows_section(path: str = "data/summaries/transitions"):
+    # wallets moving between tiers (and in/out of staking) between consecutive days
+    st.markdown('<div class="stCard">', unsafe_allow_html=True)
+    st.subheader("Tier flows")
+    dates = TransitionHistory(path).dates()
+    if not len(dates):
+        st.info("No tier transitions yet. The snapshot job records them once it has stored two days of wallets.")
+    else:
+        first, last = pd.Timestamp(dates[0]).date(), pd.Timestamp(dates[-1]).date()
+        f1, f2 = st.columns([3, 1])
+        if first < last:
+            start, end = f1.slider("Days", min_value=first, max_value=last, value=(first, last))
+        else:
+            start = end = first
+            f1.caption(f"Day: {first}")
+        chart = f2.radio("Chart", ["Heatmap", "Sankey"], horizontal=True)
+        flows = tier_flows(start, end)
+        if chart == "Heatmap":
+            fig = go.Figure(go.Heatmap(z=flows, x=STATE_LABELS, y=STATE_LABELS, colorscale="Blues",
+                                       texttemplate="%{z:,}",
+                                       hovertemplate="%{y} → %{x}<br>%{z:,} wallets<extra></extra>"))
+            fig.update_layout(xaxis_title="To", yaxis_title="From", yaxis_autorange="reversed")
+        else:
+            stayed = st.checkbox("Include wallets that stayed in their tier", value=False)
+            src, dst = np.nonzero(flows)
+            keep = stayed | (src != dst)
+            src, dst = src[keep], dst[keep]
+            n = len(STATE_LABELS)
+            fig = go.Figure(go.Sankey(
+                node=dict(label=STATE_LABELS + STATE_LABELS, pad=15),
+                link=dict(source=src, target=dst + n, value=flows[src, dst]),
+            ))
+        fig.update_layout(margin=dict(t=30, l=40, r=20, b=40),
+                          plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)")
+        show_plotly(fig)
+    st.markdown('</div>', unsafe_allow_html=True)
+
+tier_flows_section()
+
+# ========= Unique wallets =========
+@st.fragment
+def unique_wallets_section(live: dict):
+    # distinct wallets over a range of days: stored daily sketches + the live leaderboard
+    st.markdown('<div class="stCard">', unsafe_allow_html=True)
+    st.subheader("Unique wallets")
+    period = st.radio("Period", ["7d", "30d", "90d", "All"], horizontal=True, index=2)
+    stored, n_days = stored_union(None if period == "All" else int(period[:-1]))
+    counts = {kind: stored[kind].merge(live[kind]).count() for kind in KINDS}
+    u1, u2 = st.columns(2)
+    u1.metric(f"Unique stakers ({period})", f"{counts['active']:,.0f}", help="Wallets with KONG staked on at least one day")
+    u2.metric(f"Unique wallets listed ({period})", f"{counts['listed']:,.0f}", help="Including wallets listed with 0 KONG")
+    st.caption(f"HyperLogLog union of {n_days} stored daily sketches and the live leaderboard · "
+               f"±{live['active'].relative_error:.1%} standard error")
+    st.markdown('</div>', unsafe_allow_html=True)
+
+unique_wallets_section(data["distinct"])
+
 # ========= Time series =========
-st.markdown('<div class="stCard">', unsafe_allow_html=True)
-st.subheader("Time-series & Growth")
-
-hist = load_daily_history()
-if hist.empty:
-    st.info("No historical summaries yet. Once the daily job runs at least once, charts will appear here.")
-else:
-    period = st.radio("Window", ["30d", "90d", "All"], horizontal=True, index=0)
-    if period == "30d":
-        start = hist["snapshot_date"].max() - pd.Timedelta(days=30)
-        view = hist[hist["snapshot_date"] >= start]
-    elif period == "90d":
-        start = hist["snapshot_date"].max() - pd.Timedelta(days=90)
-        view = hist[hist["snapshot_date"] >= start]
+@st.fragment
+def rolling_stats_section(start: pd.Timestamp):
+    # nested fragment: changing metric, window or statistics redraws only this chart
+    st.caption("Rolling statistics")
+    e1, e2, e3 = st.columns([2, 1, 3])
+    metric = e1.selectbox("Metric", stat_columns())
+    window = e2.selectbox("Window (days)", WINDOWS)
+    shown = e3.multiselect("Statistics", STATS, default=["mean", "ema"], format_func=STAT_LABELS.get)
+    hist = load_daily_history()
+    stats = history_stats(window)
+    in_view = (hist["snapshot_date"] >= start).to_numpy()
+    lines = pd.DataFrame({"snapshot_date": hist["snapshot_date"], metric: hist[metric]})
+    for stat in shown:
+        lines[f"{window}d {STAT_LABELS[stat]}"] = stats[stat][metric]
+    value_cols = [c for c in lines.columns if c != "snapshot_date"]
+    lines = lines[in_view]
+    lines = lines.iloc[downsample_rows(lines, value_cols, CHART_POINTS, x_column="snapshot_date")]
+    fig = px.line(lines, x="snapshot_date", y=value_cols, labels={"snapshot_date": ""})
+    fig.update_layout(margin=dict(t=30, l=40, r=20, b=40),
+                      plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)")
+    show_plotly(fig)
+
+@st.fragment
+def time_series_section():
+    # a fragment: switching the window reruns only these charts
+    st.markdown('<div class="stCard">', unsafe_allow_html=True)
+    st.subheader("Time-series & Growth")
+
+    hist = load_daily_history()
+    if hist.empty:
+        st.info("No historical summaries yet. Once the daily job runs at least once, charts will appear here.")
     else:
-        view = hist
+        period = st.radio("Window", ["30d", "90d", "All"], horizontal=True, index=0)
+        view = history_window(hist, period)
+
+        c1, c2 = st.columns(2)
+        with c1:
+            st.caption("Total KONG staked")
+            lines = chart_frame(period, ("total_staked", "total_staked_7dma"))
+            fig_ts = px.line(lines, x="snapshot_date", y=["total_staked", "total_staked_7dma"],
+                             labels={"value": "KONG", "snapshot_date": ""})
+            fig_ts.update_layout(margin=dict(t=30, l=40, r=20, b=40),
+                                 plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)")
+            show_plotly(fig_ts)
+
+        with c2:
+            st.caption("Active wallets")
+            lines = chart_frame(period, ("active_wallets", "active_wallets_7dma"))
+            fig_aw = px.line(lines, x="snapshot_date", y=["active_wallets", "active_wallets_7dma"],
+                             labels={"value": "Wallets", "snapshot_date": ""})
+            fig_aw.update_layout(margin=dict(t=30, l=40, r=20, b=40),
+                                 plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)")
+            show_plotly(fig_aw)
+
+        c3, c4 = st.columns(2)
+        with c3:
+            st.caption("TVL (USD)")
+            lines = chart_frame(period, ("tvl_usd", "tvl_usd_7dma"))
+            fig_tvl = px.line(lines, x="snapshot_date", y=["tvl_usd", "tvl_usd_7dma"],
+                              labels={"value": "USD", "snapshot_date": ""})
+            fig_tvl.update_layout(margin=dict(t=30, l=40, r=20, b=40),
+                                  plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)")
+            show_plotly(fig_tvl)
+
+        with c4:
+            st.caption("Tier counts over time (stacked)")
+            tiers = chart_frame(period, ("tier0", "tier1", "tier2", "tier3", "tier4"))
+            tiers = tiers.melt(id_vars="snapshot_date", value_vars=["tier0", "tier1", "tier2", "tier3", "tier4"],
+                              var_name="tier", value_name="wallets")
+            tiers["tier"] = tiers["tier"].map({"tier0": "Tier 0", "tier1": "Tier 1", "tier2": "Tier 2", "tier3": "Tier 3", "tier4": "Tier 4"})
+            fig_tiers = px.area(tiers, x="snapshot_date", y="wallets", color="tier",
+                                labels={"wallets": "Wallets", "snapshot_date": ""})
+            fig_tiers.update_layout(margin=dict(t=30, l=40, r=20, b=40),
+                                    plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)")
+            show_plotly(fig_tiers)
+
+        if "gini" in view.columns and view["gini"].notna().any():  # recorded since the concentration columns exist
+            c5, c6 = st.columns(2)
+            with c5:
+                st.caption("Gini and top-N share of the stake")
+                shares = chart_frame(period, ("gini", "top1_share", "top10_share", "top100_share"))
+                fig_conc = px.line(shares, x="snapshot_date", y=["gini", "top1_share", "top10_share", "top100_share"],
+                                   labels={"value": "", "snapshot_date": ""})
+                fig_conc.update_layout(margin=dict(t=30, l=40, r=20, b=40),
+                                       plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)")
+                show_plotly(fig_conc)
+
+            with c6:
+                st.caption("Nakamoto coefficient (wallets holding > 33% / 51%)")
+                nakamoto = chart_frame(period, ("nakamoto_33", "nakamoto_51"))
+                fig_nak = px.line(nakamoto, x="snapshot_date", y=["nakamoto_33", "nakamoto_51"],
+                                  labels={"value": "Wallets", "snapshot_date": ""})
+                fig_nak.update_layout(margin=dict(t=30, l=40, r=20, b=40),
+                                      plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)")
+                show_plotly(fig_nak)
+
+        if "p10_stake" in view.columns and view["p10_stake"].notna().any():  # recorded since the sketches exist
+            st.caption("Stake percentile bands (p10–p90, p25–p75, median, p99)")
+            band_cols = ("p10_stake", "p25_stake", "median_stake", "p75_stake", "p90_stake", "p99_stake")
+            bands = chart_frame(period, band_cols)
+            fig_bands = go.Figure()
+            for lo, hi, name, alpha in [("p10_stake", "p90_stake", "p10–p90", 0.15), ("p25_stake", "p75_stake", "p25–p75", 0.3)]:
+                fig_bands.add_trace(go.Scatter(x=bands["snapshot_date"], y=bands[lo], line=dict(width=0),
+                                               showlegend=False, hoverinfo="skip"))
+                fig_bands.add_trace(go.Scatter(x=bands["snapshot_date"], y=bands[hi], line=dict(width=0), name=name,
+                                               fill="tonexty", fillcolor=f"rgba(99,110,250,{alpha})"))
+            fig_bands.add_trace(go.Scatter(x=bands["snapshot_date"], y=bands["median_stake"], name="median",
+                                           line=dict(color="#636EFA")))
+            fig_bands.add_trace(go.Scatter(x=bands["snapshot_date"], y=bands["p99_stake"], name="p99",
+                                           line=dict(color="#EF553B", dash="dot")))
+            custom = st.number_input("Add any percentile (from the stored daily sketches)", min_value=0.0,
+                                     max_value=100.0, value=None, step=1.0, placeholder="e.g. 95")
+            if custom is not None:
+                line = sketch_percentile(custom)
+                line = line[line["snapshot_date"] >= view["snapshot_date"].min()]
+                fig_bands.add_trace(go.Scatter(x=line["snapshot_date"], y=line["stake"], name=f"p{custom:g}",
+                                               line=dict(color="#FFA15A")))
+            fig_bands.update_layout(yaxis_type="log", yaxis_title="KONG per wallet",
+                                    margin=dict(t=30, l=40, r=20, b=40),
+                                    plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)")
+            show_plotly(fig_bands)
+
+        # --- DoD deltas (latest) [robust to short histories] ---
+        core_cols = ["snapshot_date", "total_staked", "active_wallets", "tvl_usd"]
+        valid = view.dropna(subset=[c for c in core_cols if c in view.columns])
+
+        if not valid.empty:
+            latest_row = valid.iloc[-1]
+            if len(valid) >= 2:
+                prev_row = valid.iloc[-2]
+                delta_total = latest_row["total_staked"] - prev_row["total_staked"]
+                delta_wallets = int(latest_row["active_wallets"] - prev_row["active_wallets"])
+                delta_tvl = latest_row["tvl_usd"] - prev_row["tvl_usd"]
+            else:
+                delta_total = 0.0
+                delta_wallets = 0
+                delta_tvl = 0.0
+
+            m1, m2, m3 = st.columns(3)
+            m1.metric("Δ Total staked (DoD)", format_kong(delta_total))
+            m2.metric("Δ Active wallets (DoD)", f"{delta_wallets:,}")
+            m3.metric("Δ TVL USD (DoD)", f"${delta_tvl:,.0f}")
+        else:
+            st.caption("No valid rows yet for DoD metrics.")
 
-    c1, c2 = st.columns(2)
-    with c1:
-        st.caption("Total KONG staked")
-        fig_ts = px.line(view, x="snapshot_date", y=["total_staked", "total_staked_7dma"],
-                         labels={"value": "KONG", "snapshot_date": ""})
-        fig_ts.update_layout(margin=dict(t=30, l=40, r=20, b=40),
-                             plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)")
-        show_plotly(fig_ts)
+        rolling_stats_section(view["snapshot_date"].min())
 
-    with c2:
-        st.caption("Active wallets")
-        fig_aw = px.line(view, x="snapshot_date", y=["active_wallets", "active_wallets_7dma"],
-                         labels={"value": "Wallets", "snapshot_date": ""})
-        fig_aw.update_layout(margin=dict(t=30, l=40, r=20, b=40),
-                             plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)")
-        show_plotly(fig_aw)
-
-    c3, c4 = st.columns(2)
-    with c3:
-        st.caption("TVL (USD)")
-        fig_tvl = px.line(view, x="snapshot_date", y=["tvl_usd", "tvl_usd_7dma"],
-                          labels={"value": "USD", "snapshot_date": ""})
-        fig_tvl.update_layout(margin=dict(t=30, l=40, r=20, b=40),
-                              plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)")
-        show_plotly(fig_tvl)
-
-    with c4:
-        st.caption("Tier counts over time (stacked)")
-        tiers = view.melt(id_vars="snapshot_date", value_vars=["tier0", "tier1", "tier2", "tier3", "tier4"],
-                          var_name="tier", value_name="wallets")
-        tiers["tier"] = tiers["tier"].map({"tier0": "Tier 0", "tier1": "Tier 1", "tier2": "Tier 2", "tier3": "Tier 3", "tier4": "Tier 4"})
-        fig_tiers = px.area(tiers, x="snapshot_date", y="wallets", color="tier",
-                            labels={"wallets": "Wallets", "snapshot_date": ""})
-        fig_tiers.update_layout(margin=dict(t=30, l=40, r=20, b=40),
-                                plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)")
-        show_plotly(fig_tiers)
-
-    # --- DoD deltas (latest) [robust to short histories] ---
-    core_cols = ["snapshot_date", "total_staked", "active_wallets", "tvl_usd"]
-    valid = view.dropna(subset=[c for c in core_cols if c in view.columns])
-
-    if not valid.empty:
-        latest_row = valid.iloc[-1]
-        if len(valid) >= 2:
-            prev_row = valid.iloc[-2]
-            delta_total = latest_row["total_staked"] - prev_row["total_staked"]
-            delta_wallets = int(latest_row["active_wallets"] - prev_row["active_wallets"])
-            delta_tvl = latest_row["tvl_usd"] - prev_row["tvl_usd"]
-        else:
-            delta_total = 0.0
-            delta_wallets = 0
-            delta_tvl = 0.0
-
-        m1, m2, m3 = st.columns(3)
-        m1.metric("Δ Total staked (DoD)", format_kong(delta_total))
-        m2.metric("Δ Active wallets (DoD)", f"{delta_wallets:,}")
-        m3.metric("Δ TVL USD (DoD)", f"${delta_tvl:,.0f}")
-    else:
-        st.caption("No valid rows yet for DoD metrics.")
+    st.markdown('</div>', unsafe_allow_html=True)
 
-st.markdown('</div>', unsafe_allow_html=True)
+time_series_section()
@@ -0,0 +1,16 @@
+# kong/__init__.py
+"""Shared KONG staking logic used by the dashboard and the snapshot job.
+
+Nothing in here imports Streamlit or Plotly so the cron job stays light.
+"""
+from kong.tiers import TIER_BOUNDS, N_TIERS, classify_tier, classify_tiers
+from kong.metrics import leaderboard_metrics
+from kong.leaderboard import (
+    parse_leaderboard, compute_metrics, summary_metrics, tier_breakdown, snapshot_row,
+)
+
+__all__ = [
+    "TIER_BOUNDS", "N_TIERS", "classify_tier", "classify_tiers",
+    "leaderboard_metrics",
+    "parse_leaderboard", "compute_metrics", "summary_metrics", "tier_breakdown", "snapshot_row",
+]
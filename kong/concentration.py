@@ -0,0 +1,51 @@
+# kong/concentration.py
+# How concentrated the stake is, from the active stakes sorted ascending (what
+# StakeIndex already holds) and their prefix sums: every metric is a closed
+# form over the prefix sums or a binary search in them, so the sort is the
+# only O(n log n) step.
+import numpy as np
+
+TOP_N = (1, 10, 100)
+NAKAMOTO_THRESHOLDS = {"nakamoto_33": 0.33, "nakamoto_51": 0.51}
+CONCENTRATION_COLUMNS = ["gini", "hhi", *NAKAMOTO_THRESHOLDS, *(f"top{k}_share" for k in TOP_N)]
+
+
+def _prefix_sums(sorted_stakes: np.ndarray, cumsum: np.ndarray | None) -> np.ndarray:
+    return cumsum if cumsum is not None else np.concatenate([[0.0], np.cumsum(sorted_stakes)])
+
+
+def concentration_metrics(sorted_stakes, cumsum=None) -> dict:
+    """Gini, HHI, Nakamoto coefficients and top-N shares of the active stakes.
+
+    `sorted_stakes` ascending, all > 0; `cumsum` optionally its prefix sums with
+    a leading 0 (StakeIndex.cumsum). The Nakamoto coefficient at t is the fewest
+    wallets holding more than t of the stake. All values are floats (NaN if
+    nothing is staked), so a history column gets NaN for days before it existed.
+    """
+    x = np.asarray(sorted_stakes, dtype=np.float64)
+    n = len(x)
+    if n == 0:
+        return {name: float("nan") for name in CONCENTRATION_COLUMNS}
+    cum = _prefix_sums(x, cumsum)
+    total = cum[-1]
+    out = {
+        "gini": float((n + 1 - 2 * cum[1:].sum() / total) / n),
+        "hhi": float(np.square(x / total).sum()),
+    }
+    for name, t in NAKAMOTO_THRESHOLDS.items():
+        # the top k hold total - cum[n - k]; want the smallest k with that > t * total
+        m = int(np.searchsorted(cum, (1 - t) * total, side="left")) - 1
+        out[name] = float(n - m)
+    for k in TOP_N:
+        out[f"top{k}_share"] = float((total - cum[max(n - k, 0)]) / total)
+    return out
+
+
+def lorenz_curve(sorted_stakes, cumsum=None, points: int = 101) -> tuple[np.ndarray, np.ndarray]:
+    """(share of wallets, share of stake held by them) at `points` evenly spaced wallet shares."""
+    x = np.asarray(sorted_stakes, dtype=np.float64)
+    p = np.linspace(0.0, 1.0, points)
+    if not len(x):
+        return p, p.copy()
+    cum = _prefix_sums(x, cumsum)
+    return p, np.interp(p * len(x), np.arange(len(x) + 1), cum) / cum[-1]
@@ -0,0 +1,114 @@
+# kong/derived.py
+# Day-over-day changes and 7-day moving averages of the summary history, stored
+# in a sibling HistoryStore that is row-aligned with it. Each derived value
+# depends only on its own row and the MA_WINDOW - 1 rows before it, so new days
+# are computed from that much context instead of the whole history.
+import numpy as np
+import pandas as pd
+
+from kong.history import TIME_COLUMN, HistoryStore
+
+DOD_COLUMNS = ["total_staked", "tvl_usd", "active_wallets", "percentage_supply", "median_stake", "max_stake"]
+MA_COLUMNS = ["total_staked", "active_wallets", "tvl_usd"]
+MA_WINDOW = 7
+CONTEXT = MA_WINDOW - 1
+
+DERIVED_SCHEMA = {
+    TIME_COLUMN: "datetime64[s]",
+    **{f"{col}_dod": "float64" for col in DOD_COLUMNS},
+    **{f"{col}_7dma": "float64" for col in MA_COLUMNS},
+}
+
+
+def compute_derived(base: pd.DataFrame, skip: int = 0) -> pd.DataFrame:
+    """Derived columns for rows `skip:` of `base`; earlier rows are only context.
+
+    Same values as `.diff()` / `.rolling(7).mean()` (NaN until there is enough
+    history). The window sum is always added in the same order, so a row gets
+    bit-identical values whether it is computed alone or with the full history.
+    """
+    n = len(base)
+    out = {TIME_COLUMN: base[TIME_COLUMN].to_numpy(dtype="datetime64[s]")[skip:]}
+    for col in DOD_COLUMNS:
+        x = base[col].to_numpy(dtype=np.float64)
+        dod = np.full(n, np.nan)
+        dod[1:] = x[1:] - x[:-1]
+        out[f"{col}_dod"] = dod[skip:]
+    for col in MA_COLUMNS:
+        x = base[col].to_numpy(dtype=np.float64)
+        ma = np.full(n, np.nan)
+        if n >= MA_WINDOW:
+            total = x[:n - CONTEXT].copy()
+            for k in range(1, MA_WINDOW):
+                total += x[k:n - CONTEXT + k]
+            ma[CONTEXT:] = total / MA_WINDOW
+        out[f"{col}_7dma"] = ma[skip:]
+    return pd.DataFrame(out)
+
+
+def _same(a: pd.DataFrame, b: pd.DataFrame) -> bool:
+    return all(np.array_equal(a[c].to_numpy(), b[c].to_numpy(), equal_nan=c != TIME_COLUMN) for c in a.columns)
+
+
+class DerivedHistory:
+    """Derived columns of `base`, stored at `path` and extended as `base` grows."""
+
+    def __init__(self, base: HistoryStore, path):
+        self.base = base
+        self.store = HistoryStore(path)
+
+    def compute(self, start: int = 0) -> pd.DataFrame:
+        """Derived rows `start:` from base rows `start - CONTEXT:` only."""
+        ctx = max(start - CONTEXT, 0)
+        return compute_derived(self.base.load(ctx), skip=start - ctx)
+
+    def _stored_prefix(self, base_times: np.ndarray) -> int:
+        """How many stored derived rows line up with base rows (0 if the base was rebuilt)."""
+        if not self.store.exists():
+            return 0
+        times = self.store.column(TIME_COLUMN)
+        k = min(len(times), len(base_times))
+        return k if np.array_equal(times[:k], base_times[:k]) else 0
+
+    def update(self) -> int:
+        """Store derived values for base rows not covered yet; returns the rows written.
+
+        The last stored row is recomputed too, since the base may have replaced it.
+        """
+        base_times = self.base.column(TIME_COLUMN)
+        if not self.store.exists() or self._stored_prefix(base_times) < self.store.rows:
+            HistoryStore.create(self.store.path, DERIVED_SCHEMA)  # missing or out of step: rebuild
+        done = self.store.rows
+        start = max(done - 1, 0)
+        new = self.compute(start)
+        written = 0
+        if done and len(new):
+            if not _same(self.store.load(start), new.iloc[:1]):
+                self.store.upsert(new.iloc[0].to_dict())
+                written += 1
+            new = new.iloc[1:]
+        self.store.extend(new)
+        return written + len(new)
+
+    def load(self) -> pd.DataFrame:
+        """Base history with its derived columns; rows not stored yet are computed in memory."""
+        base = self.base.load()
+        if base.empty:
+            return base
+        done = self._stored_prefix(base[TIME_COLUMN].to_numpy())
+        keep = max(done - 1, 0)  # the last stored row is recomputed (base may have replaced it)
+        ctx = max(keep - CONTEXT, 0)
+        derived = pd.concat([self.store.load().iloc[:keep], compute_derived(base.iloc[ctx:], skip=keep - ctx)],
+                            ignore_index=True) if keep else compute_derived(base)
+        return pd.concat([base, derived.drop(columns=TIME_COLUMN)], axis=1)
+
+
+def time_moving_averages(frame: pd.DataFrame, days: int = MA_WINDOW) -> pd.DataFrame:
+    """`frame` plus `<col>_7dma` over the trailing `days` days of time (any row spacing).
+
+    For the hourly / weekly rollups; the daily level uses the stored columns above.
+    """
+    if frame.empty:
+        return frame
+    ma = frame.set_index(TIME_COLUMN)[MA_COLUMNS].astype(np.float64).rolling(f"{days}D").mean()
+    return frame.assign(**{f"{col}_7dma": ma[col].to_numpy() for col in MA_COLUMNS})
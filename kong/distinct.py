@@ -0,0 +1,144 @@
+# kong/distinct.py
+# HyperLogLog sketches of the wallets seen in a snapshot, for distinct counts
+# across days ("unique stakers in the last 90 days") without per-wallet data.
+# A sketch is 2^p one-byte registers; the union of any set of days is the
+# elementwise max of their registers, so one file per day answers every range.
+# Standard error is 1.04 / sqrt(2^p) (0.81% at p = 14); the estimate uses
+# Ertl's improved estimator (2017), which needs no bias-correction tables and
+# is near-exact for small counts. tests/test_distinct.py checks the bound.
+#
+#   distinct/<date>.npz   one sketch per kind ("active" stakers, all "listed"
+#                         wallets) for that snapshot day
+import io
+from pathlib import Path
+import numpy as np
+
+from kong.storage import replace_atomically
+from kong.wallets import ADDRESS_BYTES, ADDRESS_DTYPE
+
+P = 14
+KINDS = ("active", "listed")
+
+
+def _mix(x: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer (uint64 arithmetic wraps)."""
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def hash_addresses(packed: np.ndarray) -> np.ndarray:
+    """64-bit hash of each 20-byte address (stable across runs and dictionaries)."""
+    b = np.ascontiguousarray(packed, dtype=ADDRESS_DTYPE).view(np.uint8).reshape(-1, ADDRESS_BYTES)
+    words = np.zeros((len(b), 24), dtype=np.uint8)
+    words[:, :ADDRESS_BYTES] = b
+    w = words.view("<u8")  # (n, 3): bytes 0-7, 8-15, 16-19 zero-padded
+    return _mix(w[:, 0] ^ _mix(w[:, 1] ^ _mix(w[:, 2] + np.uint64(ADDRESS_BYTES))))
+
+
+def _bit_length(x: np.ndarray) -> np.ndarray:
+    """Bit length of each uint64 (0 for 0), exact: frexp on the 32-bit halves."""
+    hi = (x >> np.uint64(32)).astype(np.float64)
+    lo = (x & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    return np.where(hi > 0, 32 + np.frexp(hi)[1], np.frexp(lo)[1])
+
+
+def _sigma(x: float) -> float:
+    if x == 1.0:
+        return float("inf")
+    y, z = 1.0, x
+    while True:
+        x *= x
+        z_old, z = z, z + x * y
+        y += y
+        if z == z_old:
+            return z
+
+
+def _tau(x: float) -> float:
+    if x in (0.0, 1.0):
+        return 0.0
+    y, z = 1.0, 1.0 - x
+    while True:
+        x = np.sqrt(x)
+        y *= 0.5
+        z_old, z = z, z - (1.0 - x) ** 2 * y
+        if z == z_old:
+            return z / 3
+
+
+class HyperLogLog:
+    """Mergeable distinct-count sketch over 64-bit hashes."""
+
+    def __init__(self, p: int = P, registers: np.ndarray | None = None):
+        self.p = p
+        self.registers = np.zeros(1 << p, dtype=np.uint8) if registers is None else registers
+
+    def add_hashes(self, hashes) -> "HyperLogLog":
+        h = np.asarray(hashes, dtype=np.uint64)
+        q = 64 - self.p
+        index = (h >> np.uint64(q)).astype(np.int64)
+        rest = h & np.uint64((1 << q) - 1)
+        rho = (q + 1 - _bit_length(rest)).astype(np.uint8)  # position of the first 1-bit, q + 1 if none
+        np.maximum.at(self.registers, index, rho)
+        return self
+
+    def add_addresses(self, packed: np.ndarray) -> "HyperLogLog":
+        return self.add_hashes(hash_addresses(packed))
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """Fold `other` (same p) in: the result counts the union of both inputs."""
+        if other.p != self.p:
+            raise ValueError(f"cannot merge sketches with p={self.p} and p={other.p}")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self) -> float:
+        m, q = len(self.registers), 64 - self.p
+        c = np.bincount(self.registers, minlength=q + 2)
+        z = m * _tau(1 - c[q + 1] / m)
+        for k in range(q, 0, -1):
+            z = 0.5 * (z + c[k])
+        z += m * _sigma(c[0] / m)
+        return m * m / (2 * np.log(2) * z)
+
+    @property
+    def relative_error(self) -> float:
+        """Standard error of `count()` relative to the true count."""
+        return 1.04 / np.sqrt(len(self.registers))
+
+
+def wallet_sketches(users, stakes, p: int = P) -> dict[str, HyperLogLog]:
+    """{"active": stakers, "listed": every wallet on the leaderboard} of one snapshot (packed addresses)."""
+    hashes = hash_addresses(users)
+    stakes = np.asarray(stakes, dtype=np.float64)
+    return {"active": HyperLogLog(p).add_hashes(hashes[stakes > 0]), "listed": HyperLogLog(p).add_hashes(hashes)}
+
+
+# ---- one file per snapshot day
+def write_sketches(directory, date: str, sketches: dict[str, HyperLogLog]) -> Path:
+    path = Path(directory) / f"{date}.npz"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    buf = io.BytesIO()
+    np.savez_compressed(buf, **{kind: s.registers for kind, s in sketches.items()})
+    replace_atomically(path, lambda f: f.write(buf.getvalue()))
+    return path
+
+
+def distinct_dates(directory) -> list[str]:
+    directory = Path(directory)
+    return sorted(p.stem for p in directory.glob("*.npz")) if directory.exists() else []
+
+
+def read_sketches(directory, date: str) -> dict[str, HyperLogLog]:
+    with np.load(Path(directory) / f"{date}.npz") as npz:
+        return {kind: HyperLogLog(int(np.log2(len(npz[kind]))), npz[kind]) for kind in npz.files}
+
+
+def union(directory, dates, kind: str = "active") -> HyperLogLog:
+    """Union sketch of `kind` over the given snapshot days."""
+    out = None
+    for date in dates:
+        sketch = read_sketches(directory, date)[kind]
+        out = sketch if out is None else out.merge(sketch)
+    return out if out is not None else HyperLogLog()
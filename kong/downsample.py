@@ -0,0 +1,50 @@
+# kong/downsample.py
+# Largest-triangle-three-buckets: reduce a long series to a fixed number of
+# points for plotting while keeping its visual shape (peaks and dips survive,
+# flat stretches collapse).
+import numpy as np
+import pandas as pd
+
+
+def lttb(y, n_out: int, x=None) -> np.ndarray:
+    """Indices (increasing) of the `n_out` points LTTB keeps; first and last are always kept.
+
+    All indices if the series already has at most `n_out` points. NaNs are
+    never preferred over real values.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    x = np.arange(n, dtype=np.float64) if x is None else np.asarray(x).astype(np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)  # n_out - 2 buckets between the ends
+    out = np.empty(n_out, dtype=np.intp)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        nhi = edges[b + 2] if b + 2 < len(edges) else n  # next bucket (the last point for the final one)
+        ny = y[hi:nhi]
+        avg_x, avg_y = x[hi:nhi].mean(), (np.nanmean(ny) if not np.isnan(ny).all() else y[a])
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(np.nan_to_num(area, nan=-1.0)))
+        out[b + 1] = a
+    return out
+
+
+def downsample_rows(frame: pd.DataFrame, columns, n_out: int, x_column: str | None = None) -> np.ndarray:
+    """Row positions to plot `columns` of `frame` with at most `n_out` points per series.
+
+    LTTB runs once, on a driver series: the sum of the columns each scaled to
+    its own range, so a spike in any of them (not only the largest) shapes the
+    picks. Every series is drawn at the same rows.
+    """
+    if len(frame) <= n_out:
+        return np.arange(len(frame))
+    x = frame[x_column].to_numpy().astype("datetime64[s]").astype(np.int64) if x_column else None
+    values = frame[list(columns)].to_numpy(dtype=np.float64)
+    lo, hi = np.fmin.reduce(values, axis=0), np.fmax.reduce(values, axis=0)  # NaN-skipping, no warning
+    scaled = (values - lo) / np.where(hi > lo, hi - lo, 1.0)
+    driver = np.nansum(scaled, axis=1)
+    driver[np.isnan(values).all(axis=1)] = np.nan  # rows with no value anywhere stay gaps
+    return lttb(driver, n_out, x)
@@ -0,0 +1,89 @@
+# kong/exports.py
+# Download files built on first request and kept on disk per data version.
+# Frames are written chunk by chunk, so a large leaderboard is never held as one
+# CSV string in memory.
+import gzip
+import shutil
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+import pandas as pd
+
+from kong.storage import locked, replace_atomically
+
+CHUNK_ROWS = 100_000
+MIME_TYPES = {
+    "csv": "text/csv",
+    "csv.gz": "application/gzip",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def frame_chunks(df: pd.DataFrame, transform: Callable[[pd.DataFrame], pd.DataFrame] | None = None,
+                 rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """`df` in slices of `rows` (at least one, so empty frames still get a header)."""
+    for start in range(0, max(len(df), 1), rows):
+        chunk = df.iloc[start:start + rows]
+        yield transform(chunk) if transform is not None else chunk
+
+
+def write_csv(f, chunks: Iterable[pd.DataFrame]) -> None:
+    for k, chunk in enumerate(chunks):
+        f.write(chunk.to_csv(index=False, header=k == 0).encode())
+
+
+def write_csv_gz(f, chunks: Iterable[pd.DataFrame]) -> None:
+    with gzip.GzipFile(fileobj=f, mode="wb", mtime=0) as gz:
+        write_csv(gz, chunks)
+
+
+def write_parquet(f, chunks: Iterable[pd.DataFrame]) -> None:
+    import pyarrow as pa  # a streamlit dependency; only needed for this format
+    import pyarrow.parquet as pq
+
+    writer = None
+    for chunk in chunks:
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(f, table.schema)
+        writer.write_table(table)
+    writer.close()
+
+
+WRITERS = {"csv": write_csv, "csv.gz": write_csv_gz, "parquet": write_parquet}
+
+
+class ExportCache:
+    """Export files under `directory`/<version>/, built once per (name, format, version).
+
+    Versions are the refresher's in-process counter, so files left by a previous
+    process are dropped on start; older versions are dropped when a newer one is built.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def path(self, name: str, fmt: str, version: int) -> Path:
+        return self.directory / str(version) / f"{name}.{fmt}"
+
+    def get(self, name: str, fmt: str, version: int, chunks: Callable[[], Iterable[pd.DataFrame]]) -> Path:
+        """Path of the export, writing it from `chunks()` if this version doesn't have it yet."""
+        path = self.path(name, fmt, version)
+        if path.exists():
+            return path
+        with locked(self.directory):  # concurrent clicks: one build, the rest find the file
+            if not path.exists():
+                self._drop_older(version)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                replace_atomically(path, lambda f: WRITERS[fmt](f, chunks()))
+        return path
+
+    def read(self, name: str, fmt: str, version: int, chunks: Callable[[], Iterable[pd.DataFrame]]) -> bytes:
+        return self.get(name, fmt, version, chunks).read_bytes()
+
+    def _drop_older(self, version: int) -> None:
+        for old in self.directory.iterdir():
+            if old.is_dir() and old.name.isdigit() and int(old.name) < version:
+                shutil.rmtree(old, ignore_errors=True)
@@ -0,0 +1,22 @@
+# kong/histogram.py
+import numpy as np
+
+
+def histogram(sorted_values: np.ndarray, nbins: int) -> tuple[np.ndarray, np.ndarray]:
+    """Equal-width histogram of an already sorted array (e.g. a `StakeIndex` slice).
+
+    Bin edges span [min, max]; counts come from one searchsorted of the edges,
+    so the cost is O(nbins log n) and the result is O(nbins) whatever the
+    number of wallets. Bins are [left, right) except the last, which includes
+    the max. Returns (edges, counts) with len(edges) == len(counts) + 1.
+    """
+    n = len(sorted_values)
+    if n == 0:
+        return np.empty(0), np.empty(0, dtype=np.int64)
+    lo, hi = float(sorted_values[0]), float(sorted_values[-1])
+    if hi == lo:
+        return np.array([lo, hi]), np.array([n], dtype=np.int64)
+    edges = np.linspace(lo, hi, nbins + 1)
+    positions = np.searchsorted(sorted_values, edges, side="left")
+    positions[-1] = n
+    return edges, np.diff(positions)
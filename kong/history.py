@@ -0,0 +1,222 @@
+# kong/history.py
+# Columnar on-disk history: one raw little-endian file per column plus a small
+# meta.json (schema + committed row count). Loading is one np.fromfile per
+# column, and a snapshot only writes one value at the end of each file.
+#
+# Writes are O(1) and crash-safe: meta.json is only ever replaced by an atomic
+# rename, and it is the commit point. Appends write past the committed row
+# count first (readers ignore those bytes) and then publish the new count.
+# Replacing the last row first commits the new values in meta.json ("tail",
+# which readers overlay), then rewrites them in place, then drops "tail".
+# Writers serialize on an advisory lock file.
+import json
+import os
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from kong.storage import locked, write_json_atomic
+
+TIME_COLUMN = "snapshot_date"
+
+# daily.csv columns and their on-disk dtypes
+SUMMARY_SCHEMA = {
+    "snapshot_date": "datetime64[s]",
+    "total_staked": "float64",
+    "tvl_usd": "float64",
+    "percentage_supply": "float64",
+    "active_wallets": "int64",
+    "median_stake": "float64",
+    "max_stake": "float64",
+    "zero_stake_wallets": "int64",
+    "tier0": "int64",
+    "tier1": "int64",
+    "tier2": "int64",
+    "tier3": "int64",
+    "tier4": "int64",
+}
+
+
+def _fill_value(dtype: np.dtype):
+    return np.nan if dtype.kind == "f" else 0
+
+
+def _json_value(value, dtype):
+    v = np.array([value], dtype=dtype)
+    return int(v.view("int64")[0]) if v.dtype.kind == "M" else v[0].item()
+
+
+def _to_row(row: dict) -> dict:
+    return {**row, TIME_COLUMN: np.datetime64(row[TIME_COLUMN], "s")}
+
+
+class HistoryStore:
+    """Append-only columnar table keyed by `snapshot_date` (strictly increasing)."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._meta_path = self.path / "meta.json"
+
+    # ---- metadata
+    def exists(self) -> bool:
+        return self._meta_path.exists()
+
+    def _read_meta(self) -> dict:
+        return json.loads(self._meta_path.read_text())
+
+    def _write_meta(self, meta: dict) -> None:
+        write_json_atomic(self._meta_path, meta)
+
+    @property
+    def schema(self) -> dict[str, np.dtype]:
+        return {name: np.dtype(dt) for name, dt in self._read_meta()["columns"].items()}
+
+    @property
+    def rows(self) -> int:
+        return self._read_meta()["rows"] if self.exists() else 0
+
+    def _column_path(self, name: str) -> Path:
+        return self.path / f"{name}.bin"
+
+    @classmethod
+    def create(cls, path, schema: dict) -> "HistoryStore":
+        store = cls(path)
+        store.path.mkdir(parents=True, exist_ok=True)
+        for name in schema:
+            store._column_path(name).write_bytes(b"")
+        store._write_meta({"rows": 0, "columns": dict(schema)})
+        return store
+
+    # ---- reads
+    def _read_column(self, meta: dict, name: str, start: int, stop: int | None = None) -> np.ndarray:
+        dtype = np.dtype(meta["columns"][name])
+        n = meta["rows"]
+        stop = n if stop is None else min(stop, n)
+        if stop - start <= 0:
+            return np.empty(0, dtype=dtype)
+        values = np.fromfile(self._column_path(name), dtype=dtype, count=stop - start,
+                             offset=start * dtype.itemsize)
+        if "tail" in meta and stop == n:  # last row is mid-rewrite; the committed values are in meta
+            values[-1] = np.array([meta["tail"][name]], dtype=dtype)[0]
+        return values
+
+    def column(self, name: str, start: int = 0, stop: int | None = None) -> np.ndarray:
+        return self._read_column(self._read_meta(), name, start, stop)
+
+    def load(self, start: int = 0, stop: int | None = None) -> pd.DataFrame:
+        """Rows `start:stop` as a DataFrame (typed columns, no parsing)."""
+        if not self.exists():
+            return pd.DataFrame()
+        meta = self._read_meta()
+        return pd.DataFrame({name: self._read_column(meta, name, start, stop) for name in meta["columns"]})
+
+    def last_time(self) -> np.datetime64 | None:
+        n = self.rows
+        return self.column(TIME_COLUMN, n - 1)[0] if n else None
+
+    # ---- writes
+    def _add_columns(self, meta: dict, row: dict) -> None:
+        """New keys in `row` become new columns, back-filled with NaN (floats) / 0."""
+        for name, value in row.items():
+            if name in meta["columns"]:
+                continue
+            dtype = np.dtype("float64" if isinstance(value, float) else "int64")
+            np.full(meta["rows"], _fill_value(dtype), dtype=dtype).tofile(self._column_path(name))
+            meta["columns"][name] = str(dtype)
+
+    def _write_at(self, meta: dict, row: dict, at: int) -> None:
+        for name, dt in meta["columns"].items():
+            dtype = np.dtype(dt)
+            with open(self._column_path(name), "r+b") as f:
+                f.seek(at * dtype.itemsize)
+                f.write(np.array([row.get(name, _fill_value(dtype))], dtype=dtype).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _finish_tail(self, meta: dict) -> None:
+        """Roll forward a committed tail rewrite (also recovers one interrupted by a crash)."""
+        tail = meta.pop("tail", None)
+        if tail is None:
+            return
+        self._write_at(meta, tail, meta["rows"] - 1)
+        self._write_meta(meta)
+
+    def upsert(self, row: dict) -> str:
+        """Append `row`, or replace the last row when it has the same `snapshot_date`.
+
+        Only the new values are written, never the whole history. Returns
+        "append" or "replace". Rows older than the last one are rejected.
+        """
+        row = _to_row(row)
+        ts = row[TIME_COLUMN]
+        with locked(self.path):
+            meta = self._read_meta()
+            self._finish_tail(meta)
+            n = meta["rows"]
+            last = self._read_column(meta, TIME_COLUMN, n - 1)[0] if n else None
+            if last is not None and ts < last:
+                raise ValueError(f"{TIME_COLUMN} {ts} is older than the last stored row ({last})")
+            self._add_columns(meta, row)
+            if last is not None and ts == last:
+                meta["tail"] = {name: _json_value(row.get(name, _fill_value(np.dtype(dt))), dt)
+                                for name, dt in meta["columns"].items()}
+                self._write_meta(meta)  # commit point
+                self._finish_tail(meta)
+                return "replace"
+            self._write_at(meta, row, n)
+            meta["rows"] = n + 1
+            self._write_meta(meta)  # commit point
+            return "append"
+
+    def extend(self, frame: pd.DataFrame) -> int:
+        """Append all rows of `frame` (strictly newer than the last stored row) in one commit.
+
+        Columns of the store missing from `frame` are filled with NaN / 0; extra
+        columns in `frame` are ignored. Returns the new row count.
+        """
+        times = frame[TIME_COLUMN].to_numpy(dtype="datetime64[s]")
+        if np.any(times[1:] <= times[:-1]):
+            raise ValueError(f"{TIME_COLUMN} must be strictly increasing")
+        with locked(self.path):
+            meta = self._read_meta()
+            self._finish_tail(meta)
+            n = meta["rows"]
+            if not len(frame):
+                return n
+            last = self._read_column(meta, TIME_COLUMN, n - 1)[0] if n else None
+            if last is not None and times[0] <= last:
+                raise ValueError(f"{TIME_COLUMN} {times[0]} is not newer than the last stored row ({last})")
+            for name, dt in meta["columns"].items():
+                dtype = np.dtype(dt)
+                values = (frame[name].to_numpy(dtype=dtype) if name in frame
+                          else np.full(len(frame), _fill_value(dtype), dtype=dtype))
+                with open(self._column_path(name), "r+b") as f:
+                    f.seek(n * dtype.itemsize)
+                    f.write(values.tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+            meta["rows"] = n + len(frame)
+            self._write_meta(meta)  # commit point
+            return meta["rows"]
+
+
+def migrate_csv(csv_path, store_path, schema: dict = SUMMARY_SCHEMA) -> HistoryStore:
+    """One-time conversion of `daily.csv` into a HistoryStore (rows sorted, one per date)."""
+    hist = pd.read_csv(csv_path)
+    hist[TIME_COLUMN] = pd.to_datetime(hist[TIME_COLUMN])
+    hist = hist.sort_values(TIME_COLUMN).drop_duplicates(TIME_COLUMN, keep="last")
+    store = HistoryStore.create(store_path, schema)
+    for name, dt in schema.items():
+        hist[name].to_numpy(dtype=np.dtype(dt)).tofile(store._column_path(name))
+    store._write_meta({"rows": len(hist), "columns": dict(schema)})
+    return store
+
+
+def open_history(store_path, legacy_csv=None, schema: dict = SUMMARY_SCHEMA) -> HistoryStore:
+    """The store at `store_path`, migrating `legacy_csv` into it the first time if there is one."""
+    store = HistoryStore(store_path)
+    if not store.exists():
+        if legacy_csv is not None and Path(legacy_csv).exists():
+            return migrate_csv(legacy_csv, store_path, schema)
+        return HistoryStore.create(store_path, schema)
+    return store
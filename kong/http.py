@@ -0,0 +1,149 @@
+# kong/http.py
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+CHUNK_SIZE = 1 << 20
+
+# parse(chunks, size) -> value; `size` is the body length in bytes, 0 if unknown
+Parser = Callable[[Iterable[bytes], int], Any]
+
+
+def make_session(retries: int = 3, backoff: float = 0.5, pool_size: int = 4) -> requests.Session:
+    """Keep-alive session with a connection pool and retry/backoff on transient errors."""
+    retry = Retry(total=retries, backoff_factor=backoff,
+                  status_forcelist=(429, 500, 502, 503, 504), allowed_methods=("GET",))
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get(session: requests.Session, url: str, parse: Parser | None = None, timeout: float = 30):
+    """Plain streamed GET through `session`, handed to `parse` (JSON by default)."""
+    with session.get(url, timeout=timeout, stream=True) as r:
+        r.raise_for_status()
+        return (parse or parse_json)(r.iter_content(chunk_size=CHUNK_SIZE),
+                                     int(r.headers.get("Content-Length") or 0))
+
+
+def fetch_concurrently(fetch: Callable[[str, Parser], Any], jobs: dict) -> tuple[dict, dict]:
+    """Run `fetch(url, parse)` for every `name: (url, parse)` in `jobs` at the same time.
+
+    Returns ({name: value}, {name: seconds}). The first failure is re-raised.
+    """
+    def timed(url, parse):
+        t0 = time.perf_counter()
+        value = fetch(url, parse)
+        return value, time.perf_counter() - t0
+
+    with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+        futures = {name: pool.submit(timed, url, parse) for name, (url, parse) in jobs.items()}
+        results = {name: fut.result() for name, fut in futures.items()}
+    return ({name: value for name, (value, _) in results.items()},
+            {name: elapsed for name, (_, elapsed) in results.items()})
+
+
+def parse_json(chunks: Iterable[bytes], size: int = 0):
+    return json.loads(b"".join(chunks))
+
+
+def _tee(chunks: Iterator[bytes], f) -> Iterator[bytes]:
+    for chunk in chunks:
+        f.write(chunk)
+        yield chunk
+
+
+def _read_file(path: Path) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        yield from iter(lambda: f.read(CHUNK_SIZE), b"")
+
+
+class ConditionalFetcher:
+    """GET with ETag / Last-Modified revalidation and an on-disk copy of the last body.
+
+    The last 200 response of every URL is kept in `cache_dir` with its
+    validators. The next fetch sends If-None-Match / If-Modified-Since; on a 304
+    the value parsed last time is returned as-is (or re-parsed from disk after
+    a restart) and nothing is downloaded.
+    """
+
+    def __init__(self, cache_dir, session=None, timeout: float = 30):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.session = session or make_session()
+        self.timeout = timeout
+        self.stats = {"hits": 0, "misses": 0, "bytes_saved": 0, "bytes_downloaded": 0}
+        self._parsed: dict[str, tuple[tuple, Any]] = {}  # url -> (validators, parsed value)
+        self._locks: dict[str, threading.Lock] = {}  # one writer per URL
+        self._locks_guard = threading.Lock()
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._locks_guard:
+            self.stats[key] += n
+
+    def _paths(self, url: str) -> tuple[Path, Path]:
+        key = hashlib.sha1(url.encode()).hexdigest()[:16]
+        return self.cache_dir / f"{key}.body", self.cache_dir / f"{key}.meta.json"
+
+    def fetch(self, url: str, parse: Parser | None = None):
+        with self._locks_guard:
+            lock = self._locks.setdefault(url, threading.Lock())
+        with lock:
+            return self._fetch(url, parse or parse_json)
+
+    def _fetch(self, url: str, parse: Parser):
+        body_path, meta_path = self._paths(url)
+        meta = json.loads(meta_path.read_text()) if meta_path.exists() and body_path.exists() else None
+        headers = {}
+        if meta:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        with self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as r:
+            if r.status_code == 304 and meta:
+                self._count("hits")
+                self._count("bytes_saved", meta["size"])
+                validators = (meta.get("etag"), meta.get("last_modified"), meta["size"])
+                cached = self._parsed.get(url)
+                if cached and cached[0] == validators:
+                    return cached[1]
+                value = parse(_read_file(body_path), meta["size"])
+            else:
+                r.raise_for_status()
+                self._count("misses")
+                value, meta = self._store(r, body_path, meta_path, parse)
+                validators = (meta.get("etag"), meta.get("last_modified"), meta["size"])
+        self._parsed[url] = (validators, value)
+        return value
+
+    def _store(self, r: requests.Response, body_path: Path, meta_path: Path, parse: Parser):
+        """Parse a 200 body while writing it to disk, then publish body + validators."""
+        tmp = body_path.with_suffix(".part")
+        with open(tmp, "wb") as f:
+            chunks = r.iter_content(chunk_size=CHUNK_SIZE)
+            value = parse(_tee(chunks, f), int(r.headers.get("Content-Length") or 0))
+            for chunk in chunks:  # the parser may stop before the last bytes
+                f.write(chunk)
+            size = f.tell()
+        self._count("bytes_downloaded", size)
+        meta = {"etag": r.headers.get("ETag"), "last_modified": r.headers.get("Last-Modified"), "size": size}
+        if meta["etag"] or meta["last_modified"]:
+            os.replace(tmp, body_path)
+            meta_tmp = meta_path.with_suffix(".part")
+            meta_tmp.write_text(json.dumps(meta))
+            os.replace(meta_tmp, meta_path)
+        else:  # nothing to revalidate with, don't keep it
+            tmp.unlink()
+        return value, meta
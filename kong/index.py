@@ -0,0 +1,45 @@
+# kong/index.py
+import numpy as np
+import pandas as pd
+
+
+class StakeIndex:
+    """Active stakes sorted ascending, built once per fetch.
+
+    Any stake range is a contiguous slice of the sorted array, so membership,
+    counts and sums for arbitrary cutoffs are two binary searches plus a
+    prefix-sum lookup, and top-N is a slice off the end. Nothing is copied.
+    """
+
+    def __init__(self, stakes, users):
+        stakes = np.asarray(stakes, dtype=np.float64)
+        order = np.argsort(stakes, kind="stable")
+        self.stakes = stakes[order]
+        self.users = np.asarray(users)[order]
+        self.cumsum = np.concatenate([[0.0], np.cumsum(self.stakes)])
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "StakeIndex":
+        """Index over the active (stake > 0) wallets of a parsed leaderboard."""
+        stakes = df["stakedAmount"].to_numpy(dtype=np.float64)
+        active = stakes > 0
+        return cls(stakes[active], df["user"].to_numpy()[active])
+
+    def __len__(self) -> int:
+        return len(self.stakes)
+
+    def bounds(self, lo: float | None = None, hi: float | None = None,
+               include_lo: bool = True, include_hi: bool = False) -> tuple[int, int]:
+        """Slice [i, j) of the sorted arrays holding stakes between `lo` and `hi`."""
+        i = 0 if lo is None else int(np.searchsorted(self.stakes, lo, side="left" if include_lo else "right"))
+        j = len(self.stakes) if hi is None else int(np.searchsorted(self.stakes, hi, side="right" if include_hi else "left"))
+        return i, max(i, j)
+
+    def total(self, i: int, j: int) -> float:
+        return float(self.cumsum[j] - self.cumsum[i])
+
+    def top(self, n: int, i: int = 0, j: int | None = None) -> pd.DataFrame:
+        """The `n` largest stakes inside slice [i, j), largest first (user, stakedAmount)."""
+        j = len(self.stakes) if j is None else j
+        k = max(i, j - n)
+        return pd.DataFrame({"user": self.users[k:j][::-1], "stakedAmount": self.stakes[k:j][::-1]})
@@ -0,0 +1,141 @@
+# kong/ingest.py
+# Streaming reader for the leaderboard export: the body is decoded a network
+# chunk at a time and records go straight into typed columns, so the full
+# text / list-of-dicts / DataFrame never coexist in memory.
+import codecs
+import json
+import logging
+import re
+from typing import Iterable, Iterator
+import numpy as np
+import pandas as pd
+
+from kong.leaderboard import leaderboard_frame
+from kong.wallets import ADDRESS_DTYPE, WalletDictionary, address_mask, pack_addresses
+
+log = logging.getLogger(__name__)
+
+_ARRAY_START = re.compile(r'"leaderboard"\s*:\s*\[')
+_SEPARATORS = " \t\r\n,"
+_decoder = json.JSONDecoder()
+
+
+def _split_records(buf: str) -> tuple[list, str, bool]:
+    """Decode the complete records at the front of `buf`.
+
+    Returns (records, unconsumed tail, array finished).
+    """
+    body = buf.lstrip(_SEPARATORS)
+    if body.startswith("]"):
+        return [], "", True
+    end = body.rfind("}")
+    if end < 0:
+        return [], body, False
+    try:
+        # fast path: records are flat objects, so everything up to the last "}"
+        # is a run of whole records and decodes in one C call
+        return json.loads("[" + body[:end + 1] + "]"), body[end + 1:], False
+    except json.JSONDecodeError:
+        pass
+    # slow path (nested values, or the closing "]}" is in this chunk)
+    records, pos = [], 0
+    while True:
+        while pos < len(body) and body[pos] in _SEPARATORS:
+            pos += 1
+        if pos < len(body) and body[pos] == "]":
+            return records, "", True
+        try:
+            rec, pos = _decoder.raw_decode(body, pos)
+        except json.JSONDecodeError:
+            return records, body[pos:], False
+        records.append(rec)
+
+
+def iter_leaderboard_batches(chunks: Iterable[bytes]) -> Iterator[list]:
+    """Yield the `leaderboard` records of an export body, one batch per chunk read."""
+    decode = codecs.getincrementaldecoder("utf-8")().decode
+    chunks = iter(chunks)
+    buf = ""
+    for chunk in chunks:
+        buf += decode(chunk)
+        m = _ARRAY_START.search(buf)
+        if m:
+            buf = buf[m.end():]
+            break
+        buf = buf[-64:]  # the key may straddle two chunks
+    else:
+        return  # no leaderboard in the payload
+
+    while True:
+        records, buf, done = _split_records(buf)
+        if records:
+            yield records
+        if done:
+            return
+        chunk = next(chunks, None)
+        if chunk is None:
+            raise ValueError("leaderboard export ended before the array was closed")
+        buf += decode(chunk)
+
+
+def read_leaderboard(chunks: Iterable[bytes], size_hint: int = 0,
+                     dictionary: WalletDictionary | None = None) -> pd.DataFrame:
+    """Streaming equivalent of `parse_leaderboard(json.loads(body)["leaderboard"])`.
+
+    `user` / `stakedAmount` are filled into preallocated arrays batch by batch
+    (grown by doubling). `size_hint` is the expected row count, e.g. derived
+    from Content-Length, to avoid regrowing.
+
+    With a `dictionary`, addresses are packed to 20 bytes as they arrive and
+    `user` comes back as int32 wallet IDs (decode with `dictionary.decode`);
+    no per-wallet Python string is kept. Rows whose `user` is not a 0x address
+    can't be packed: they are logged and skipped, the rest of the batch is kept.
+    """
+    capacity = max(size_hint, 1 << 12)
+    users = np.empty(capacity, dtype=object if dictionary is None else ADDRESS_DTYPE)
+    stakes = np.empty(capacity, dtype=np.float64)
+    n = 0
+    for batch in iter_leaderboard_batches(chunks):
+        batch_users = [rec.get("user") for rec in batch]
+        if dictionary is not None:
+            ok = address_mask(batch_users)
+            if not ok.all():
+                bad = [u for u, good in zip(batch_users, ok) if not good]
+                log.warning("skipping %d leaderboard rows with malformed addresses, e.g. %r", len(bad), bad[:3])
+                batch = [rec for rec, good in zip(batch, ok) if good]
+                batch_users = [u for u, good in zip(batch_users, ok) if good]
+        k = len(batch)
+        if n + k > capacity:
+            while n + k > capacity:
+                capacity *= 2
+            users = np.resize(users, capacity)
+            stakes = np.resize(stakes, capacity)
+        users[n:n + k] = batch_users if dictionary is None else pack_addresses(batch_users)
+        stakes[n:n + k] = pd.to_numeric(np.array([rec.get("stakedAmount") for rec in batch], dtype=object),
+                                        errors="coerce")
+        n += k
+    users = users[:n] if dictionary is None else dictionary.encode(users[:n])
+    return leaderboard_frame(users, stakes[:n])
+
+
+def read_leaderboard_body(chunks: Iterable[bytes], size: int = 0,
+                          dictionary: WalletDictionary | None = None) -> pd.DataFrame:
+    """`read_leaderboard` with the row hint taken from the body size (a `ConditionalFetcher` parser)."""
+    return read_leaderboard(chunks, size_hint=rows_hint(size), dictionary=dictionary)
+
+
+def rows_hint(content_length, bytes_per_row: int = 70) -> int:
+    """Rough row count of an export body from its Content-Length header (0 if unknown)."""
+    try:
+        return int(content_length) // bytes_per_row
+    except (TypeError, ValueError):
+        return 0
+
+
+def drop_malformed_users(df: pd.DataFrame) -> tuple[pd.DataFrame, list]:
+    """`df` without rows whose `user` is not a 0x address (they can't be dictionary-encoded
+    or hashed), and the users dropped. For frames read without a dictionary."""
+    ok = address_mask(df["user"])
+    if ok.all():
+        return df, []
+    return df[ok].reset_index(drop=True), df["user"][~ok].tolist()
@@ -0,0 +1,76 @@
+# kong/leaderboard.py
+import numpy as np
+import pandas as pd
+
+from kong.metrics import leaderboard_metrics
+from kong.tiers import N_TIERS, classify_tiers
+
+LEADERBOARD_COLUMNS = ["user", "stakedAmount", "tier"]
+
+
+def leaderboard_frame(users, stakes) -> pd.DataFrame:
+    """Typed leaderboard frame (user, stakedAmount, tier) from raw columns.
+
+    `users` is either addresses or int32 wallet IDs (kept as int32). Stakes
+    that failed to parse (NaN) count as 0. The export lists each wallet once;
+    repeats are dropped so downstream counts need no nunique().
+    """
+    stakes = np.asarray(stakes, dtype=np.float64)
+    stakes = np.where(np.isnan(stakes), 0.0, stakes)
+    if not (isinstance(users, np.ndarray) and users.dtype.kind == "i"):
+        users = pd.Series(users, dtype=object)  # strings stay object: no copy into a str column
+    df = pd.DataFrame({"user": users, "stakedAmount": stakes})
+    if df["user"].duplicated().any():
+        df = df.drop_duplicates("user", ignore_index=True)
+    df["tier"] = classify_tiers(df["stakedAmount"].to_numpy())
+    return df
+
+
+def parse_leaderboard(records) -> pd.DataFrame:
+    """Turn the export's `leaderboard` list into a typed frame (user, stakedAmount, tier)."""
+    if not records:
+        return pd.DataFrame(columns=LEADERBOARD_COLUMNS)
+    users = [rec.get("user") for rec in records]
+    stakes = pd.to_numeric(pd.Series([rec.get("stakedAmount") for rec in records]), errors="coerce")
+    return leaderboard_frame(users, stakes.to_numpy())
+
+
+def compute_metrics(df: pd.DataFrame) -> dict:
+    """`leaderboard_metrics` over a parsed frame (works on the empty frame too)."""
+    return leaderboard_metrics(df["stakedAmount"].to_numpy(dtype="float64"),
+                               df["tier"].to_numpy(dtype="int8"))
+
+
+def summary_metrics(df: pd.DataFrame, metrics: dict | None = None) -> dict:
+    """The per-wallet KPI columns of a `daily.csv` row. Zero-stake rows only feed `zero_stake_wallets`."""
+    m = metrics if metrics is not None else compute_metrics(df)
+    return {
+        "active_wallets": m["active_wallets"],
+        "median_stake": m["median_stake"],
+        "max_stake": m["max_stake"],
+        "zero_stake_wallets": m["zero_stake_wallets"],
+        **{f"tier{i}": int(m["tier_counts"][i]) for i in range(N_TIERS)},
+    }
+
+
+def tier_breakdown(metrics: dict) -> pd.DataFrame:
+    """Active wallets and KONG per tier (tiers with no wallets are left out)."""
+    out = pd.DataFrame({
+        "tier": range(N_TIERS),
+        "wallets": metrics["tier_counts"],
+        "total_kong": metrics["tier_sums"],
+    })
+    return out[out["wallets"] > 0].reset_index(drop=True)
+
+
+def snapshot_row(df: pd.DataFrame, summary: dict, snapshot_date, metrics: dict | None = None) -> dict:
+    """One history row for `snapshot_date` (date or timestamp): official totals from the
+    summary endpoint + leaderboard KPIs."""
+    m = metrics if metrics is not None else compute_metrics(df)
+    return {
+        "snapshot_date": snapshot_date,
+        "total_staked": float(summary.get("totalStaked", m["leaderboard_staked"])),
+        "tvl_usd": float(summary.get("tvlUsd", 0)),
+        "percentage_supply": float(summary.get("percentageOfCurrentSupply", 0.0)),
+        **summary_metrics(df, m),  # active_wallets .. tier4
+    }
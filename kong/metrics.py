@@ -0,0 +1,44 @@
+# kong/metrics.py
+import numpy as np
+
+from kong.tiers import N_TIERS
+
+ZERO_BUCKET = N_TIERS  # extra bucket for wallets listed with 0 staked
+
+
+def leaderboard_metrics(stakes, tiers) -> dict:
+    """Every leaderboard KPI from the parsed columns, without building any DataFrame.
+
+    Wallets are bucketed once (tier 0..4, plus a zero-stake bucket) and two
+    bincounts give per-tier counts and sums; median/max only look at the active
+    values. Assumes one row per wallet, which `parse_leaderboard` guarantees.
+    """
+    stakes = np.asarray(stakes, dtype=np.float64)
+    active = stakes > 0
+    bucket = np.where(active, tiers, ZERO_BUCKET)
+    counts = np.bincount(bucket, minlength=N_TIERS + 1)
+    sums = np.bincount(bucket, weights=stakes, minlength=N_TIERS + 1)
+
+    n_active = int(counts[:N_TIERS].sum())
+    if n_active:
+        values = stakes[active]  # our own copy, so partition it in place
+        mid = n_active // 2
+        if n_active % 2:
+            values.partition(mid)
+            median = float(values[mid])
+        else:
+            values.partition((mid - 1, mid))
+            median = float((values[mid - 1] + values[mid]) / 2)
+        max_stake = float(values.max())
+    else:
+        median = max_stake = 0.0
+
+    return {
+        "active_wallets": n_active,
+        "zero_stake_wallets": int(counts[ZERO_BUCKET]),
+        "median_stake": median,
+        "max_stake": max_stake,
+        "leaderboard_staked": float(sums[:N_TIERS].sum()),
+        "tier_counts": counts[:N_TIERS],
+        "tier_sums": sums[:N_TIERS],
+    }
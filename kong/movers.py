@@ -0,0 +1,89 @@
+# kong/movers.py
+# Which wallets moved between two leaderboard snapshots. Wallets are int32 IDs
+# into one dictionary, so the join on wallet ID is direct addressing: both
+# snapshots as dense stake-by-ID arrays (NaN = not listed), compared
+# elementwise. Linear in wallet count; the top gainers/losers are a partial
+# selection, not a sort of everyone.
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from kong.storage import replace_atomically
+from kong.tiers import classify_tiers
+
+MOVERS_COLUMNS = ["user", "kind", "before", "after", "change", "tier_before", "tier_after"]
+KINDS = ("new", "exited", "gainer", "loser", "tier_up", "tier_down")
+TOP_MOVERS = 100
+
+
+def _top(idx: np.ndarray, key: np.ndarray, n: int) -> np.ndarray:
+    """The `n` entries of `idx` with the largest `key`, largest first."""
+    if len(idx) > n:
+        keep = np.argpartition(-key, n - 1)[:n]
+        idx, key = idx[keep], key[keep]
+    return idx[np.argsort(-key, kind="stable")]
+
+
+def movers(before: np.ndarray, after: np.ndarray, top: int = TOP_MOVERS) -> pd.DataFrame:
+    """Changes between two dense stake-by-ID snapshots (`user` = wallet ID).
+
+    kinds: "new" stakers (nothing staked before, something now), "exited"
+    (fully unstaked or left the leaderboard), "gainer"/"loser" (the `top`
+    largest changes among wallets staked on both days) and "tier_up"/"tier_down"
+    (staked on both days, different tier). A wallet can appear under several kinds.
+    """
+    n = max(len(before), len(after))
+    b = np.zeros(n)
+    a = np.zeros(n)
+    b[:len(before)] = np.nan_to_num(before, nan=0.0)
+    a[:len(after)] = np.nan_to_num(after, nan=0.0)
+    was, now = b > 0, a > 0
+    change = a - b
+    tier_b, tier_a = classify_tiers(b), classify_tiers(a)
+    both = was & now
+
+    new = np.flatnonzero(~was & now)
+    exited = np.flatnonzero(was & ~now)
+    up = np.flatnonzero(both & (change > 0))
+    down = np.flatnonzero(both & (change < 0))
+    tier_up = np.flatnonzero(both & (tier_a > tier_b))
+    tier_down = np.flatnonzero(both & (tier_a < tier_b))
+    picks = {
+        "new": _top(new, a[new], len(new)),
+        "exited": _top(exited, b[exited], len(exited)),
+        "gainer": _top(up, change[up], top),
+        "loser": _top(down, -change[down], top),
+        "tier_up": _top(tier_up, change[tier_up], len(tier_up)),
+        "tier_down": _top(tier_down, -change[tier_down], len(tier_down)),
+    }
+    ids = np.concatenate(list(picks.values())).astype(np.int64)
+    return pd.DataFrame({
+        "user": ids,
+        "kind": np.repeat(list(picks), [len(v) for v in picks.values()]),
+        "before": b[ids],
+        "after": a[ids],
+        "change": change[ids],
+        "tier_before": tier_b[ids],
+        "tier_after": tier_a[ids],
+    })
+
+
+def movers_counts(table: pd.DataFrame) -> dict[str, int]:
+    return {kind: int(n) for kind, n in table["kind"].value_counts().reindex(KINDS, fill_value=0).items()}
+
+
+# ---- precomputed reports, one CSV per snapshot day (addresses decoded)
+def write_movers(directory, date: str, table: pd.DataFrame) -> Path:
+    path = Path(directory) / f"{date}.csv"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    replace_atomically(path, lambda f: f.write(table[MOVERS_COLUMNS].to_csv(index=False).encode()))
+    return path
+
+
+def movers_dates(directory) -> list[str]:
+    directory = Path(directory)
+    return sorted(p.stem for p in directory.glob("*.csv")) if directory.exists() else []
+
+
+def read_movers(directory, date: str) -> pd.DataFrame:
+    return pd.read_csv(Path(directory) / f"{date}.csv")
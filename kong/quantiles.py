@@ -0,0 +1,153 @@
+# kong/quantiles.py
+# KLL quantile sketch (Karnin, Lang & Liberty 2016) over stake values: a stack
+# of sorted-and-halved buffers, level h holding items that each stand for 2^h
+# values. It keeps about 3k items however many values go in, any quantile is a
+# binary search in them, and two sketches merge level by level, so a day's
+# sketch is a few KB on disk and percentile bands over history never need the
+# per-wallet data. Normalized rank error is within 1.65% at k = 200, the bound
+# published for KLL sketches of that size (99% confidence, any number of
+# updates or merges); tests/test_quantiles.py checks it against exact ranks.
+#
+#   quantiles/<date>.npz   one sketch per snapshot day (items, level sizes, n, min, max)
+import io
+from pathlib import Path
+import numpy as np
+
+from kong.storage import replace_atomically
+
+K = 200
+RANK_ERROR = 0.0165  # published bound on the normalized rank error at k = 200
+PERCENTILES = (10, 25, 75, 90, 99)  # stored next to the exact median_stake
+PERCENTILE_COLUMNS = [f"p{p}_stake" for p in PERCENTILES]
+
+
+class KLLSketch:
+    """Mergeable quantile sketch; feed it with `update`, ask with `quantile` / `rank`."""
+
+    def __init__(self, k: int = K, seed: int = 0):
+        self.k = k
+        self.n = 0
+        self.min = self.max = float("nan")
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+        self._cdf = None  # (sorted items, cumulative weights), built on the first query
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - 1 - level
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self) -> None:
+        """Halve the lowest over-full level into the next one until the sketch fits."""
+        while sum(map(len, self.levels)) > sum(self._capacity(h) for h in range(len(self.levels))):
+            h = next(h for h, items in enumerate(self.levels) if len(items) >= self._capacity(h))
+            if h + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            items = np.sort(self.levels[h])
+            odd = len(items) % 2  # an odd one out stays behind at this level
+            self.levels[h] = items[:odd]
+            self.levels[h + 1] = np.concatenate([self.levels[h + 1], items[odd + self._rng.integers(2)::2]])
+        self._cdf = None
+
+    def update(self, values) -> "KLLSketch":
+        """Add a batch of values (NaN ignored); a whole batch is compacted at once."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return self
+        self.n += len(values)
+        self.min = float(np.fmin(self.min, values.min()))
+        self.max = float(np.fmax(self.max, values.max()))
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        """Fold `other` (same k) into this sketch; the result summarizes both inputs."""
+        if other.k != self.k:
+            raise ValueError(f"cannot merge sketches with k={self.k} and k={other.k}")
+        if not other.n:
+            return self
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, items in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.n += other.n
+        self.min = float(np.fmin(self.min, other.min))
+        self.max = float(np.fmax(self.max, other.max))
+        self._compress()
+        return self
+
+    def _sorted(self) -> tuple[np.ndarray, np.ndarray]:
+        if self._cdf is None:
+            items = np.concatenate(self.levels)
+            weights = np.concatenate([np.full(len(items), 2 ** h, dtype=np.int64)
+                                      for h, items in enumerate(self.levels)])
+            order = np.argsort(items, kind="stable")
+            self._cdf = (items[order], np.cumsum(weights[order]))
+        return self._cdf
+
+    def quantile(self, q):
+        """Value at quantile(s) `q` in [0, 1]; q = 0 / 1 give the exact min / max. NaN if empty."""
+        q = np.asarray(q, dtype=np.float64)
+        if not self.n:
+            return np.full(q.shape, np.nan)[()]
+        items, cum = self._sorted()
+        i = np.minimum(np.searchsorted(cum, q * cum[-1], side="left"), len(items) - 1)
+        out = np.where(q <= 0, self.min, np.where(q >= 1, self.max, items[i]))
+        return out[()]
+
+    def rank(self, x):
+        """Approximate fraction of the values <= `x`."""
+        if not self.n:
+            return np.full(np.shape(x), np.nan)[()]
+        items, cum = self._sorted()
+        i = np.searchsorted(items, x, side="right")
+        return (np.where(i > 0, cum[np.maximum(i - 1, 0)], 0) / cum[-1])[()]
+
+    def percentiles(self, percentiles=PERCENTILES) -> dict:
+        """{"p<N>_stake": value} for the stored percentile columns."""
+        values = np.atleast_1d(self.quantile(np.asarray(percentiles) / 100))
+        return {f"p{p}_stake": float(v) for p, v in zip(percentiles, values)}
+
+    # ---- (de)serialization
+    def to_bytes(self) -> bytes:
+        buf = io.BytesIO()
+        np.savez_compressed(buf, items=np.concatenate(self.levels),
+                            sizes=np.array([len(items) for items in self.levels], dtype=np.int64),
+                            meta=np.array([self.k, self.n], dtype=np.int64),
+                            bounds=np.array([self.min, self.max]))
+        return buf.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "KLLSketch":
+        with np.load(io.BytesIO(data)) as npz:
+            k, n = (int(v) for v in npz["meta"])
+            sketch = cls(k)
+            sketch.n = n
+            sketch.min, sketch.max = (float(v) for v in npz["bounds"])
+            sketch.levels = np.split(npz["items"], np.cumsum(npz["sizes"])[:-1])
+        return sketch
+
+
+def stake_sketch(stakes, k: int = K) -> KLLSketch:
+    """Sketch of the active (> 0) stakes of one snapshot."""
+    stakes = np.asarray(stakes, dtype=np.float64)
+    return KLLSketch(k).update(stakes[stakes > 0])
+
+
+# ---- one sketch file per snapshot day
+def write_sketch(directory, date: str, sketch: KLLSketch) -> Path:
+    path = Path(directory) / f"{date}.npz"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = sketch.to_bytes()
+    replace_atomically(path, lambda f: f.write(data))
+    return path
+
+
+def sketch_dates(directory) -> list[str]:
+    directory = Path(directory)
+    return sorted(p.stem for p in directory.glob("*.npz")) if directory.exists() else []
+
+
+def read_sketch(directory, date: str) -> KLLSketch:
+    return KLLSketch.from_bytes((Path(directory) / f"{date}.npz").read_bytes())
@@ -0,0 +1,68 @@
+# kong/refresh.py
+import logging
+import threading
+import time
+from typing import Any, Callable
+
+log = logging.getLogger(__name__)
+
+
+class BackgroundRefresher:
+    """Stale-while-revalidate holder for an expensive upstream load.
+
+    `get()` always returns the last good value immediately. Once it is older
+    than `ttl` seconds, the first caller to notice starts one background reload
+    and everyone else keeps getting the current value until the new one is
+    swapped in (single-flight). Only the very first load blocks. A failed reload
+    keeps the old value, is logged and kept in `last_error` (cleared by the next
+    good load), and is retried on the next `get()`.
+
+    `load` is called with the current value (None the first time) and may return
+    it unchanged when nothing upstream changed; the version only moves when a
+    load returns a different object, so caches keyed on it survive such reloads.
+    """
+
+    def __init__(self, load: Callable[[Any], Any], ttl: float):
+        self._load = load
+        self.ttl = ttl
+        self._state: tuple[Any, float, int] | None = None  # (value, loaded_at, version), swapped whole
+        self._cold_lock = threading.Lock()
+        self._flight_lock = threading.Lock()
+        self._in_flight = False
+        self.last_error: Exception | None = None
+
+    def get(self):
+        return self.snapshot()[0]
+
+    def snapshot(self) -> tuple[Any, float, int]:
+        """(value, unix time it was loaded, version). Versions increase by one per load that changed the value."""
+        state = self._state
+        if state is None:
+            with self._cold_lock:  # concurrent cold starts share one load
+                if self._state is None:
+                    self._state = (self._load(None), time.time(), 1)
+                return self._state
+        if time.time() - state[1] > self.ttl:
+            self._refresh_in_background()
+        return state
+
+    def _refresh_in_background(self) -> None:
+        with self._flight_lock:
+            if self._in_flight:
+                return
+            self._in_flight = True
+        threading.Thread(target=self._reload, daemon=True, name="kong-refresh").start()
+
+    def _reload(self) -> None:
+        try:
+            value, _, version = self._state
+            new = self._load(value)
+            self._state = (new, time.time(), version if new is value else version + 1)
+            self.last_error = None
+        except Exception as e:  # keep serving the last good value
+            self.last_error = e
+            log.warning("background reload failed, serving data loaded %.0fs ago",
+                        time.time() - self._state[1], exc_info=True)
+        finally:
+            with self._flight_lock:
+                self._in_flight = False
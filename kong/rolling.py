@@ -0,0 +1,46 @@
+# kong/rolling.py
+# Rolling statistics over history columns, every column of the frame in one
+# batched pass per statistic: pandas' rolling aggregations (running sums and
+# min/max deques, O(rows) whatever the window) for the windowed stats, one
+# pandas ewm call for the EMA.
+import numpy as np
+import pandas as pd
+
+WINDOWS = (7, 30, 90)
+STATS = ("mean", "std", "min", "max", "ema", "pct_change")
+STAT_LABELS = {
+    "mean": "moving average",
+    "std": "rolling std",
+    "min": "rolling min",
+    "max": "rolling max",
+    "ema": "EMA",
+    "pct_change": "% change over window",
+}
+
+
+def rolling_stats(frame: pd.DataFrame, window: int, stats=STATS) -> dict[str, pd.DataFrame]:
+    """Each of `stats` over the trailing `window` rows, for all columns of `frame`.
+
+    Same conventions as pandas: mean/std (ddof=1)/min/max are NaN until a full
+    window is available (or if it holds a NaN), the EMA is `ewm(span=window,
+    adjust=False)`, and pct_change is the change (in percent) from the row
+    `window` rows earlier.
+    """
+    unknown = set(stats) - set(STATS)
+    if unknown:
+        raise ValueError(f"unknown statistics: {sorted(unknown)}")
+    floats = frame.astype(np.float64)
+    x = floats.to_numpy()
+    rolling = floats.rolling(window)
+    out = {}
+    for stat in stats:
+        if stat in ("mean", "std", "min", "max"):
+            values = getattr(rolling, stat)().to_numpy()
+        elif stat == "ema":
+            values = floats.ewm(span=window, adjust=False).mean().to_numpy()
+        else:  # pct_change
+            values = np.full_like(x, np.nan)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                values[window:] = (x[window:] / x[:-window] - 1.0) * 100.0
+        out[stat] = pd.DataFrame(values, index=frame.index, columns=frame.columns)
+    return out
@@ -0,0 +1,136 @@
+# kong/rollups.py
+# Summary snapshots at any cadence, plus hour / day / week rollups of them.
+#
+#   intraday/<YYYY-MM>/   every snapshot (sub-daily cadences), one HistoryStore
+#                         per month so a window only opens the months it covers
+#   hourly/ daily/ weekly/  one row per bucket, keyed by the bucket start
+#
+# A rollup row is the last snapshot of its bucket (the same "end of day" value
+# the daily job has always stored). Snapshots arrive in order, so keeping a
+# level current is one upsert: append when a bucket opens, replace the bucket's
+# row while it is still open. A level created after the fact is back-filled
+# from the next finer one.
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from kong.history import SUMMARY_SCHEMA, TIME_COLUMN, HistoryStore
+
+LEVELS = {"hour": "hourly", "day": "daily", "week": "weekly"}  # finest first -> directory
+DAY = pd.Timedelta(days=1)
+
+
+def bucket_starts(times, level: str) -> pd.DatetimeIndex:
+    """Start of the `level` bucket of each timestamp."""
+    times = pd.DatetimeIndex(times)
+    if level == "hour":
+        return times.floor("h")
+    if level == "day":
+        return times.normalize()
+    if level == "week":  # weeks start on Monday
+        return times.normalize() - pd.to_timedelta(times.weekday, unit="D")
+    raise ValueError(f"unknown rollup level {level!r}")
+
+
+def bucket_start(ts, level: str) -> pd.Timestamp:
+    return bucket_starts([ts], level)[0]
+
+
+def rollup(frame: pd.DataFrame, level: str) -> pd.DataFrame:
+    """Last row of each `level` bucket, keyed by the bucket start (`frame` sorted by time)."""
+    if frame.empty:
+        return frame
+    keys = bucket_starts(frame[TIME_COLUMN], level)
+    last = ~keys.duplicated(keep="last")
+    return frame[last].assign(**{TIME_COLUMN: keys[last]}).reset_index(drop=True)
+
+
+class PartitionedHistory:
+    """Raw snapshots in one HistoryStore per calendar month under `path`."""
+
+    def __init__(self, path, schema: dict = SUMMARY_SCHEMA):
+        self.path = Path(path)
+        self.schema = schema
+
+    def partitions(self) -> list[str]:
+        if not self.path.exists():
+            return []
+        return sorted(p.name for p in self.path.iterdir() if (p / "meta.json").exists())
+
+    def _partition(self, name: str) -> HistoryStore:
+        return HistoryStore(self.path / name)
+
+    def upsert(self, row: dict) -> str:
+        name = f"{pd.Timestamp(row[TIME_COLUMN]):%Y-%m}"
+        later = [p for p in self.partitions() if p > name]
+        if later:
+            raise ValueError(f"{TIME_COLUMN} {row[TIME_COLUMN]} is older than partition {later[-1]}")
+        store = self._partition(name)
+        if not store.exists():
+            HistoryStore.create(store.path, self.schema)
+        return store.upsert(row)
+
+    def load(self, start=None, end=None) -> pd.DataFrame:
+        """Snapshots with start <= time < end, opening only the months in range."""
+        lo = None if start is None else f"{pd.Timestamp(start):%Y-%m}"
+        hi = None if end is None else f"{pd.Timestamp(end):%Y-%m}"
+        parts = [self._partition(p).load() for p in self.partitions()
+                 if (lo is None or p >= lo) and (hi is None or p <= hi)]
+        if not parts:
+            return pd.DataFrame()
+        frame = pd.concat(parts, ignore_index=True)
+        times = frame[TIME_COLUMN]
+        keep = np.ones(len(frame), dtype=bool)
+        if start is not None:
+            keep &= (times >= pd.Timestamp(start)).to_numpy()
+        if end is not None:
+            keep &= (times < pd.Timestamp(end)).to_numpy()
+        return frame[keep].reset_index(drop=True)
+
+
+class Rollups:
+    """Raw snapshots under `root`/intraday plus the hourly/daily/weekly rollup stores."""
+
+    def __init__(self, root, schema: dict = SUMMARY_SCHEMA):
+        self.root = Path(root)
+        self.schema = schema
+        self.raw = PartitionedHistory(self.root / "intraday", schema)
+
+    def store(self, level: str) -> HistoryStore:
+        return HistoryStore(self.root / LEVELS[level])
+
+    def levels(self) -> list[str]:
+        """Levels that have a store, finest first."""
+        return [level for level in LEVELS if self.store(level).exists()]
+
+    def _open(self, level: str) -> HistoryStore:
+        """The level's store, created and back-filled from the next finer level if missing."""
+        store = self.store(level)
+        if store.exists():
+            return store
+        finer = list(LEVELS)[:list(LEVELS).index(level)]
+        source = next((self.store(s) for s in reversed(finer) if self.store(s).exists()), None)
+        if source is None:
+            return HistoryStore.create(store.path, self.schema)
+        # the source's schema, so columns added to it since (e.g. concentration) carry over
+        HistoryStore.create(store.path, {name: str(dt) for name, dt in source.schema.items()})
+        store.extend(rollup(source.load(), level))
+        return store
+
+    def add(self, row: dict, cadence: pd.Timedelta = DAY) -> dict[str, str]:
+        """Record one snapshot: raw (sub-daily cadences) and every level it rolls up to.
+
+        Returns {store: "append" | "replace"}.
+        """
+        if cadence > DAY or DAY % cadence:
+            raise ValueError(f"cadence must divide a day, got {cadence}")
+        ts = pd.Timestamp(row[TIME_COLUMN])
+        actions = {}
+        levels = list(LEVELS)
+        if cadence < DAY:
+            actions["intraday"] = self.raw.upsert(row)
+        else:
+            levels.remove("hour")
+        for level in levels:
+            actions[level] = self._open(level).upsert({**row, TIME_COLUMN: bucket_start(ts, level)})
+        return actions
@@ -0,0 +1,47 @@
+# kong/storage.py
+# Small file primitives shared by the on-disk stores.
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, a single writer is assumed
+    fcntl = None
+
+LOCK_FILE = ".lock"
+
+
+@contextmanager
+def locked(directory):
+    """Exclusive advisory lock on `directory`/.lock for the duration of the block.
+
+    Only serializes writers on the same host (e.g. an overlapping manual run);
+    separate CI runners are kept apart by the workflow's concurrency group.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    with open(directory / LOCK_FILE, "a") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def replace_atomically(path, write) -> None:
+    """Call `write(f)` on a temp file next to `path`, fsync it, then rename it over `path`."""
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def write_json_atomic(path, obj) -> None:
+    replace_atomically(path, lambda f: f.write(json.dumps(obj, indent=1).encode()))
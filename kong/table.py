@@ -0,0 +1,106 @@
+# kong/table.py
+import numpy as np
+import pandas as pd
+
+from kong.tiers import N_TIERS
+from kong.wallets import ADDRESS_BYTES, ADDRESS_DTYPE
+
+SORT_KEYS = ("stake", "tier")
+
+
+def address_prefix_range(prefix: str) -> tuple[bytes, bytes] | None:
+    """Smallest and largest packed address starting with hex `prefix` ('0x' optional).
+
+    None if the prefix is not hex.
+    """
+    digits = prefix.strip().lower()
+    digits = digits[2:] if digits.startswith("0x") else digits
+    if len(digits) > 2 * ADDRESS_BYTES or any(c not in "0123456789abcdef" for c in digits):
+        return None
+    width = 2 * ADDRESS_BYTES
+    return (bytes.fromhex(digits.ljust(width, "0")), bytes.fromhex(digits.ljust(width, "f")))
+
+
+class WalletTable:
+    """Every leaderboard row (zero-stake included) with orderings precomputed once per fetch.
+
+    Queries return only the positions of the requested page:
+      * stake order is one argsort; because tiers are stake ranges, a tier
+        filter or a tier sort is a handful of contiguous runs of that order;
+      * address prefix search is a binary search over the packed addresses
+        sorted once, so only the matching wallets are touched.
+    """
+
+    def __init__(self, stakes, tiers, packed_addresses):
+        self.stakes = np.asarray(stakes, dtype=np.float64)
+        self.tiers = np.asarray(tiers)
+        self.by_stake = np.argsort(self.stakes, kind="stable")  # ascending
+        # tier t occupies by_stake[tier_runs[t]:tier_runs[t + 1]]
+        self.tier_runs = np.searchsorted(self.tiers[self.by_stake], np.arange(N_TIERS + 1), side="left")
+        packed = np.asarray(packed_addresses, dtype=ADDRESS_DTYPE)
+        self.by_address = np.argsort(packed, kind="stable")
+        self.sorted_addresses = packed[self.by_address]
+
+    def __len__(self) -> int:
+        return len(self.stakes)
+
+    def _runs(self, tiers, sort: str, descending: bool) -> list[tuple[int, int, bool]]:
+        """Ordered (start, end, reversed) runs of `by_stake` making up the result."""
+        if sort == "stake":
+            # stake order, keeping only the selected tiers (each tier is one run)
+            order = range(N_TIERS - 1, -1, -1) if descending else range(N_TIERS)
+            return [(self.tier_runs[t], self.tier_runs[t + 1], descending) for t in order if t in tiers]
+        # tier order; largest stake first inside each tier
+        order = sorted(tiers, reverse=descending)
+        return [(self.tier_runs[t], self.tier_runs[t + 1], True) for t in order]
+
+    def _prefix_rows(self, prefix: str) -> np.ndarray:
+        bounds = address_prefix_range(prefix)
+        if bounds is None:
+            return np.empty(0, dtype=np.intp)
+        lo = np.searchsorted(self.sorted_addresses, np.array(bounds[0], dtype=ADDRESS_DTYPE), side="left")
+        hi = np.searchsorted(self.sorted_addresses, np.array(bounds[1], dtype=ADDRESS_DTYPE), side="right")
+        return self.by_address[lo:hi]
+
+    def count(self, prefix: str = "", tiers=range(N_TIERS)) -> int:
+        """Number of rows matching the search and tier filter (sort does not matter)."""
+        if prefix.strip():
+            rows = self._prefix_rows(prefix)
+            return int(np.isin(self.tiers[rows], list(tiers)).sum())
+        return int(sum(self.tier_runs[t + 1] - self.tier_runs[t] for t in set(tiers)))
+
+    def query(self, prefix: str = "", tiers=range(N_TIERS), sort: str = "stake",
+              descending: bool = True, page: int = 0, page_size: int = 50) -> tuple[np.ndarray, int]:
+        """Row positions of page `page` (0-based) and the total number of matching rows."""
+        if sort not in SORT_KEYS:
+            raise ValueError(f"sort must be one of {SORT_KEYS}, got {sort!r}")
+        tiers = set(tiers)
+        start, stop = page * page_size, (page + 1) * page_size
+
+        if prefix.strip():
+            rows = self._prefix_rows(prefix)
+            rows = rows[np.isin(self.tiers[rows], list(tiers))]
+            stakes, tiers = self.stakes[rows], self.tiers[rows].astype(np.int64)
+            if sort == "stake":
+                rows = rows[np.argsort(-stakes if descending else stakes, kind="stable")]
+            else:
+                rows = rows[np.lexsort((-stakes, -tiers if descending else tiers))]
+            return rows[start:stop], len(rows)
+
+        runs = self._runs(tiers, sort, descending)
+        total = int(sum(end - begin for begin, end, _ in runs))
+        out, offset = [], 0
+        for begin, end, rev in runs:  # cut the page out of the runs without materializing them
+            length = end - begin
+            lo, hi = max(start - offset, 0), min(stop - offset, length)
+            if lo < hi:
+                run = self.by_stake[begin:end]
+                out.append(run[::-1][lo:hi] if rev else run[lo:hi])
+            offset += length
+            if offset >= stop:
+                break
+        return (np.concatenate(out) if out else np.empty(0, dtype=np.intp)), total
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, packed_addresses) -> "WalletTable":
+        return cls(df["stakedAmount"].to_numpy(), df["tier"].to_numpy(), packed_addresses)
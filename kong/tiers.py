@@ -0,0 +1,25 @@
+# kong/tiers.py
+from bisect import bisect_right
+import numpy as np
+
+# Lower bound (inclusive) of tiers 1..4; anything below 25k is tier 0.
+TIER_BOUNDS = np.array([25_000, 62_500, 125_000, 250_000], dtype=np.float64)
+N_TIERS = len(TIER_BOUNDS) + 1
+TIER_DTYPE = np.int8
+_BOUNDS_LIST = TIER_BOUNDS.tolist()
+
+
+def classify_tier(x: float) -> int:
+    """Scalar tier lookup, kept for one-off values (labels, tooltips)."""
+    return bisect_right(_BOUNDS_LIST, x)
+
+
+def classify_tiers(values) -> np.ndarray:
+    """Classify a whole stake column at once.
+
+    Same boundaries as `classify_tier` (x < 25k -> 0, ..., x >= 250k -> 4) but a
+    single binary search per value in C instead of a Python call per wallet.
+    Returns an int8 array.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    return np.searchsorted(TIER_BOUNDS, values, side="right").astype(TIER_DTYPE, copy=False)
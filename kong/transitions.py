@@ -0,0 +1,78 @@
+# kong/transitions.py
+# Tier-to-tier flows between consecutive snapshot days. States are tiers 0-4
+# plus "unstaked" (listed with 0 KONG, or not on the leaderboard); a day's 6x6
+# matrix counts wallets by (state yesterday, state today) with one bincount.
+#
+# The store keeps the running total of those matrices (one int64 column per
+# cell), so the flows over any date range are one subtraction of two stored
+# rows, however many years the range spans.
+import numpy as np
+import pandas as pd
+
+from kong.history import TIME_COLUMN, HistoryStore
+from kong.tiers import N_TIERS, classify_tiers
+
+UNSTAKED = N_TIERS
+N_STATES = N_TIERS + 1
+STATE_LABELS = [f"Tier {t}" for t in range(N_TIERS)] + ["Unstaked"]
+CELLS = [f"c{a}{b}" for a in range(N_STATES) for b in range(N_STATES)]
+TRANSITIONS_SCHEMA = {TIME_COLUMN: "datetime64[s]", **{cell: "int64" for cell in CELLS}}
+
+
+def tier_states(stakes: np.ndarray) -> np.ndarray:
+    """Tier per wallet, UNSTAKED where nothing is staked (0 or NaN = not listed)."""
+    stakes = np.nan_to_num(np.asarray(stakes, dtype=np.float64), nan=0.0)
+    return np.where(stakes > 0, classify_tiers(stakes), UNSTAKED).astype(np.int8)
+
+
+def transition_matrix(before: np.ndarray, after: np.ndarray) -> np.ndarray:
+    """(N_STATES, N_STATES) counts of wallets by (state before, state after).
+
+    `before` / `after` are dense stake-by-wallet-ID arrays (NaN = not listed);
+    only wallets listed on at least one of the two days are counted.
+    """
+    n = max(len(before), len(after))
+    b = np.full(n, np.nan)
+    a = np.full(n, np.nan)
+    b[:len(before)] = before
+    a[:len(after)] = after
+    listed = ~(np.isnan(b) & np.isnan(a))
+    codes = tier_states(b[listed]).astype(np.int64) * N_STATES + tier_states(a[listed])
+    return np.bincount(codes, minlength=N_STATES * N_STATES).reshape(N_STATES, N_STATES)
+
+
+class TransitionHistory:
+    """Running totals of the daily transition matrices, keyed by the later day."""
+
+    def __init__(self, path):
+        self.store = HistoryStore(path)
+
+    def _total_at(self, row: int) -> np.ndarray:
+        """Running total after stored row `row` (zeros before the first row)."""
+        if row < 0:
+            return np.zeros((N_STATES, N_STATES), dtype=np.int64)
+        frame = self.store.load(row, row + 1)
+        return frame[CELLS].to_numpy(dtype=np.int64).reshape(N_STATES, N_STATES)
+
+    def add(self, date, matrix: np.ndarray) -> str:
+        """Record `date`'s matrix; a re-run for the last stored date replaces it."""
+        if not self.store.exists():
+            HistoryStore.create(self.store.path, TRANSITIONS_SCHEMA)
+        ts = np.datetime64(pd.Timestamp(date), "s")
+        n = self.store.rows
+        last = self.store.last_time()
+        before = n - 2 if last is not None and ts == last else n - 1
+        total = self._total_at(before) + np.asarray(matrix, dtype=np.int64)
+        return self.store.upsert({TIME_COLUMN: ts, **dict(zip(CELLS, total.ravel().tolist()))})
+
+    def dates(self) -> np.ndarray:
+        return self.store.column(TIME_COLUMN) if self.store.exists() else np.empty(0, "datetime64[s]")
+
+    def total(self, start=None, end=None) -> np.ndarray:
+        """Summed matrix of the days in [start, end] (inclusive; None = open-ended)."""
+        times = self.dates()
+        i = 0 if start is None else int(np.searchsorted(times, np.datetime64(pd.Timestamp(start), "s"), "left"))
+        j = len(times) if end is None else int(np.searchsorted(times, np.datetime64(pd.Timestamp(end), "s"), "right"))
+        if j <= i:
+            return np.zeros((N_STATES, N_STATES), dtype=np.int64)
+        return self._total_at(j - 1) - self._total_at(i - 1)
@@ -0,0 +1,110 @@
+# kong/wallet_history.py
+# Full per-wallet leaderboard for every snapshot day, kept small enough to live
+# in git: wallets are int32 IDs into a shared 20-byte address dictionary, and
+# each day stores only the wallets whose stake changed since the day before.
+# Every `keyframe_every` days a full copy bounds the work to rebuild any day.
+#
+#   dictionary.bin        20-byte addresses, ID = position (append-only)
+#   days/<date>.npz       ids (int32) + stakes (float64), compressed;
+#                         "full" days list every wallet, "delta" days list
+#                         changes only (NaN stake = wallet left the leaderboard)
+#   manifest.json         committed dictionary size + ordered list of days
+import io
+import json
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from kong.storage import locked, replace_atomically, write_json_atomic
+from kong.wallets import ID_DTYPE, WalletDictionary
+
+KEYFRAME_EVERY = 30
+
+
+class WalletHistory:
+    """Per-wallet daily snapshots, dictionary-encoded and delta-compressed."""
+
+    def __init__(self, path, keyframe_every: int = KEYFRAME_EVERY):
+        self.path = Path(path)
+        self.keyframe_every = keyframe_every
+        self._manifest_path = self.path / "manifest.json"
+
+    def _manifest(self) -> dict:
+        if not self._manifest_path.exists():
+            return {"wallets": 0, "days": []}
+        return json.loads(self._manifest_path.read_text())
+
+    def _day_path(self, date: str) -> Path:
+        return self.path / "days" / f"{date}.npz"
+
+    def dates(self) -> list[str]:
+        return [day["date"] for day in self._manifest()["days"]]
+
+    def dictionary(self, manifest: dict | None = None) -> WalletDictionary:
+        manifest = manifest or self._manifest()
+        return WalletDictionary(self.path / "dictionary.bin", size=manifest["wallets"])
+
+    # ---- reads
+    def _read_day(self, date: str) -> tuple[np.ndarray, np.ndarray]:
+        with np.load(self._day_path(date)) as npz:
+            return npz["ids"], npz["stakes"]
+
+    def _state(self, days: list, upto: int, n_wallets: int) -> np.ndarray:
+        """Dense stake per wallet ID as of days[upto] (NaN = not on the leaderboard)."""
+        start = max(i for i in range(upto + 1) if days[i]["kind"] == "full")
+        state = np.full(n_wallets, np.nan)
+        for day in days[start:upto + 1]:  # the keyframe, then its deltas
+            ids, stakes = self._read_day(day["date"])
+            state[ids] = stakes
+        return state
+
+    def state(self, date: str) -> np.ndarray:
+        """Dense stake array indexed by wallet ID for `date` (NaN = not listed)."""
+        manifest = self._manifest()
+        days = manifest["days"]
+        idx = [d["date"] for d in days].index(date)
+        return self._state(days, idx, manifest["wallets"])
+
+    def load(self, date: str) -> pd.DataFrame:
+        """That day's full leaderboard (user, stakedAmount), in wallet-ID order."""
+        manifest = self._manifest()
+        state = self.state(date)
+        ids = np.flatnonzero(~np.isnan(state))
+        return pd.DataFrame({"user": self.dictionary(manifest).decode(ids), "stakedAmount": state[ids]})
+
+    # ---- writes
+    def write(self, date: str, users, stakes) -> str:
+        """Store `date`'s leaderboard; a re-run for the last stored date replaces it.
+
+        Returns "full" or "delta".
+        """
+        stakes = np.asarray(stakes, dtype=np.float64)
+        with locked(self.path):
+            manifest = self._manifest()
+            days = [d for d in manifest["days"] if d["date"] != date]
+            if days and days[-1]["date"] > date:
+                raise ValueError(f"{date} is older than the last stored day ({days[-1]['date']})")
+
+            dictionary = self.dictionary(manifest)
+            ids = dictionary.encode(users)
+            current = np.full(len(dictionary), np.nan)
+            current[ids] = stakes
+
+            since_full = next((i for i, d in enumerate(reversed(days)) if d["kind"] == "full"), None)
+            if since_full is None or since_full + 1 >= self.keyframe_every:
+                kind, out_ids = "full", np.flatnonzero(~np.isnan(current))
+            else:
+                previous = self._state(days, len(days) - 1, len(dictionary))
+                same = (current == previous) | (np.isnan(current) & np.isnan(previous))
+                kind, out_ids = "delta", np.flatnonzero(~same)
+
+            buf = io.BytesIO()
+            np.savez_compressed(buf, ids=out_ids.astype(ID_DTYPE), stakes=current[out_ids])
+            self._day_path(date).parent.mkdir(parents=True, exist_ok=True)
+            replace_atomically(self._day_path(date), lambda f: f.write(buf.getvalue()))
+            # dictionary first, manifest last: the manifest is the commit point
+            write_json_atomic(self._manifest_path, {
+                "wallets": dictionary.save(),
+                "days": days + [{"date": date, "kind": kind, "rows": int(len(out_ids))}],
+            })
+        return kind
@@ -0,0 +1,128 @@
+# kong/wallets.py
+# Wallet addresses as fixed-width 20-byte binary and a persistent, append-only
+# address -> int32 ID dictionary (ID = position in the file).
+import os
+import threading
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+ADDRESS_BYTES = 20
+ADDRESS_DTYPE = np.dtype(f"S{ADDRESS_BYTES}")
+ID_DTYPE = np.int32
+_HEX = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+
+
+def _nibble_table() -> np.ndarray:
+    table = np.full(256, 255, dtype=np.uint8)
+    table[np.frombuffer(b"0123456789abcdef", dtype=np.uint8)] = np.arange(16)
+    table[np.frombuffer(b"ABCDEF", dtype=np.uint8)] = np.arange(10, 16)
+    return table
+
+
+_NIBBLE = _nibble_table()
+
+
+def _is_address(u) -> bool:
+    return (isinstance(u, str) and len(u) == 2 + 2 * ADDRESS_BYTES and u[:2] in ("0x", "0X")
+            and all(c in "0123456789abcdefABCDEF" for c in u[2:]))
+
+
+def address_mask(users) -> np.ndarray:
+    """True where an entry is a '0x' + 40 hex address (what `pack_addresses` accepts)."""
+    users = list(users)
+    width = 2 + 2 * ADDRESS_BYTES
+    try:
+        lengths = np.fromiter(map(len, users), dtype=np.int64, count=len(users))
+        if (lengths == width).all():
+            chars = np.frombuffer("".join(users).encode("ascii"), dtype=np.uint8).reshape(-1, width)
+            return ((chars[:, 0] == ord("0")) & ((chars[:, 1] | 0x20) == ord("x"))
+                    & (_NIBBLE[chars[:, 2:]] != 255).all(axis=1))
+    except (TypeError, ValueError):  # non-str / non-ascii
+        pass
+    return np.fromiter(map(_is_address, users), dtype=bool, count=len(users))
+
+
+def pack_addresses(users) -> np.ndarray:
+    """'0x' + 40 hex chars -> 20 raw bytes each (dtype S20). Case-insensitive."""
+    users = list(users)
+    width = 2 + 2 * ADDRESS_BYTES
+    if not users:
+        return np.empty(0, dtype=ADDRESS_DTYPE)
+    try:
+        lengths = np.fromiter(map(len, users), dtype=np.int64, count=len(users))
+        chars = np.frombuffer("".join(users).encode("ascii"), dtype=np.uint8).reshape(-1, width)
+        nibbles = _NIBBLE[chars[:, 2:]]
+        ok = ((lengths == width) & (chars[:, 0] == ord("0")) & ((chars[:, 1] | 0x20) == ord("x"))
+              & (nibbles != 255).all(axis=1))
+    except (TypeError, ValueError):  # non-str / non-ascii / wrong total length
+        ok = None
+    if ok is None or not ok.all():
+        bad = next(u for u in users if not _is_address(u))
+        raise ValueError(f"not a 0x-prefixed 20-byte hex address: {bad!r}")
+    packed = (nibbles[:, 0::2] << 4) | nibbles[:, 1::2]
+    return packed.view(ADDRESS_DTYPE).ravel()
+
+
+def unpack_addresses(packed: np.ndarray) -> np.ndarray:
+    """Inverse of `pack_addresses`: lowercase '0x...' strings (object array)."""
+    b = np.ascontiguousarray(packed, dtype=ADDRESS_DTYPE).view(np.uint8).reshape(-1, ADDRESS_BYTES)
+    out = np.empty((len(b), 2 + 2 * ADDRESS_BYTES), dtype=np.uint8)
+    out[:, 0], out[:, 1] = ord("0"), ord("x")
+    out[:, 2::2] = _HEX[b >> 4]
+    out[:, 3::2] = _HEX[b & 15]
+    return out.view(f"S{out.shape[1]}").ravel().astype(str).astype(object)
+
+
+class WalletDictionary:
+    """Append-only address dictionary backed by a flat file of 20-byte records."""
+
+    def __init__(self, path, size: int | None = None):
+        self.path = Path(path)
+        # `size` pins the dictionary to a committed length (bytes past it are ignored)
+        raw = self.path.read_bytes() if self.path.exists() else b""
+        n = len(raw) // ADDRESS_BYTES if size is None else size
+        self.addresses = np.frombuffer(raw[:n * ADDRESS_BYTES], dtype=ADDRESS_DTYPE)
+        self._index = pd.Index(self.addresses)
+        self._saved = len(self.addresses)
+        self._lock = threading.Lock()  # encode/save may run on a background fetch
+
+    def __len__(self) -> int:
+        return len(self.addresses)
+
+    def lookup(self, packed: np.ndarray) -> np.ndarray:
+        """IDs of already known addresses, -1 for unknown ones."""
+        return self._index.get_indexer(packed).astype(ID_DTYPE)
+
+    def encode(self, users) -> np.ndarray:
+        """int32 IDs for `users` (addresses or packed S20), adding unseen ones."""
+        packed = users if getattr(users, "dtype", None) == ADDRESS_DTYPE else pack_addresses(users)
+        with self._lock:
+            ids = self.lookup(packed)
+            missing = ids < 0
+            if missing.any():
+                new = pd.unique(packed[missing])
+                self._index = pd.Index(np.concatenate([self.addresses, new]))
+                self.addresses = np.concatenate([self.addresses, new])
+                ids[missing] = self._index.get_indexer(packed[missing])
+        return ids
+
+    def decode(self, ids) -> np.ndarray:
+        return unpack_addresses(self.addresses[np.asarray(ids)])
+
+    def save(self) -> int:
+        """Append addresses added since load/last save; returns the committed size."""
+        with self._lock:
+            return self._save()
+
+    def _save(self) -> int:
+        if len(self.addresses) > self._saved:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "r+b" if self.path.exists() else "wb") as f:
+                f.seek(self._saved * ADDRESS_BYTES)
+                f.write(self.addresses[self._saved:].tobytes())
+                f.truncate()
+                f.flush()
+                os.fsync(f.fileno())
+            self._saved = len(self.addresses)
+        return self._saved
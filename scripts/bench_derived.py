@@ -0,0 +1,46 @@
+# scripts/bench_derived.py
+# Day-over-day / 7-day MA columns: recomputing them over the whole history on
+# every load (old load_daily_history) vs the stored, incrementally extended
+# derived store (tests/test_derived.py checks they are identical).
+#   python scripts/bench_derived.py
+import tempfile
+import time
+from pathlib import Path
+import pandas as pd
+
+from benchkit import best_of, synthetic_history
+from kong.derived import DOD_COLUMNS, MA_COLUMNS, DerivedHistory
+from kong.history import SUMMARY_SCHEMA, TIME_COLUMN, HistoryStore
+
+
+def full_recompute(store: HistoryStore) -> pd.DataFrame:
+    # what load_daily_history did on every cache expiry
+    hist = store.load()
+    for col in DOD_COLUMNS:
+        hist[f"{col}_dod"] = hist[col].diff()
+    for col in MA_COLUMNS:
+        hist[f"{col}_7dma"] = hist[col].rolling(7).mean()
+    return hist
+
+
+def next_row(store: HistoryStore, scale: float) -> dict:
+    row = store.load(store.rows - 1).iloc[0].to_dict()
+    row[TIME_COLUMN] += pd.Timedelta(days=1)
+    row["total_staked"] *= scale
+    return row
+
+
+print(f"{'rows':>9} {'full (ms)':>10} {'load (ms)':>10} {'update 1 day (ms)':>18}")
+with tempfile.TemporaryDirectory() as tmp:
+    for rows in (365, 365 * 10, 365 * 50):
+        store = HistoryStore.create(Path(tmp) / f"daily_{rows}", SUMMARY_SCHEMA)
+        store.extend(synthetic_history(rows))
+        derived = DerivedHistory(store, Path(tmp) / f"derived_{rows}")
+        derived.update()
+        store.upsert(next_row(store, 1.01))  # one day behind, as between job and app
+        t_full = best_of(lambda store=store: full_recompute(store))
+        t_load = best_of(derived.load)
+        t0 = time.perf_counter()
+        derived.update()
+        t_update = time.perf_counter() - t0
+        print(f"{store.rows:>9,} {t_full * 1e3:>10.2f} {t_load * 1e3:>10.2f} {t_update * 1e3:>18.2f}")
@@ -0,0 +1,70 @@
+# scripts/bench_distinct.py
+# HyperLogLog wallet sketches against exact distinct counts:
+#   - single sketches from 10 to 1M random addresses, many trials each: bias
+#     and RMS error vs the 1.04 / sqrt(m) standard error
+#   - 90 days of a churning leaderboard: unions over the last 7/30/90 days
+#     (read back from the per-day files) vs the exact union
+#   - sketching vs an exact nunique()
+# tests/test_distinct.py asserts the error bounds.
+#   python scripts/bench_distinct.py
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+from benchkit import timed
+from kong.distinct import P, HyperLogLog, union, wallet_sketches, write_sketches
+from kong.wallets import ADDRESS_DTYPE, unpack_addresses
+
+SIGMA = 1.04 / np.sqrt(1 << P)
+rng = np.random.default_rng(0)
+
+
+def random_addresses(n: int) -> np.ndarray:
+    return rng.integers(0, 256, (n, 20), dtype=np.uint8).view(ADDRESS_DTYPE).ravel()
+
+
+def report(errors, label: str) -> None:
+    errors = np.asarray(errors)
+    rms = float(np.sqrt(np.mean(errors ** 2)))
+    print(f"{label:>24} {np.mean(errors):>+9.4f} {rms:>8.4f} {np.max(np.abs(errors)):>8.4f}")
+
+
+print(f"p = {P}: {1 << P:,} registers, standard error {SIGMA:.4f}")
+print(f"{'':>24} {'bias':>9} {'rms':>8} {'max':>8}")
+for n, trials in ((10, 200), (1_000, 200), (10_000, 100), (50_000, 100), (200_000, 60), (1_000_000, 40)):
+    errors = [HyperLogLog().add_addresses(random_addresses(n)).count() / n - 1 for _ in range(trials)]
+    report(errors, f"{n:,} wallets x {trials}")
+
+# ---- a churning leaderboard: ~5% of yesterday's wallets leave, new ones join
+with tempfile.TemporaryDirectory() as tmp:
+    pool = random_addresses(60_000)
+    current = rng.choice(len(pool) // 2, 20_000, replace=False)
+    next_new = len(pool) // 2
+    days = pd.date_range("2026-07-22", periods=90, freq="D").strftime("%Y-%m-%d").tolist()
+    seen: list[np.ndarray] = []
+    for date in days:
+        keep = current[rng.random(len(current)) > 0.05]
+        current = np.concatenate([keep, np.arange(next_new, next_new + 300)])
+        next_new += 300
+        stakes = np.where(rng.random(len(current)) < 0.97, rng.lognormal(8, 2, len(current)), 0.0)
+        write_sketches(tmp, date, wallet_sketches(pool[current], stakes))
+        seen.append(current[stakes > 0])
+    errors = []
+    for window in (1, 7, 30, 90):
+        exact = len(np.unique(np.concatenate(seen[-window:])))
+        t0 = time.perf_counter()
+        estimate = union(tmp, days[-window:], "active").count()
+        t_union = time.perf_counter() - t0
+        errors.append(estimate / exact - 1)
+        print(f"{'last ' + str(window) + ' days':>24} exact {exact:>7,} estimate {estimate:>9,.0f} "
+              f"({errors[-1]:+.4f}, {t_union * 1e3:.1f} ms)")
+    report(errors, "range unions")
+
+# ---- cost vs an exact nunique over address strings
+addresses = random_addresses(1_000_000)
+users = pd.Series(unpack_addresses(addresses))
+t_exact, exact = timed(users.nunique, repeat=1)
+t_hll, estimate = timed(lambda: HyperLogLog().add_addresses(addresses).count(), repeat=1)
+print(f"1M wallets: nunique {t_exact * 1e3:.0f} ms, sketch {t_hll * 1e3:.0f} ms "
+      f"({estimate / exact - 1:+.4f}), {1 << P:,} bytes per sketch")
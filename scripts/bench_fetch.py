@@ -0,0 +1,56 @@
+# scripts/bench_fetch.py
+# Full download + parse vs a 304 revalidation of the leaderboard export, with
+# ConditionalFetcher against a local stub that answers If-None-Match with 304
+# (tests/test_http.py covers the behaviour).
+#   python scripts/bench_fetch.py [rows]
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchkit import export_body
+from kong.http import ConditionalFetcher
+from kong.ingest import read_leaderboard_body
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    body = b""
+
+    def do_GET(self):
+        fresh = self.headers.get("If-None-Match") == '"v1"'
+        self.send_response(304 if fresh else 200)
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", "0" if fresh else str(len(self.body)))
+        self.end_headers()
+        if not fresh:
+            self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+
+def fetch(fetcher: ConditionalFetcher) -> float:
+    t0 = time.perf_counter()
+    fetcher.fetch(url, read_leaderboard_body)
+    return time.perf_counter() - t0
+
+
+rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+url = f"http://127.0.0.1:{server.server_port}/leaderboard/export"
+Handler.body = export_body(rows, seed=0)
+
+with tempfile.TemporaryDirectory() as tmp:
+    fetcher = ConditionalFetcher(tmp)
+    t_200 = fetch(fetcher)
+    t_304 = fetch(fetcher)
+    t_disk = fetch(ConditionalFetcher(tmp))  # a restart: nothing parsed in memory yet
+
+server.shutdown()
+print(f"{rows:,} rows, {len(Handler.body) / 2**20:.1f} MiB export")
+print(f"  200 download + parse  {t_200 * 1e3:8.1f} ms")
+print(f"  304, parsed in memory {t_304 * 1e3:8.1f} ms")
+print(f"  304, re-parse on disk {t_disk * 1e3:8.1f} ms")
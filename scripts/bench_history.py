@@ -0,0 +1,39 @@
+# scripts/bench_history.py
+# Load time of the columnar history store vs the old daily.csv read, at 10 and
+# 50 years of daily rows and at hourly granularity.
+#   python scripts/bench_history.py
+import tempfile
+from pathlib import Path
+import pandas as pd
+
+from benchkit import best_of, synthetic_history
+from kong.history import TIME_COLUMN, HistoryStore, migrate_csv
+
+
+def load_csv(path: Path) -> pd.DataFrame:
+    # what load_daily_history did before the store
+    hist = pd.read_csv(path)
+    hist[TIME_COLUMN] = pd.to_datetime(hist[TIME_COLUMN])
+    return hist.sort_values(TIME_COLUMN).reset_index(drop=True)
+
+
+cases = [("10y daily", 365 * 10, "D"), ("50y daily", 365 * 50, "D"),
+         ("10y hourly", 24 * 365 * 10, "h"), ("50y hourly", 24 * 365 * 50, "h")]
+
+print(f"{'case':>11} {'rows':>9} {'csv (ms)':>9} {'store (ms)':>11} {'speedup':>8} {'csv MiB':>8} {'store MiB':>10}")
+with tempfile.TemporaryDirectory() as tmp:
+    for label, rows, step in cases:
+        csv_path = Path(tmp) / f"{label}.csv"
+        store_path = Path(tmp) / label.replace(" ", "_")
+        hist = synthetic_history(rows, step)
+        hist.assign(**{TIME_COLUMN: hist[TIME_COLUMN].dt.strftime("%Y-%m-%d %H:%M:%S")}).to_csv(csv_path, index=False)
+        migrate_csv(csv_path, store_path)
+        store = HistoryStore(store_path)
+        assert store.load().drop(columns=TIME_COLUMN).equals(load_csv(csv_path).drop(columns=TIME_COLUMN))
+
+        t_csv = best_of(lambda csv_path=csv_path: load_csv(csv_path))
+        t_store = best_of(store.load)
+        csv_mib = csv_path.stat().st_size / 2**20
+        store_mib = sum(p.stat().st_size for p in store_path.iterdir()) / 2**20
+        print(f"{label:>11} {rows:>9,} {t_csv * 1e3:>9.1f} {t_store * 1e3:>11.2f} "
+              f"{t_csv / t_store:>7.0f}x {csv_mib:>8.1f} {store_mib:>10.1f}")
@@ -0,0 +1,55 @@
+# scripts/bench_ingest.py
+# Peak RSS / wall time of the old `r.json()` + DataFrame path vs the streaming reader
+# on a synthetic export. Each mode runs in its own process so peaks don't mix.
+#   python scripts/bench_ingest.py [rows]
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchkit import write_export
+
+
+def run_mode(mode: str, path: str) -> None:
+    import pandas as pd
+    from kong import parse_leaderboard
+    from kong.ingest import read_leaderboard
+
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    t0 = time.perf_counter()
+    if mode == "json":
+        # what fetch_leaderboard did: whole body -> dicts -> DataFrame
+        body = Path(path).read_bytes()
+        df = pd.DataFrame(json.loads(body).get("leaderboard", []))
+        df["stakedAmount"] = pd.to_numeric(df["stakedAmount"], errors="coerce").fillna(0.0)
+        del body
+    elif mode == "parse":
+        body = Path(path).read_bytes()
+        df = parse_leaderboard(json.loads(body).get("leaderboard", []))
+        del body
+    else:
+        with open(path, "rb") as f:
+            df = read_leaderboard(iter(lambda: f.read(1 << 20), b""), size_hint=os.path.getsize(path) // 70)
+    elapsed = time.perf_counter() - t0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base  # KiB on Linux
+    frame = df.memory_usage(deep=True).sum() / 2**20
+    print(f"{mode:>8} {len(df):>11,} {elapsed:>9.2f} {peak / 1024:>13.0f} {frame:>10.0f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--mode":
+        run_mode(sys.argv[2], sys.argv[3])
+        sys.exit()
+
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 3_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "export.json"
+        write_export(path, rows)
+        print(f"export: {path.stat().st_size / 2**20:,.0f} MiB")
+        print(f"{'mode':>8} {'rows':>11} {'time (s)':>9} {'peak +RSS MiB':>13} {'frame MiB':>10}")
+        for mode in ("json", "parse", "stream"):
+            subprocess.run([sys.executable, __file__, "--mode", mode, str(path)], check=True)
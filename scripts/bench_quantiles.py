@@ -0,0 +1,70 @@
+# scripts/bench_quantiles.py
+# KLL stake sketches against exact quantiles:
+#   - rank error sweep: normalized rank error of every percentile p0.1..p99.9
+#     over many seeds, for whole-batch and streamed builds (down to a few values
+#     per update) and 30-day merges; worst and 99th-percentile error vs RANK_ERROR
+#   - building a sketch vs an exact sort, the query cost and the stored size
+# tests/test_quantiles.py asserts the bound.
+#   python scripts/bench_quantiles.py [seeds]
+import sys
+import numpy as np
+
+from benchkit import best_of, timed
+from kong.quantiles import K, RANK_ERROR, KLLSketch
+
+QS = np.linspace(0.001, 0.999, 999)
+N = 200_000
+
+
+def rank_error(exact_sorted: np.ndarray, estimates: np.ndarray) -> float:
+    """Largest distance between q and the rank range of the value returned for q."""
+    n = len(exact_sorted)
+    lo = np.searchsorted(exact_sorted, estimates, side="left") / n
+    hi = np.searchsorted(exact_sorted, estimates, side="right") / n
+    return float(np.max(np.maximum(0.0, np.maximum(lo - QS, QS - hi))))
+
+
+def stakes(rng, n: int, kind: str) -> np.ndarray:
+    if kind == "lognormal":
+        return rng.lognormal(8, 2, n)
+    if kind == "pareto":
+        return (rng.pareto(1.1, n) + 1) * 100
+    # round amounts: lots of exact ties, like real stakes
+    return np.round(rng.lognormal(8, 2, n), -2) + 100
+
+
+def build(x: np.ndarray, how: str, seed: int) -> KLLSketch:
+    if how == "merged":
+        sketch = KLLSketch(seed=seed)
+        for d, part in enumerate(np.array_split(x, 30)):
+            sketch.merge(KLLSketch(seed=seed * 1000 + d).update(part))
+        return sketch
+    batch = int(how)
+    sketch = KLLSketch(seed=seed)
+    for start in range(0, len(x), batch):
+        sketch.update(x[start:start + batch])
+    return sketch
+
+
+seeds = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+print(f"rank error over {seeds} seeds, {N:,} values (bound {RANK_ERROR:.2%} at k = {K})")
+print(f"{'data':>10} {'build':>18} {'worst':>8} {'p99':>8} {'mean':>8}")
+for kind in ("lognormal", "pareto", "rounded"):
+    for how in (str(N), "10000", "400", "40", "merged"):
+        errors = []
+        for seed in range(seeds):
+            x = stakes(np.random.default_rng(seed), N, kind)
+            errors.append(rank_error(np.sort(x), build(x, how, seed).quantile(QS)))
+        label = {"merged": "merged 30 days", str(N): "whole batch"}.get(how) or f"batches of {int(how):,}"
+        print(f"{kind:>10} {label:>18} {max(errors):>8.4f} {np.quantile(errors, 0.99):>8.4f} {np.mean(errors):>8.4f}")
+
+print()
+print(f"{'n':>10} {'sketch (ms)':>12} {'sort (ms)':>10} {'query (us)':>11} {'bytes':>7}")
+rng = np.random.default_rng(0)
+for n in (5_000, 100_000, 1_000_000):
+    x = stakes(rng, n, "lognormal")
+    t_sketch, sketch = timed(lambda x=x: KLLSketch().update(x), repeat=1)
+    t_sort = best_of(lambda x=x: np.sort(x), repeat=1)
+    sketch.quantile(0.5)  # sorted view built once, then each query is a binary search
+    t_query = best_of(lambda sketch=sketch: [sketch.quantile(q) for q in QS], repeat=1) / len(QS)
+    print(f"{n:>10,} {t_sketch * 1e3:>12.1f} {t_sort * 1e3:>10.1f} {t_query * 1e6:>11.1f} {len(sketch.to_bytes()):>7,}")
@@ -0,0 +1,117 @@
+# scripts/bench_reruns.py
+# Rerun latency per widget interaction, whole-script reruns vs st.fragment reruns.
+# The dashboard runs headless under streamlit's AppTest against a local stub of
+# the two API endpoints (synthetic leaderboard), in a scratch working directory
+# whose data/ links to the repo's history.
+#   "full":     every AppTest rerun runs the whole page (what the dashboard
+#               did before fragments)
+#   "fragment": time spent in the fragment owning the widget during that rerun,
+#               i.e. what a fragment-scoped rerun from the browser executes
+#               (AppTest has no public way to issue one itself)
+#   python scripts/bench_reruns.py [rows] [repeats]
+import functools
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from benchkit import ROOT, export_body, leaderboard_stakes
+
+APP = ROOT / "KONG_dashboard_app.py"
+
+# interaction -> (fragment function owning the widget, widget getter, values to alternate)
+INTERACTIONS = {
+    "rice cutoff": ("distribution_section", lambda at: at.slider[0], [20_000, 30_000]),
+    "whale cutoff": ("distribution_section", lambda at: at.slider[1], [500_000, 1_500_000]),
+    "table page": ("wallet_table_section", lambda at: at.number_input[0], [2, 3]),
+    "window": ("time_series_section", lambda at: at.radio[0], ["90d", "30d"]),
+}
+
+
+def serve_stub(rows: int) -> ThreadingHTTPServer:
+    leaderboard = export_body(rows, zero_share=0.03)
+    summary = json.dumps({"totalStaked": float(leaderboard_stakes(rows, zero_share=0.03).sum()), "tvlUsd": 2e6,
+                          "percentageOfCurrentSupply": 37.1}).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = leaderboard if self.path == "/leaderboard" else summary
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def bench(port: int, repeats: int) -> tuple[dict, dict]:
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    fragment = st.fragment
+    section_times: dict[str, float] = {}
+
+    def timed_fragment(func=None, **kwargs):
+        # st.fragment, with each call of the decorated section timed by name
+        if func is None:
+            return lambda f: timed_fragment(f, **kwargs)
+
+        @functools.wraps(func)
+        def section(*args, **kw):
+            t0 = time.perf_counter()
+            try:
+                return func(*args, **kw)
+            finally:
+                section_times[func.__name__] = time.perf_counter() - t0
+        return fragment(section, **kwargs)
+
+    st.fragment = timed_fragment
+    try:
+        at = AppTest.from_file(str(APP), default_timeout=120)
+        at.secrets["KONG_API_URL"] = f"http://127.0.0.1:{port}/leaderboard"
+        at.secrets["KONG_SUMMARY_URL"] = f"http://127.0.0.1:{port}/summary"
+        at.run()
+        at.run()  # warm: caches filled, data shared by the refresher
+
+        full, frag = {}, {}
+        for name, (owner, widget, values) in INTERACTIONS.items():
+            runs, sections = [], []
+            for k in range(repeats):
+                widget(at).set_value(values[k % len(values)])
+                t0 = time.perf_counter()
+                at.run()
+                runs.append(time.perf_counter() - t0)
+                sections.append(section_times[owner])
+                if at.exception:
+                    raise RuntimeError(at.exception[0].message)
+            full[name], frag[name] = statistics.median(runs), statistics.median(sections)
+        return full, frag
+    finally:
+        st.fragment = fragment
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    server = serve_stub(rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.symlink(ROOT / "data", Path(tmp) / "data")
+        os.chdir(tmp)  # .cache/ (HTTP bodies, wallet IDs) stays out of the repo
+        full, frag = bench(server.server_port, repeats)
+    server.shutdown()
+
+    print(f"{rows:,} wallets, median of {repeats} reruns")
+    print(f"{'interaction':>14} {'full (ms)':>10} {'fragment (ms)':>14} {'speedup':>8}")
+    for name in INTERACTIONS:
+        print(f"{name:>14} {full[name] * 1e3:>10.1f} {frag[name] * 1e3:>14.1f} {full[name] / frag[name]:>7.1f}x")
@@ -0,0 +1,31 @@
+# scripts/bench_tiers.py
+# Compare the old per-row `apply(classify_tier)` against the vectorized engine.
+#   python scripts/bench_tiers.py [max_rows]
+import sys
+import pandas as pd
+
+from benchkit import best_of, leaderboard_stakes
+from kong.tiers import classify_tiers
+
+
+def classify_tier(x: float) -> int:
+    # the per-row function both entry points used to `.apply`
+    if x < 25_000: return 0
+    if x < 62_500: return 1
+    if x < 125_000: return 2
+    if x < 250_000: return 3
+    return 4
+
+
+max_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+
+print(f"{'rows':>12} {'apply (s)':>12} {'vectorized (s)':>15} {'speedup':>9}")
+n = 1_000
+while n <= max_rows:
+    stakes = pd.Series(leaderboard_stakes(n, seed=n))
+    repeat = 3 if n <= 1_000_000 else 1
+    t_apply = best_of(lambda stakes=stakes: stakes.apply(classify_tier), repeat)
+    t_vec = best_of(lambda stakes=stakes: classify_tiers(stakes.to_numpy()), repeat)
+    assert (stakes.apply(classify_tier).to_numpy() == classify_tiers(stakes.to_numpy())).all()
+    print(f"{n:>12,} {t_apply:>12.4f} {t_vec:>15.5f} {t_apply / t_vec:>8.0f}x")
+    n *= 10
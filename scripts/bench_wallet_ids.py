@@ -0,0 +1,42 @@
+# scripts/bench_wallet_ids.py
+# Memory and latency of the interned (int32 wallet ID) leaderboard frame vs the
+# old object-dtype `user` column.
+#   python scripts/bench_wallet_ids.py [rows]
+import sys
+import tempfile
+from pathlib import Path
+
+from benchkit import export_body, random_addresses, timed
+from kong.ingest import read_leaderboard
+from kong.wallets import WalletDictionary
+
+
+rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+body = export_body(rows, users=random_addresses(rows))
+chunks = [body[i:i + (1 << 20)] for i in range(0, len(body), 1 << 20)]
+
+with tempfile.TemporaryDirectory() as tmp:
+    t_obj, df_obj = timed(lambda: read_leaderboard(chunks, size_hint=rows))
+    dictionary = WalletDictionary(Path(tmp) / "ids.bin")
+    t_first, df_ids = timed(lambda: read_leaderboard(chunks, size_hint=rows, dictionary=dictionary), repeat=1)
+    t_ids, df_ids = timed(lambda: read_leaderboard(chunks, size_hint=rows, dictionary=dictionary))
+
+    mib = lambda n: n / 2**20
+    obj_mem = df_obj.memory_usage(deep=True).sum()
+    ids_mem = df_ids.memory_usage(deep=True).sum()
+    print(f"rows: {rows:,}")
+    print(f"{'':>28} {'object user':>12} {'int32 ids':>12}")
+    print(f"{'frame memory (MiB)':>28} {mib(obj_mem):>12.1f} {mib(ids_mem):>12.1f}"
+          f"   (+{mib(dictionary.addresses.nbytes):.1f} MiB dictionary)")
+    print(f"{'ingest (s)':>28} {t_obj:>12.2f} {t_ids:>12.2f}   (first run, interning: {t_first:.2f}s)")
+    for label, fn in [
+        ("nunique (s)", lambda d: d["user"].nunique()),
+        ("duplicated().any() (s)", lambda d: d["user"].duplicated().any()),
+        ("groupby tier nunique (s)", lambda d: d.groupby("tier")["user"].nunique()),
+        ("isin 1k wallets (s)", lambda d: d["user"].isin(d["user"].iloc[:1000]).sum()),
+    ]:
+        a, _ = timed(lambda fn=fn: fn(df_obj))
+        b, _ = timed(lambda fn=fn: fn(df_ids))
+        print(f"{label:>28} {a:>12.4f} {b:>12.4f}")
+    t_dec, _ = timed(lambda: dictionary.decode(df_ids["user"].to_numpy()[:1000]))
+    print(f"{'decode 1k IDs for display (s)':>28} {'':>12} {t_dec:>12.5f}")
@@ -0,0 +1,79 @@
+# scripts/benchkit.py
+# What the benches share: the repo root on sys.path (import this module before
+# `kong`), best-of timing, and the synthetic leaderboards / summary histories
+# they run on.
+import json
+import sys
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))  # repo root, for `kong`
+from kong.history import SUMMARY_SCHEMA, TIME_COLUMN
+
+
+def timed(fn, repeat: int = 3):
+    """Best wall time of `repeat` calls of `fn`, and what the last call returned."""
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def best_of(fn, repeat: int = 5) -> float:
+    return timed(fn, repeat)[0]
+
+
+def leaderboard_stakes(rows: int, seed: int = 0, zero_share: float = 0.0) -> np.ndarray:
+    """Log-normal stakes, about the live leaderboard shape (median ~5k, long tail); `zero_share` of them 0."""
+    rng = np.random.default_rng(seed)
+    stakes = rng.lognormal(mean=8.5, sigma=2.0, size=rows)
+    return stakes * (rng.random(rows) >= zero_share) if zero_share else stakes
+
+
+def address(i: int) -> str:
+    return f"0x{i * 7919 + 12345:040x}"
+
+
+def random_addresses(rows: int, seed: int = 0) -> list[str]:
+    """Addresses with random bytes, like real ones (no shared prefixes to help hashing or sorting)."""
+    rng = np.random.default_rng(seed)
+    return ["0x" + rng.bytes(20).hex() for _ in range(rows)]
+
+
+def _records(users, stakes) -> str:
+    return ",".join(json.dumps({"user": u, "stakedAmount": f"{v:.4f}"}) for u, v in zip(users, stakes))
+
+
+def export_body(rows: int, seed: int = 0, zero_share: float = 0.0, users=None) -> bytes:
+    """A leaderboard export body; `users` defaults to distinct sequential addresses."""
+    stakes = leaderboard_stakes(rows, seed, zero_share)
+    users = [address(i) for i in range(rows)] if users is None else users
+    return ('{"leaderboard": [' + _records(users, stakes) + "]}").encode()
+
+
+def write_export(path: Path, rows: int, seed: int = 0, batch: int = 100_000) -> None:
+    """`export_body` written `batch` records at a time, for exports too big to build in memory."""
+    stakes = leaderboard_stakes(rows, seed)
+    with open(path, "w") as f:
+        f.write('{"leaderboard": [')
+        for start in range(0, rows, batch):
+            stop = min(start + batch, rows)
+            f.write(("," if start else "") + _records(map(address, range(start, stop)), stakes[start:stop]))
+        f.write("]}")
+
+
+def synthetic_history(rows: int, step: str = "D", seed: int = 0) -> pd.DataFrame:
+    """Summary history rows (SUMMARY_SCHEMA columns, random values) every `step` from 2025-09-16."""
+    rng = np.random.default_rng(seed)
+    out = {TIME_COLUMN: pd.date_range("2025-09-16", periods=rows, freq=step)}
+    for name, dt in SUMMARY_SCHEMA.items():
+        if name == TIME_COLUMN:
+            continue
+        values = rng.lognormal(10, 1, rows)
+        out[name] = values if np.dtype(dt).kind == "f" else values.astype(np.int64)
+    return pd.DataFrame(out)
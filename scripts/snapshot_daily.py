@@ -1,88 +1,101 @@
 # scripts/snapshot_daily.py
+import logging
 import os
-import csv
-import datetime as dt
+import sys
 from pathlib import Path
-import requests
+import numpy as np
 import pandas as pd
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # repo root, for `kong`
+from kong import compute_metrics, snapshot_row
+from kong.concentration import concentration_metrics
+from kong.derived import DerivedHistory
+from kong.distinct import wallet_sketches, write_sketches
+from kong.history import open_history
+from kong.http import fetch_concurrently, get, make_session
+from kong.ingest import drop_malformed_users, read_leaderboard_body
+from kong.movers import movers, movers_counts, write_movers
+from kong.quantiles import stake_sketch, write_sketch
+from kong.rollups import Rollups
+from kong.transitions import TransitionHistory, transition_matrix
+from kong.wallet_history import WalletHistory
+from kong.wallets import pack_addresses
+
 API_URL = os.environ.get("KONG_API_URL", "https://kong-token-api.cyberkongz.com/leaderboard/export")
 SUMMARY_URL = os.environ.get("KONG_SUMMARY_URL", "https://kong-token-api.cyberkongz.com/staking-summary")
 
-# ---- same tier logic as the app
-def classify_tier(x: float) -> int:
-    if x < 25_000: return 0
-    if x < 62_500: return 1
-    if x < 125_000: return 2
-    if x < 250_000: return 3
-    return 4
+log = logging.getLogger("snapshot_daily")
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+# snapshot cadence: "1D" (default, one row per day), or e.g. "1h" / "15min" for
+# intraday snapshots with hour/day/week rollups; run the job at the same cadence
+EVERY = pd.Timedelta(os.environ.get("KONG_SNAPSHOT_EVERY", "1D"))
 
-today = dt.date.today().isoformat()
+snapshot_at = pd.Timestamp.now().floor(EVERY)
+today = snapshot_at.date().isoformat()
 out_dir = Path("data/summaries")
 out_dir.mkdir(parents=True, exist_ok=True)
-out_csv = out_dir / "daily.csv"
 
-# ---- fetch
-lb = requests.get(API_URL, timeout=30); lb.raise_for_status()
-sm = requests.get(SUMMARY_URL, timeout=30); sm.raise_for_status()
+# ---- fetch both endpoints at once (leaderboard is streamed straight into columns)
+session = make_session()
+values, timings = fetch_concurrently(lambda url, parse: get(session, url, parse), {
+    "leaderboard": (API_URL, read_leaderboard_body),
+    "summary": (SUMMARY_URL, None),
+})
+df, summary = values["leaderboard"], values["summary"]
+log.info("fetched in %s", ", ".join(f"{name} {secs:.2f}s" for name, secs in timings.items()))
+
+# ---- rows whose `user` is not a 0x address can't be stored per wallet: drop them
+# before any store is written (the dashboard skips them at ingestion too)
+df, malformed = drop_malformed_users(df)
+if malformed:
+    log.warning("skipped %d rows with malformed addresses: %r", len(malformed), malformed[:5])
+
+metrics = compute_metrics(df)
+row = snapshot_row(df, summary, snapshot_at, metrics)
+
+# ---- Gini / HHI / Nakamoto / top-N shares: one sort of the active stakes
+stakes = df["stakedAmount"].to_numpy(dtype=np.float64)
+row.update(concentration_metrics(np.sort(stakes[stakes > 0])))
 
-leaderboard = lb.json().get("leaderboard", [])
-summary = sm.json()
+# ---- stake quantile sketch: p10..p99 go in the row (for the percentile bands),
+# the sketch itself is kept per day (below) for any other percentile later
+sketch = stake_sketch(stakes)
+row.update(sketch.percentiles())
 
-df = pd.DataFrame(leaderboard)
-if df.empty:
-    # still produce a row with whatever the summary says
-    active_wallets = 0
-    median_stake = 0
-    max_stake = 0
-    zero_stake_wallets = 0
-    tier_counts = {f"tier{i}": 0 for i in range(5)}
-else:
-    df["stakedAmount"] = pd.to_numeric(df["stakedAmount"], errors="coerce").fillna(0.0)
-    active_df = df[df["stakedAmount"] > 0]
-    active_wallets = int(active_df["user"].nunique())
-    median_stake = float(active_df["stakedAmount"].median() if not active_df.empty else 0)
-    max_stake = float(active_df["stakedAmount"].max() if not active_df.empty else 0)
-    zero_stake_wallets = int(df.loc[df["stakedAmount"] <= 0, "user"].nunique())
-    # tiers
-    if not active_df.empty:
-        active_df = active_df.assign(tier=active_df["stakedAmount"].apply(classify_tier))
-        tier_counts_series = active_df.groupby("tier")["user"].nunique()
-    else:
-        tier_counts_series = pd.Series(dtype=int)
-    tier_counts = {f"tier{i}": int(tier_counts_series.get(i, 0)) for i in range(5)}
+# ---- the summary row first: raw snapshot (intraday cadences) + hour/day/week
+# rollups, one upsert each (a bucket's row is its latest snapshot; a re-run inside
+# a bucket replaces it), then the DoD / 7-day MA columns for the new day only.
+# The per-day side stores below are keyed by date and overwrite on a re-run, so
+# a job that dies part way through is completed by simply running it again
+store = open_history(out_dir / "daily", legacy_csv=out_dir / "daily.csv")
+for level, action in Rollups(out_dir).add(row, EVERY).items():
+    log.info("history: %s %s %s", level, action, snapshot_at)
+written = DerivedHistory(store, out_dir / "daily_derived").update()
+log.info("derived: %d rows computed", written)
 
-total_staked = float(summary.get("totalStaked", float(df["stakedAmount"].sum()) if not df.empty else 0))
-tvl_usd = float(summary.get("tvlUsd", 0))
-perc_supply = float(summary.get("percentageOfCurrentSupply", 0.0))
+write_sketch(out_dir / "quantiles", today, sketch)
+log.info("quantiles: sketch of %s stakes stored for %s", f"{sketch.n:,}", today)
 
-row = {
-    "snapshot_date": today,
-    "total_staked": total_staked,
-    "tvl_usd": tvl_usd,
-    "percentage_supply": perc_supply,
-    "active_wallets": active_wallets,
-    "median_stake": median_stake,
-    "max_stake": max_stake,
-    "zero_stake_wallets": zero_stake_wallets,
-    **tier_counts,  # tier0..tier4
-}
+# ---- full per-wallet leaderboard (dictionary-encoded, stored as a delta vs yesterday)
+wallets = WalletHistory("data/wallets")
+kind = wallets.write(today, df["user"], df["stakedAmount"])
+log.info("wallets: stored %s as %s", today, kind)
 
-# ---- upsert into daily.csv (one row per date)
-cols = [
-    "snapshot_date","total_staked","tvl_usd","percentage_supply",
-    "active_wallets","median_stake","max_stake","zero_stake_wallets",
-    "tier0","tier1","tier2","tier3","tier4"
-]
+# ---- HLL sketches of today's stakers / listed wallets: distinct counts over any
+# union of days (e.g. unique stakers in the last 90 days) without per-wallet data
+sketches = wallet_sketches(pack_addresses(df["user"]), stakes)
+write_sketches(out_dir / "distinct", today, sketches)
+log.info("distinct: %s", ", ".join(f"{k} ~{s.count():,.0f}" for k, s in sketches.items()))
 
-if out_csv.exists():
-    hist = pd.read_csv(out_csv)
-    hist = hist[hist["snapshot_date"] != today]
-    hist = pd.concat([hist, pd.DataFrame([row], columns=cols)], ignore_index=True)
-    hist = hist.sort_values("snapshot_date")
-    hist.to_csv(out_csv, index=False)
-else:
-    with open(out_csv, "w", newline="") as f:
-        w = csv.DictWriter(f, fieldnames=cols)
-        w.writeheader()
-        w.writerow(row)
+# ---- vs the previous stored day: movers (new stakers, exits, top gainers/losers,
+# tier moves) and the tier transition matrix (kept as running totals)
+days = wallets.dates()
+if len(days) >= 2:
+    before, after = wallets.state(days[-2]), wallets.state(days[-1])
+    table = movers(before, after)
+    table["user"] = wallets.dictionary().decode(table["user"].to_numpy())
+    write_movers("data/wallets/movers", today, table)
+    log.info("movers: %s -> %s: %s", days[-2], today, ", ".join(f"{k} {n}" for k, n in movers_counts(table).items()))
+    action = TransitionHistory(out_dir / "transitions").add(today, transition_matrix(before, after))
+    log.info("transitions: %s %s", action, today)
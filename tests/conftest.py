@@ -0,0 +1,109 @@
+# tests/conftest.py
+# Shared fixtures: synthetic leaderboard exports and a local stub of the API
+# that answers conditional GETs the way the real endpoints do.
+import json
+import threading
+from dataclasses import dataclass, field
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import pandas as pd
+import pytest
+
+from kong.history import SUMMARY_SCHEMA, TIME_COLUMN
+
+
+def export_body(rows: int, seed: int = 0, zero_share: float = 0.0) -> bytes:
+    """A leaderboard export with log-normal stakes (about the live shape), `zero_share` of them 0."""
+    rng = np.random.default_rng(seed)
+    stakes = rng.lognormal(mean=8.5, sigma=2.0, size=rows) * (rng.random(rows) >= zero_share)
+    return json.dumps({"leaderboard": [
+        {"user": f"0x{i * 7919 + 12345:040x}", "stakedAmount": f"{v:.4f}"} for i, v in enumerate(stakes)
+    ]}).encode()
+
+
+@pytest.fixture
+def make_export():
+    return export_body
+
+
+def history_frame(rows: int, step: str = "D", seed: int = 0) -> pd.DataFrame:
+    """Summary history rows (SUMMARY_SCHEMA columns, random values) every `step` from 2025-09-16."""
+    rng = np.random.default_rng(seed)
+    out = {TIME_COLUMN: pd.date_range("2025-09-16", periods=rows, freq=step)}
+    for name, dt in SUMMARY_SCHEMA.items():
+        if name != TIME_COLUMN:
+            values = rng.lognormal(10, 1, rows)
+            out[name] = values if np.dtype(dt).kind == "f" else values.astype(np.int64)
+    return pd.DataFrame(out)
+
+
+@pytest.fixture
+def make_history():
+    return history_frame
+
+
+@dataclass
+class Resource:
+    """What the stub serves at one path: body, version, and which validators it sends."""
+    body: bytes
+    version: int = 1
+    etag: bool = True
+    last_modified: bool = True
+
+
+@dataclass
+class Upstream:
+    port: int
+    routes: dict[str, Resource] = field(default_factory=dict)
+    requests: list[tuple[str, int]] = field(default_factory=list)  # (path, status) per GET
+
+    def serve(self, path: str, body: bytes, **validators) -> Resource:
+        self.routes[path] = Resource(body, **validators)
+        return self.routes[path]
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.port}{path}"
+
+    def statuses(self, path: str) -> list[int]:
+        return [status for p, status in self.requests if p == path]
+
+
+@pytest.fixture
+def upstream():
+    """Local HTTP stub: 200 with ETag / Last-Modified, 304 on a matching If-None-Match / If-Modified-Since."""
+    state = Upstream(port=0)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            res = state.routes.get(self.path)
+            if res is None:
+                self.send_error(404)
+                return
+            etag = f'"v{res.version}"' if res.etag else None
+            modified = formatdate(1_700_000_000 + res.version, usegmt=True) if res.last_modified else None
+            fresh = bool((etag and self.headers.get("If-None-Match") == etag)
+                         or (not etag and modified and self.headers.get("If-Modified-Since") == modified))
+            state.requests.append((self.path, 304 if fresh else 200))
+            self.send_response(304 if fresh else 200)
+            self.send_header("Content-Type", "application/json")
+            if etag:
+                self.send_header("ETag", etag)
+            if modified:
+                self.send_header("Last-Modified", modified)
+            self.send_header("Content-Length", "0" if fresh else str(len(res.body)))
+            self.end_headers()
+            if not fresh:
+                self.wfile.write(res.body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    state.port = server.server_port
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield state
+    server.shutdown()
+    server.server_close()
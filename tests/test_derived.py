@@ -0,0 +1,90 @@
+# tests/test_derived.py
+# The stored, incrementally extended DoD / 7-day MA columns must be identical
+# to a full recompute (and match pandas diff / rolling) whatever has been stored.
+import numpy as np
+import pandas as pd
+import pytest
+
+from kong.derived import DOD_COLUMNS, MA_COLUMNS, DerivedHistory, compute_derived
+from kong.history import SUMMARY_SCHEMA, TIME_COLUMN, HistoryStore
+
+
+def pandas_recompute(store: HistoryStore) -> pd.DataFrame:
+    # what load_daily_history did on every cache expiry
+    hist = store.load()
+    for col in DOD_COLUMNS:
+        hist[f"{col}_dod"] = hist[col].diff()
+    for col in MA_COLUMNS:
+        hist[f"{col}_7dma"] = hist[col].rolling(7).mean()
+    return hist
+
+
+def assert_matches_full_recompute(store: HistoryStore, derived: DerivedHistory) -> None:
+    got = derived.load()
+    exact = pd.concat([store.load(), compute_derived(store.load()).drop(columns=TIME_COLUMN)], axis=1)
+    legacy = pandas_recompute(store)
+    assert list(got.columns) == list(legacy.columns)
+    for name in got.columns:
+        a = got[name].to_numpy()
+        assert np.array_equal(a, exact[name].to_numpy(), equal_nan=name != TIME_COLUMN), name
+        if name != TIME_COLUMN:
+            np.testing.assert_allclose(a, legacy[name].to_numpy(), rtol=1e-12, err_msg=name)
+
+
+def next_row(store: HistoryStore, scale: float) -> dict:
+    row = store.load(store.rows - 1).iloc[0].to_dict()
+    row[TIME_COLUMN] += pd.Timedelta(days=1)
+    row["total_staked"] *= scale
+    return row
+
+
+@pytest.fixture
+def stores(tmp_path, make_history):
+    store = HistoryStore.create(tmp_path / "daily", SUMMARY_SCHEMA)
+    store.extend(make_history(40))
+    return store, DerivedHistory(store, tmp_path / "derived")
+
+
+def test_nothing_stored_yet(stores):
+    assert_matches_full_recompute(*stores)
+
+
+def test_appends_in_memory_then_stored(stores):
+    store, derived = stores
+    assert derived.update() == 40
+    assert_matches_full_recompute(store, derived)
+    for _ in range(3):  # new days the app sees before the job stores their derived rows
+        store.upsert(next_row(store, 1.01))
+        assert_matches_full_recompute(store, derived)
+    assert derived.update() == 3
+    assert derived.update() == 0
+    assert_matches_full_recompute(store, derived)
+
+
+def test_replaced_last_row(stores):
+    store, derived = stores
+    derived.update()
+    row = store.load(store.rows - 1).iloc[0].to_dict()
+    row["total_staked"] = 1.0
+    assert store.upsert(row) == "replace"  # a re-run replacing today's row
+    assert_matches_full_recompute(store, derived)
+    assert derived.update() == 1
+    assert_matches_full_recompute(store, derived)
+
+
+def test_rebuilt_base_is_recomputed(stores, make_history):
+    store, derived = stores
+    derived.update()
+    rebuilt = HistoryStore.create(store.path, SUMMARY_SCHEMA)
+    rebuilt.extend(make_history(30, seed=1))
+    assert derived.update() == 30
+    assert_matches_full_recompute(rebuilt, derived)
+
+
+def test_short_history(tmp_path, make_history):
+    store = HistoryStore.create(tmp_path / "daily", SUMMARY_SCHEMA)
+    store.extend(make_history(3))
+    derived = DerivedHistory(store, tmp_path / "derived")
+    derived.update()
+    assert_matches_full_recompute(store, derived)
+    assert derived.load()["total_staked_7dma"].isna().all()
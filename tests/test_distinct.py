@@ -0,0 +1,88 @@
+# tests/test_distinct.py
+# HyperLogLog wallet sketches against exact distinct counts, from 10 to 1M
+# wallets, and unions over ranges of stored days of a churning leaderboard.
+import numpy as np
+import pandas as pd
+import pytest
+
+from kong.distinct import P, HyperLogLog, distinct_dates, read_sketches, union, wallet_sketches, write_sketches
+from kong.wallets import ADDRESS_DTYPE
+
+SIGMA = 1.04 / np.sqrt(1 << P)
+Z = 3.09  # one-sided 99.9%
+
+
+def random_addresses(rng, n: int) -> np.ndarray:
+    return rng.integers(0, 256, (n, 20), dtype=np.uint8).view(ADDRESS_DTYPE).ravel()
+
+
+def rms_tolerance(trials: int) -> float:
+    """Upper 99.9% bound of RMS / sigma over `trials` normal errors: sqrt(chi2(trials) / trials),
+    Wilson-Hilferty approximation of the chi-square quantile."""
+    c = 2 / (9 * trials)
+    return float(np.sqrt((1 - c + Z * np.sqrt(c)) ** 3))
+
+
+def max_tolerance(n: int) -> float:
+    """4 standard errors, plus one wallet: two of ten wallets sharing a register is already 10%."""
+    return 4 * SIGMA + 1 / n
+
+
+@pytest.mark.parametrize("n, trials", [
+    (10, 200), (1_000, 200), (10_000, 100), (50_000, 100), (200_000, 60), (1_000_000, 40),
+])
+def test_error_within_standard_error(n, trials):
+    rng = np.random.default_rng(n)
+    errors = np.array([HyperLogLog().add_addresses(random_addresses(rng, n)).count() / n - 1
+                       for _ in range(trials)])
+    rms = float(np.sqrt(np.mean(errors ** 2)))
+    assert rms <= rms_tolerance(trials) * SIGMA, f"RMS error {rms:.4f} vs {SIGMA:.4f} over {trials} trials"
+    assert np.abs(errors).max() <= max_tolerance(n)
+
+
+def test_range_unions_of_stored_days(tmp_path):
+    # a churning leaderboard: ~5% of yesterday's wallets leave, 300 new ones join
+    rng = np.random.default_rng(0)
+    pool = random_addresses(rng, 60_000)
+    current = rng.choice(len(pool) // 2, 20_000, replace=False)
+    next_new = len(pool) // 2
+    days = pd.date_range("2026-07-22", periods=90, freq="D").strftime("%Y-%m-%d").tolist()
+    active, listed = [], []
+    for date in days:
+        current = np.concatenate([current[rng.random(len(current)) > 0.05], np.arange(next_new, next_new + 300)])
+        next_new += 300
+        stakes = np.where(rng.random(len(current)) < 0.97, rng.lognormal(8, 2, len(current)), 0.0)
+        write_sketches(tmp_path, date, wallet_sketches(pool[current], stakes))
+        active.append(current[stakes > 0])
+        listed.append(current)
+    assert distinct_dates(tmp_path) == days
+
+    for window in (1, 7, 30, 90):
+        for kind, seen in (("active", active), ("listed", listed)):
+            exact = len(np.unique(np.concatenate(seen[-window:])))
+            estimate = union(tmp_path, days[-window:], kind).count()
+            assert abs(estimate / exact - 1) <= max_tolerance(exact), (window, kind)
+
+
+def test_merge_is_the_sketch_of_the_union():
+    rng = np.random.default_rng(1)
+    a, b = random_addresses(rng, 30_000), random_addresses(rng, 30_000)
+    merged = HyperLogLog().add_addresses(a).merge(HyperLogLog().add_addresses(b))
+    assert np.array_equal(merged.registers, HyperLogLog().add_addresses(np.concatenate([a, b])).registers)
+    assert np.array_equal(HyperLogLog().add_addresses(np.concatenate([a, a])).registers,
+                          HyperLogLog().add_addresses(a).registers)
+    with pytest.raises(ValueError):
+        HyperLogLog(12).merge(HyperLogLog(14))
+
+
+def test_empty_and_files(tmp_path):
+    assert HyperLogLog().count() == 0
+    assert union(tmp_path, [], "active").count() == 0
+    users = random_addresses(np.random.default_rng(2), 1_000)
+    sketches = wallet_sketches(users, np.r_[np.zeros(100), np.ones(900)])
+    write_sketches(tmp_path, "2026-10-01", sketches)
+    restored = read_sketches(tmp_path, "2026-10-01")
+    for kind in ("active", "listed"):
+        assert np.array_equal(restored[kind].registers, sketches[kind].registers)
+    assert abs(restored["listed"].count() / 1_000 - 1) <= max_tolerance(1_000)
+    assert abs(restored["active"].count() / 900 - 1) <= max_tolerance(900)
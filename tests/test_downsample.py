@@ -0,0 +1,37 @@
+# tests/test_downsample.py
+# LTTB picks and the shared row picks for multi-series charts.
+import numpy as np
+import pandas as pd
+import pytest
+
+from kong.downsample import downsample_rows, lttb
+
+
+def test_lttb_keeps_ends_and_spikes():
+    y = np.random.default_rng(0).normal(0, 1, 50_000)
+    y[[12_345, 40_000]] = [100, -100]
+    picks = lttb(y, 500)
+    assert len(picks) == 500 and picks[0] == 0 and picks[-1] == len(y) - 1
+    assert np.all(np.diff(picks) > 0) and {12_345, 40_000} <= set(picks.tolist())
+    assert np.array_equal(lttb(y[:300], 500), np.arange(300))
+
+
+@pytest.mark.parametrize("n_columns", [1, 2, 5])
+def test_rows_are_capped_at_the_target(n_columns):
+    rng = np.random.default_rng(n_columns)
+    n = 20_000
+    frame = pd.DataFrame({f"c{i}": rng.lognormal(10 + i, 1, n) for i in range(n_columns)})
+    frame["snapshot_date"] = pd.date_range("2020-01-01", periods=n, freq="h")
+    rows = downsample_rows(frame, [f"c{i}" for i in range(n_columns)], 1_000, x_column="snapshot_date")
+    assert len(rows) == 1_000 and np.all(np.diff(rows) > 0)
+
+
+def test_a_spike_in_a_small_series_survives():
+    # the small series' spike is invisible next to the big one's noise unless each is scaled
+    rng = np.random.default_rng(0)
+    n = 20_000
+    frame = pd.DataFrame({"big": rng.normal(1e9, 1e6, n), "small": np.r_[np.full(n // 2, np.nan), np.ones(n // 2)],
+                          "missing": np.nan})
+    frame.loc[15_000, "small"] = 5.0
+    rows = downsample_rows(frame, ["big", "small", "missing"], 500)
+    assert len(rows) == 500 and 15_000 in rows
@@ -0,0 +1,141 @@
+# tests/test_history.py
+# HistoryStore: append / replace-the-tail upserts, the meta.json commit point
+# and the "tail" overlay, and crash safety: a writer killed at any point of an
+# upsert leaves the last committed state readable, and the next write recovers.
+import multiprocessing
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+from kong.history import SUMMARY_SCHEMA, TIME_COLUMN, HistoryStore, migrate_csv, open_history
+
+
+@pytest.fixture
+def store(tmp_path, make_history):
+    store = HistoryStore.create(tmp_path / "daily", SUMMARY_SCHEMA)
+    store.extend(make_history(10))
+    return store
+
+
+def row_at(store: HistoryStore, i: int) -> dict:
+    return store.load(i, i + 1).iloc[0].to_dict()
+
+
+def next_day(store: HistoryStore, **values) -> dict:
+    row = row_at(store, store.rows - 1)
+    return {**row, TIME_COLUMN: row[TIME_COLUMN] + pd.Timedelta(days=1), **values}
+
+
+def test_append_then_replace(store):
+    before = store.load()
+    assert store.upsert(next_day(store, total_staked=1.0)) == "append"
+    assert store.rows == 11 and store.load(10)["total_staked"].tolist() == [1.0]
+    assert store.upsert({**row_at(store, 10), "total_staked": 2.0, "tier0": 7}) == "replace"
+    assert store.rows == 11
+    assert store.load(10)[["total_staked", "tier0"]].values.tolist() == [[2.0, 7]]
+    assert store.load(0, 10).equals(before)  # earlier rows untouched
+
+
+def test_older_rows_are_rejected(store):
+    with pytest.raises(ValueError):
+        store.upsert(row_at(store, 5))
+    with pytest.raises(ValueError):
+        store.extend(store.load(9))
+
+
+def test_new_columns_are_back_filled(store):
+    store.upsert(next_day(store, gini=0.9, holders=3))
+    frame = store.load()
+    assert store.schema["gini"] == np.float64 and store.schema["holders"] == np.int64
+    assert frame["gini"].iloc[:10].isna().all() and frame["gini"].iloc[10] == 0.9
+    assert (frame["holders"].iloc[:10] == 0).all() and frame["holders"].iloc[10] == 3
+
+
+def test_tail_overlay_is_what_readers_see(store):
+    # replace committed in meta.json, in-place rewrite not done yet: readers get the new values
+    meta = store._read_meta()
+    row = {**row_at(store, 9), "total_staked": 5.0}
+    meta["tail"] = {name: int(np.datetime64(row[name], "s").astype(np.int64)) if name == TIME_COLUMN
+                    else row[name] for name in meta["columns"]}
+    store._write_meta(meta)
+    assert store.load(9)["total_staked"].tolist() == [5.0]
+    assert store.column("total_staked", 9, 10).tolist() == [5.0]
+    assert store.column("total_staked", 8, 9).tolist() != [5.0]  # only the last row is overlaid
+    store.upsert(next_day(store))  # the next writer rolls the rewrite forward first
+    assert "tail" not in store._read_meta()
+    assert np.fromfile(store.path / "total_staked.bin")[9] == 5.0
+
+
+def crashing_upsert(path, row: dict, crash_at: int) -> None:
+    # child process: die (no cleanup, like a kill) at the `crash_at`-th fsync of the upsert
+    calls = [0]
+    fsync = os.fsync
+
+    def crash(fd):
+        calls[0] += 1
+        if calls[0] == crash_at:
+            os._exit(1)
+        fsync(fd)
+    os.fsync = crash
+    HistoryStore(path).upsert(row)
+    os._exit(0)
+
+
+def run_crashing(path, row: dict, crash_at: int) -> int:
+    proc = multiprocessing.get_context("fork").Process(target=crashing_upsert, args=(path, row, crash_at))
+    proc.start()
+    proc.join()
+    return proc.exitcode
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+@pytest.mark.parametrize("kind", ["append", "replace"])
+def test_killed_write_leaves_the_last_committed_state(tmp_path, make_history, kind):
+    base = make_history(10)
+    crash_at, seen_new = 1, False
+    while True:
+        store = HistoryStore.create(tmp_path / f"run{crash_at}", SUMMARY_SCHEMA)
+        store.extend(base)
+        old = store.load()
+        row = next_day(store, total_staked=1.0) if kind == "append" else {**row_at(store, 9), "total_staked": 1.0}
+        exitcode = run_crashing(store.path, row, crash_at)
+
+        # readers see exactly the old or exactly the new state, never a mix
+        after = store.load()
+        new_committed = not after.equals(old)
+        if new_committed:
+            expected = old.copy()
+            if kind == "append":
+                expected = pd.concat([old, pd.DataFrame([row]).astype(old.dtypes)], ignore_index=True)
+            else:
+                expected.loc[9, "total_staked"] = 1.0
+            pd.testing.assert_frame_equal(after, expected)
+        assert not (seen_new and not new_committed), "committed state went back"
+        seen_new |= new_committed
+
+        # the next write recovers: the store stays consistent and takes new rows
+        store.upsert(next_day(store, total_staked=2.0))
+        assert store.load(0, len(after)).equals(after)
+        assert store.rows == len(after) + 1 and "tail" not in store._read_meta()
+        for name, dt in store.schema.items():
+            assert os.path.getsize(store.path / f"{name}.bin") >= store.rows * dt.itemsize
+
+        if exitcode == 0:  # past the last fsync: the upsert finished
+            assert new_committed
+            break
+        crash_at += 1
+    assert crash_at > len(SUMMARY_SCHEMA)  # every column write and the commit were crash points
+
+
+def test_migrate_csv_and_open_history(tmp_path, make_history):
+    frame = make_history(20)
+    frame[TIME_COLUMN] = frame[TIME_COLUMN].astype("datetime64[s]")
+    shuffled = pd.concat([frame.iloc[10:], frame.iloc[:10], frame.iloc[[3]]])  # unsorted, one duplicate
+    csv_path = tmp_path / "daily.csv"
+    shuffled.to_csv(csv_path, index=False)
+    store = open_history(tmp_path / "daily", legacy_csv=csv_path)
+    pd.testing.assert_frame_equal(store.load(), frame)  # floats as parsed from the CSV
+    assert open_history(tmp_path / "daily", legacy_csv=csv_path).rows == 20  # migrated once
+    pd.testing.assert_frame_equal(migrate_csv(csv_path, tmp_path / "again").load(), frame)
+    assert open_history(tmp_path / "fresh").rows == 0
@@ -0,0 +1,85 @@
+# tests/test_http.py
+# ConditionalFetcher against the stub: 200 then 304 with the parsed value
+# reused, restarts, changed bodies, Last-Modified-only and validator-less servers.
+import pytest
+
+from kong.http import ConditionalFetcher
+from kong.ingest import read_leaderboard_body
+
+ROWS = 2_000
+PATH = "/leaderboard/export"
+
+
+@pytest.fixture
+def export(upstream, make_export):
+    return upstream.serve(PATH, make_export(ROWS, seed=0))
+
+
+@pytest.fixture
+def parses():
+    return []
+
+
+@pytest.fixture
+def parse(parses):
+    def parse(chunks, size):
+        parses.append(size)
+        return read_leaderboard_body(chunks, size)
+    return parse
+
+
+def test_304_returns_the_parsed_value(tmp_path, upstream, export, parses, parse):
+    fetcher = ConditionalFetcher(tmp_path)
+    size = len(export.body)
+
+    first = fetcher.fetch(upstream.url(PATH), parse)
+    assert upstream.statuses(PATH) == [200] and len(parses) == 1 and len(first) == ROWS
+    assert fetcher.stats == {"hits": 0, "misses": 1, "bytes_saved": 0, "bytes_downloaded": size}
+
+    again = fetcher.fetch(upstream.url(PATH), parse)
+    assert upstream.statuses(PATH) == [200, 304]
+    assert again is first and len(parses) == 1  # no body, no parse
+    assert fetcher.stats == {"hits": 1, "misses": 1, "bytes_saved": size, "bytes_downloaded": size}
+
+
+def test_restart_reparses_the_body_on_disk(tmp_path, upstream, export, parses, parse):
+    first = ConditionalFetcher(tmp_path).fetch(upstream.url(PATH), parse)
+
+    restarted = ConditionalFetcher(tmp_path)  # a new process: nothing parsed in memory yet
+    from_disk = restarted.fetch(upstream.url(PATH), parse)
+    assert upstream.statuses(PATH) == [200, 304] and len(parses) == 2
+    assert from_disk is not first and from_disk.equals(first)
+    size = len(export.body)
+    assert restarted.stats == {"hits": 1, "misses": 0, "bytes_saved": size, "bytes_downloaded": 0}
+    assert restarted.fetch(upstream.url(PATH), parse) is from_disk and len(parses) == 2
+
+
+def test_changed_body_is_downloaded_again(tmp_path, upstream, export, make_export, parse):
+    fetcher = ConditionalFetcher(tmp_path)
+    first = fetcher.fetch(upstream.url(PATH), parse)
+    old_size = len(export.body)
+
+    export.body, export.version = make_export(ROWS, seed=1), 2
+    changed = fetcher.fetch(upstream.url(PATH), parse)
+    assert upstream.statuses(PATH) == [200, 200] and not changed.equals(first)
+    assert fetcher.stats["misses"] == 2
+    assert fetcher.stats["bytes_downloaded"] == old_size + len(export.body)
+    assert fetcher.fetch(upstream.url(PATH), parse) is changed
+
+
+def test_last_modified_only(tmp_path, upstream, export, parses, parse):
+    export.etag = False
+    fetcher = ConditionalFetcher(tmp_path)
+    first = fetcher.fetch(upstream.url(PATH), parse)
+    assert fetcher.fetch(upstream.url(PATH), parse) is first  # via If-Modified-Since
+    assert upstream.statuses(PATH) == [200, 304] and len(parses) == 1
+
+
+def test_no_validators_is_never_cached(tmp_path, upstream, export, parses, parse):
+    export.etag = export.last_modified = False
+    fetcher = ConditionalFetcher(tmp_path)
+    fetcher.fetch(upstream.url(PATH), parse)
+    fetcher.fetch(upstream.url(PATH), parse)
+    assert upstream.statuses(PATH) == [200, 200] and len(parses) == 2
+    assert not list(tmp_path.iterdir())
+    assert fetcher.stats["hits"] == 0 and fetcher.stats["misses"] == 2
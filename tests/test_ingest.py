@@ -0,0 +1,98 @@
+# tests/test_ingest.py
+# Streaming leaderboard reader: any split of the body into network chunks
+# (down to single bytes) gives what json.loads + parse_leaderboard gives.
+import json
+import numpy as np
+import pandas as pd
+import pytest
+
+from kong.ingest import drop_malformed_users, iter_leaderboard_batches, read_leaderboard
+from kong.leaderboard import parse_leaderboard
+from kong.wallets import WalletDictionary
+
+
+def chunked(body: bytes, size: int) -> list[bytes]:
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+def random_splits(body: bytes, seed: int) -> list[bytes]:
+    cuts = np.sort(np.random.default_rng(seed).choice(len(body), 20, replace=False))
+    return [body[a:b] for a, b in zip(np.r_[0, cuts], np.r_[cuts, len(body)])]
+
+
+def reference(body: bytes) -> pd.DataFrame:
+    return parse_leaderboard(json.loads(body)["leaderboard"])
+
+
+NESTED = json.dumps({
+    "updated": {"at": "2026-10-01", "leaderboard": "not this one"},
+    "leaderboard": [
+        {"user": f"0x{1:040x}", "stakedAmount": "10.5", "meta": {"tags": ["a}", "]b"], "x": {"y": None}}},
+        {"user": f"0x{2:040x}", "stakedAmount": 3e5, "note": "café ☃ \U0001f98d"},
+        {"meta": [], "stakedAmount": "oops", "user": f"0x{3:040x}"},
+        {"user": f"0x{4:040x}", "stakedAmount": "7", "meta": {"deep": [[{"}": "]"}]]}},
+    ],
+    "after": {"leaderboard": []},
+}, ensure_ascii=False, indent=1).encode()
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 4096, 1 << 20])
+def test_chunk_sizes(make_export, size):
+    body = make_export(500, zero_share=0.1)
+    pd.testing.assert_frame_equal(read_leaderboard(chunked(body, size)), reference(body))
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_random_splits(make_export, seed):
+    body = make_export(300, seed=seed)
+    pd.testing.assert_frame_equal(read_leaderboard(random_splits(body, seed)), reference(body))
+
+
+@pytest.mark.parametrize("size", [1, 2, 5, 13, 1 << 20])
+def test_nested_objects_and_multibyte_text(size):
+    # nested values take the slow path; brackets inside strings and a multi-byte
+    # character cut between chunks must not confuse it
+    expected = json.loads(NESTED)["leaderboard"]
+    batches = list(iter_leaderboard_batches(chunked(NESTED, size)))
+    assert [rec for batch in batches for rec in batch] == expected
+    got = read_leaderboard(chunked(NESTED, size))
+    pd.testing.assert_frame_equal(got, reference(NESTED))
+    assert got["stakedAmount"].tolist() == [10.5, 3e5, 0.0, 7.0]
+
+
+def test_empty_missing_and_truncated():
+    assert read_leaderboard([b'{"leaderboard": []}']).empty
+    assert list(iter_leaderboard_batches([b'{"other": [1, 2]}'])) == []
+    body = json.dumps({"leaderboard": [{"user": f"0x{i:040x}", "stakedAmount": "1"} for i in range(10)]}).encode()
+    with pytest.raises(ValueError):
+        read_leaderboard(chunked(body[:-30], 16))
+
+
+def test_size_hint_regrowth(make_export):
+    body = make_export(10_000)
+    for hint in (0, 1, 10_000, 100_000):
+        pd.testing.assert_frame_equal(read_leaderboard(chunked(body, 1 << 14), size_hint=hint), reference(body))
+
+
+def test_dictionary_ids_and_malformed_rows(tmp_path, make_export):
+    body = json.loads(make_export(200))
+    rows = body["leaderboard"]
+    rows[5]["user"], rows[50]["user"], rows[150]["user"] = "not an address", None, "0x" + "g" * 40
+    raw = json.dumps(body).encode()
+    dictionary = WalletDictionary(tmp_path / "wallets.bin")
+    got = read_leaderboard(chunked(raw, 333), dictionary=dictionary)
+
+    expected, dropped = drop_malformed_users(reference(raw))
+    assert dropped == ["not an address", None, "0x" + "g" * 40]
+    assert got["user"].dtype == np.int32 and len(got) == 197
+    assert dictionary.decode(got["user"]).tolist() == expected["user"].tolist()
+    assert np.array_equal(got["stakedAmount"], expected["stakedAmount"])
+    assert np.array_equal(got["tier"], expected["tier"])
+    again = read_leaderboard(chunked(raw, 1 << 20), dictionary=dictionary)  # IDs are stable
+    assert np.array_equal(again["user"], got["user"]) and len(dictionary) == 197
+
+
+def test_drop_malformed_users_keeps_clean_frames():
+    df = reference(json.dumps({"leaderboard": [{"user": f"0x{i:040X}", "stakedAmount": "1"} for i in range(5)]}).encode())
+    out, dropped = drop_malformed_users(df)
+    assert out is df and dropped == []
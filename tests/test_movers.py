@@ -0,0 +1,85 @@
+# tests/test_movers.py
+# Movers between two dense stake-by-ID snapshots against a pandas reference
+# (per-wallet join on ID), plus hand-made edge cases.
+import numpy as np
+import pandas as pd
+import pytest
+
+from kong.movers import KINDS, MOVERS_COLUMNS, movers, movers_counts, movers_dates, read_movers, write_movers
+from kong.tiers import classify_tier
+
+
+def snapshots(seed: int, n: int = 5_000) -> tuple[np.ndarray, np.ndarray]:
+    """Yesterday / today by wallet ID (NaN = not listed); today also has new IDs at the end."""
+    rng = np.random.default_rng(seed)
+    before = rng.lognormal(10, 2, n)
+    before[rng.random(n) < 0.1] = 0.0
+    before[rng.random(n) < 0.05] = np.nan
+    after = np.concatenate([before * rng.lognormal(0, 0.5, n), rng.lognormal(10, 2, 200)])
+    after[rng.random(len(after)) < 0.05] = 0.0
+    after[rng.random(len(after)) < 0.05] = np.nan
+    return before, after
+
+
+def reference(before: np.ndarray, after: np.ndarray, top: int) -> dict[str, list[int]]:
+    frame = pd.DataFrame({"before": pd.Series(before), "after": pd.Series(after)}).fillna(0.0)
+    frame["change"] = frame["after"] - frame["before"]
+    frame["tier_before"] = frame["before"].map(classify_tier)
+    frame["tier_after"] = frame["after"].map(classify_tier)
+    both = (frame["before"] > 0) & (frame["after"] > 0)
+    picks = {
+        "new": frame[(frame["before"] <= 0) & (frame["after"] > 0)].sort_values("after", ascending=False),
+        "exited": frame[(frame["before"] > 0) & (frame["after"] <= 0)].sort_values("before", ascending=False),
+        "gainer": frame[both & (frame["change"] > 0)].nlargest(top, "change"),
+        "loser": frame[both & (frame["change"] < 0)].nsmallest(top, "change"),
+        "tier_up": frame[both & (frame["tier_after"] > frame["tier_before"])].sort_values("change", ascending=False),
+        "tier_down": frame[both & (frame["tier_after"] < frame["tier_before"])].sort_values("change"),
+    }
+    return {kind: rows.index.tolist() for kind, rows in picks.items()}
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("top", [1, 10, 100, 10_000])
+def test_matches_pandas_reference(seed, top):
+    before, after = snapshots(seed)
+    table = movers(before, after, top=top)
+    expected = reference(before, after, top)
+    for kind in KINDS:
+        rows = table[table["kind"] == kind]
+        assert rows["user"].tolist() == expected[kind], kind
+    b = np.zeros(len(after))
+    b[:len(before)] = np.nan_to_num(before, nan=0.0)
+    a = np.nan_to_num(after, nan=0.0)
+    ids = table["user"].to_numpy()
+    assert np.array_equal(table["before"], b[ids]) and np.array_equal(table["after"], a[ids])
+    assert np.array_equal(table["change"], a[ids] - b[ids])
+    assert table["tier_before"].tolist() == [classify_tier(x) for x in b[ids]]
+
+
+def test_hand_made_cases():
+    #                  new     exited  gain    lose    up      down    left    same    0->0
+    before = np.array([0.0,    5e3,    1e3,    9e3,    2e4,    3e5,    7e4,    4e4,    0.0])
+    after = np.array([3e4,    0.0,    2e3,    8e3,    3e4,    2e5,    np.nan, 4e4,    0.0, 100.0])
+    table = movers(before, after)
+    kinds = {kind: table.loc[table["kind"] == kind, "user"].tolist() for kind in KINDS}
+    assert kinds == {"new": [0, 9], "exited": [6, 1], "gainer": [4, 2], "loser": [5, 3],
+                     "tier_up": [4], "tier_down": [5]}
+    assert movers_counts(table) == {"new": 2, "exited": 2, "gainer": 2, "loser": 2, "tier_up": 1, "tier_down": 1}
+    assert list(table.columns) == MOVERS_COLUMNS
+
+
+def test_no_changes():
+    stakes = np.array([1.0, 3e4, np.nan, 0.0])
+    table = movers(stakes, stakes)
+    assert table.empty and movers_counts(table) == dict.fromkeys(KINDS, 0)
+
+
+def test_report_files(tmp_path):
+    before, after = snapshots(0, n=200)
+    table = movers(before, after)
+    table["user"] = [f"0x{i:040x}" for i in table["user"]]
+    for date in ("2026-10-02", "2026-10-01"):
+        write_movers(tmp_path, date, table)
+    assert movers_dates(tmp_path) == ["2026-10-01", "2026-10-02"]
+    pd.testing.assert_frame_equal(read_movers(tmp_path, "2026-10-02"), table[MOVERS_COLUMNS],
+                                  check_dtype=False)
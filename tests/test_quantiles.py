@@ -0,0 +1,97 @@
+# tests/test_quantiles.py
+# KLL stake sketches against exact ranks: the normalized rank error of every
+# percentile p0.1..p99.9 stays within RANK_ERROR for many seeds, whole-batch,
+# streamed (down to a few values per update) and merged builds.
+import numpy as np
+import pytest
+
+from kong.quantiles import PERCENTILE_COLUMNS, RANK_ERROR, KLLSketch, read_sketch, sketch_dates, stake_sketch, write_sketch
+
+QS = np.linspace(0.001, 0.999, 999)
+SEEDS = range(30)
+N = 50_000
+
+
+def rank_error(exact_sorted: np.ndarray, estimates: np.ndarray) -> float:
+    """Largest distance between q and the rank range of the value returned for q."""
+    n = len(exact_sorted)
+    lo = np.searchsorted(exact_sorted, estimates, side="left") / n
+    hi = np.searchsorted(exact_sorted, estimates, side="right") / n
+    return float(np.max(np.maximum(0.0, np.maximum(lo - QS, QS - hi))))
+
+
+def stakes(rng, n: int, kind: str) -> np.ndarray:
+    if kind == "lognormal":
+        return rng.lognormal(8, 2, n)
+    if kind == "pareto":
+        return (rng.pareto(1.1, n) + 1) * 100
+    # round amounts: lots of exact ties, like real stakes
+    return np.round(rng.lognormal(8, 2, n), -2) + 100
+
+
+@pytest.mark.parametrize("kind", ["lognormal", "pareto", "rounded"])
+@pytest.mark.parametrize("batch", [N, 1_000, 10])
+def test_streamed_rank_error(kind, batch):
+    worst = 0.0
+    for seed in SEEDS:
+        x = stakes(np.random.default_rng(seed), N, kind)
+        sketch = KLLSketch(seed=seed)
+        for start in range(0, N, batch):
+            sketch.update(x[start:start + batch])
+        assert sketch.n == N
+        worst = max(worst, rank_error(np.sort(x), sketch.quantile(QS)))
+    assert worst <= RANK_ERROR, f"rank error {worst:.4f} exceeds {RANK_ERROR:.4f}"
+
+
+@pytest.mark.parametrize("days", [7, 30, 365])
+def test_merged_rank_error(days):
+    worst = 0.0
+    for seed in SEEDS:
+        rng = np.random.default_rng(seed)
+        x = stakes(rng, N, "lognormal")
+        merged = KLLSketch(seed=seed)
+        for d, part in enumerate(np.array_split(x, days)):
+            merged.merge(KLLSketch(seed=seed * 1000 + d).update(part))
+        assert merged.n == N
+        worst = max(worst, rank_error(np.sort(x), merged.quantile(QS)))
+    assert worst <= RANK_ERROR, f"rank error {worst:.4f} exceeds {RANK_ERROR:.4f}"
+
+
+def test_small_inputs_are_exact():
+    x = np.random.default_rng(0).lognormal(8, 2, 150)  # fits in the first level: nothing compacted
+    sketch = KLLSketch().update(x)
+    assert np.array_equal(sketch.quantile((np.arange(150) + 0.5) / 150), np.sort(x))
+    assert sketch.rank(np.sort(x)[74]) == 75 / 150
+
+
+def test_extremes_nan_and_empty():
+    x = np.random.default_rng(1).pareto(1.1, 100_000)
+    sketch = KLLSketch().update(np.append(x, np.nan))
+    assert sketch.n == len(x)
+    assert sketch.quantile(0.0) == x.min() and sketch.quantile(1.0) == x.max()
+    empty = KLLSketch()
+    assert np.isnan(empty.quantile(0.5)) and np.isnan(empty.rank(1.0))
+    assert all(np.isnan(v) for v in empty.percentiles().values())
+
+
+def test_bytes_round_trip():
+    sketch = KLLSketch().update(np.random.default_rng(2).lognormal(8, 2, 100_000))
+    restored = KLLSketch.from_bytes(sketch.to_bytes())
+    assert np.array_equal(restored.quantile(QS), sketch.quantile(QS))
+    assert (restored.n, restored.min, restored.max, restored.k) == (sketch.n, sketch.min, sketch.max, sketch.k)
+
+
+def test_merge_rejects_other_k():
+    with pytest.raises(ValueError):
+        KLLSketch(k=200).merge(KLLSketch(k=100).update([1.0]))
+
+
+def test_daily_files(tmp_path):
+    stakes_today = np.concatenate([np.zeros(10), np.random.default_rng(3).lognormal(8, 2, 5_000)])
+    sketch = stake_sketch(stakes_today)
+    assert sketch.n == 5_000  # zero stakes are not active wallets
+    assert list(sketch.percentiles()) == PERCENTILE_COLUMNS
+    for date in ("2026-10-02", "2026-10-01"):
+        write_sketch(tmp_path, date, sketch)
+    assert sketch_dates(tmp_path) == ["2026-10-01", "2026-10-02"]
+    assert np.array_equal(read_sketch(tmp_path, "2026-10-02").quantile(QS), sketch.quantile(QS))
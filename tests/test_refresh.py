@@ -0,0 +1,55 @@
+# tests/test_refresh.py
+# BackgroundRefresher: stale values served while one reload runs, failed
+# reloads keep the last good value and are logged, versions move only on change.
+import logging
+import threading
+import time
+
+from kong.refresh import BackgroundRefresher
+
+
+def wait_idle(refresher: BackgroundRefresher) -> None:
+    for thread in threading.enumerate():
+        if thread.name == "kong-refresh":
+            thread.join(5)
+
+
+def test_failed_reload_keeps_value_and_is_logged(caplog):
+    results = iter([{"v": 1}, RuntimeError("upstream down"), {"v": 2}])
+
+    def load(previous):
+        result = next(results)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    refresher = BackgroundRefresher(load, ttl=0.05)
+    assert refresher.get() == {"v": 1}
+    time.sleep(0.06)
+    with caplog.at_level(logging.WARNING, logger="kong.refresh"):
+        assert refresher.get() == {"v": 1}  # stale value now, reload in the background
+        wait_idle(refresher)
+    assert isinstance(refresher.last_error, RuntimeError)
+    assert "background reload failed" in caplog.text and "upstream down" in caplog.text
+
+    assert refresher.get() == {"v": 1}  # still stale: retried
+    wait_idle(refresher)
+    value, _, version = refresher.snapshot()
+    assert value == {"v": 2} and version == 2 and refresher.last_error is None
+
+
+def test_unchanged_reload_keeps_version():
+    calls = []
+
+    def load(previous):
+        calls.append(previous)
+        return previous if previous is not None else {"v": 1}
+
+    refresher = BackgroundRefresher(load, ttl=0.05)
+    first = refresher.snapshot()
+    time.sleep(0.06)
+    refresher.get()
+    wait_idle(refresher)
+    value, loaded_at, version = refresher.snapshot()
+    assert value is first[0] and version == 1 and loaded_at > first[1]
+    assert calls[1] is first[0]
@@ -0,0 +1,76 @@
+# tests/test_table.py
+# WalletTable search / tier filter / sort / paging against the same query
+# done with pandas on the full frame.
+import numpy as np
+import pandas as pd
+import pytest
+
+from kong.table import WalletTable, address_prefix_range
+from kong.tiers import N_TIERS, classify_tiers
+from kong.wallets import pack_addresses
+
+
+@pytest.fixture(scope="module")
+def frame() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    n = 5_000
+    stakes = rng.lognormal(8.5, 2.0, n).round(-1)  # rounded: plenty of ties
+    stakes[rng.random(n) < 0.1] = 0.0
+    users = ["0x" + bytes(row).hex() for row in rng.integers(0, 256, (n, 20), dtype=np.uint8)]
+    return pd.DataFrame({"user": users, "stakedAmount": stakes, "tier": classify_tiers(stakes)})
+
+
+@pytest.fixture(scope="module")
+def table(frame) -> WalletTable:
+    return WalletTable.from_frame(frame, pack_addresses(frame["user"]))
+
+
+def reference(frame, prefix, tiers, sort, descending) -> pd.DataFrame:
+    rows = frame[frame["tier"].isin(list(tiers))]
+    digits = prefix.strip().lower().removeprefix("0x")
+    if digits:
+        rows = rows[rows["user"].str[2:].str.startswith(digits)]
+    if sort == "stake":
+        return rows.sort_values("stakedAmount", ascending=not descending)
+    return rows.sort_values(["tier", "stakedAmount"], ascending=[not descending, False])
+
+
+TIER_SETS = [range(N_TIERS), [0], [4], [1, 3], [2, 3, 4], []]
+PREFIXES = ["", "0x", "0x0", "a", "0X1A", "3f", "0xfff", "zz", "0x" + "0" * 41]
+
+
+@pytest.mark.parametrize("sort", ["stake", "tier"])
+@pytest.mark.parametrize("descending", [True, False])
+@pytest.mark.parametrize("tiers", TIER_SETS)
+@pytest.mark.parametrize("prefix", PREFIXES)
+def test_pages_match_pandas(frame, table, prefix, tiers, sort, descending):
+    expected = reference(frame, prefix, tiers, sort, descending)
+    assert table.count(prefix, tiers) == len(expected)
+    page_size = 37
+    pages = []
+    for page in range(len(expected) // page_size + 2):  # one page past the end
+        rows, total = table.query(prefix, tiers, sort, descending, page, page_size)
+        assert total == len(expected) and len(rows) <= page_size
+        pages.append(rows)
+    rows = np.concatenate(pages)
+    # ties make the row order ambiguous: compare what is sorted on, and the row set
+    assert sorted(rows.tolist()) == sorted(expected.index.tolist())
+    got = frame.iloc[rows]
+    assert got["stakedAmount"].tolist() == expected["stakedAmount"].tolist()
+    assert got["tier"].tolist() == expected["tier"].tolist()
+
+
+def test_page_cut_equals_full_listing(table):
+    full, total = table.query(page_size=len(table))
+    assert total == len(table)
+    for page, size in [(0, 1), (3, 50), (99, 50), (1000, 50), (7, 613)]:
+        rows, _ = table.query(page=page, page_size=size)
+        assert np.array_equal(rows, full[page * size:(page + 1) * size])
+
+
+def test_bad_sort_and_prefix_range(table):
+    with pytest.raises(ValueError):
+        table.query(sort="user")
+    assert address_prefix_range("0xAB") == (bytes.fromhex("ab" + "0" * 38), bytes.fromhex("ab" + "f" * 38))
+    assert address_prefix_range("0xg") is None
+    assert address_prefix_range("") == (bytes(20), b"\xff" * 20)
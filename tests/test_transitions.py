@@ -0,0 +1,80 @@
+# tests/test_transitions.py
+# Daily 6x6 tier transition matrices and their stored running totals: any
+# range equals the sum of its daily matrices, and same-day re-runs replace.
+import numpy as np
+import pandas as pd
+import pytest
+
+from kong.tiers import classify_tier
+from kong.transitions import N_STATES, UNSTAKED, TransitionHistory, tier_states, transition_matrix
+
+
+def state(x: float) -> int:
+    return UNSTAKED if not x > 0 else classify_tier(x)  # NaN (not listed) and 0 are unstaked
+
+
+def daily_states(n_days: int, seed: int = 0, n: int = 2_000) -> list[np.ndarray]:
+    rng = np.random.default_rng(seed)
+    days = [rng.lognormal(10, 2, n)]
+    for _ in range(n_days - 1):
+        s = np.concatenate([days[-1] * rng.lognormal(0, 0.7, len(days[-1])), rng.lognormal(10, 2, 50)])
+        s[rng.random(len(s)) < 0.03] = 0.0
+        s[rng.random(len(s)) < 0.03] = np.nan
+        days.append(s)
+    return days
+
+
+def test_matrix_counts_each_wallet_once():
+    before, after = daily_states(2)
+    m = transition_matrix(before, after)
+    assert m.shape == (N_STATES, N_STATES)
+    b = np.r_[before, np.full(len(after) - len(before), np.nan)]
+    expected = np.zeros((N_STATES, N_STATES), dtype=np.int64)
+    for x, y in zip(b, after):
+        if not (np.isnan(x) and np.isnan(y)):  # listed on at least one of the two days
+            expected[state(x), state(y)] += 1
+    assert np.array_equal(m, expected)
+    assert np.array_equal(tier_states(np.array([np.nan, 0.0, 1.0, 3e5])), [UNSTAKED, UNSTAKED, 0, 4])
+
+
+@pytest.fixture
+def history(tmp_path):
+    days = daily_states(40)
+    dates = pd.date_range("2026-08-01", periods=len(days) - 1, freq="D")
+    matrices = [transition_matrix(a, b) for a, b in zip(days[:-1], days[1:])]
+    store = TransitionHistory(tmp_path / "transitions")
+    for date, m in zip(dates, matrices):
+        assert store.add(date, m) == "append"
+    return store, dates, matrices
+
+
+def test_any_range_is_the_sum_of_its_days(history):
+    store, dates, matrices = history
+    assert np.array_equal(store.dates(), dates.to_numpy(dtype="datetime64[s]"))
+    rng = np.random.default_rng(1)
+    ranges = [(0, len(dates) - 1), (0, 0), (len(dates) - 1, len(dates) - 1)]
+    ranges += [tuple(sorted(rng.integers(0, len(dates), 2))) for _ in range(30)]
+    for i, j in ranges:
+        assert np.array_equal(store.total(dates[i], dates[j]), np.sum(matrices[i:j + 1], axis=0)), (i, j)
+    assert np.array_equal(store.total(), np.sum(matrices, axis=0))
+    assert np.array_equal(store.total(end=dates[4]), np.sum(matrices[:5], axis=0))
+    assert np.array_equal(store.total(start=dates[-1] + pd.Timedelta(days=1)), np.zeros((N_STATES, N_STATES)))
+
+
+def test_same_day_rerun_is_idempotent(history):
+    store, dates, matrices = history
+    assert store.add(dates[-1], matrices[-1]) == "replace"
+    assert store.add(dates[-1], matrices[-1]) == "replace"
+    assert len(store.dates()) == len(dates)
+    assert np.array_equal(store.total(), np.sum(matrices, axis=0))
+
+    changed = matrices[-1] * 2  # a re-run that saw different data replaces, never adds up
+    store.add(dates[-1], changed)
+    assert np.array_equal(store.total(), np.sum(matrices[:-1], axis=0) + changed)
+    assert np.array_equal(store.total(dates[-1], dates[-1]), changed)
+
+
+def test_empty_history(tmp_path):
+    store = TransitionHistory(tmp_path / "missing")
+    assert len(store.dates()) == 0
+    assert np.array_equal(store.total(), np.zeros((N_STATES, N_STATES)))
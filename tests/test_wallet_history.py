@@ -0,0 +1,88 @@
+# tests/test_wallet_history.py
+# WalletHistory round trip: N days of a churning leaderboard written as
+# keyframes + deltas, every day read back equal to what was written.
+import numpy as np
+import pandas as pd
+import pytest
+
+from kong.wallet_history import WalletHistory
+
+KEYFRAME_EVERY = 5
+
+
+def address(i: int) -> str:
+    return f"0x{i * 7919 + 12345:040x}"
+
+
+def churning_days(n_days: int, seed: int = 0):
+    """(date, users, stakes) per day: stakes move, wallets leave / join / go to 0 and come back."""
+    rng = np.random.default_rng(seed)
+    stakes = dict(enumerate(rng.lognormal(8, 2, 500)))
+    next_id = len(stakes)
+    for date in pd.date_range("2026-09-01", periods=n_days, freq="D").strftime("%Y-%m-%d"):
+        ids = np.array(list(stakes))
+        for i in rng.choice(ids, 20, replace=False):        # leave the leaderboard
+            del stakes[i]
+        for i in rng.choice(list(stakes), 50, replace=False):  # stake more / less / everything
+            stakes[i] = 0.0 if rng.random() < 0.2 else rng.lognormal(8, 2)
+        for _ in range(25):                                  # new wallets
+            stakes[next_id], next_id = rng.lognormal(8, 2), next_id + 1
+        if date.endswith("05"):                              # wallets that left come back
+            stakes.update({int(i): 1.0 for i in ids[:20]})
+        order = rng.permutation(list(stakes))                # upstream order is arbitrary
+        yield date, [address(i) for i in order], np.array([stakes[i] for i in order])
+
+
+def as_table(users, stakes) -> pd.DataFrame:
+    return pd.DataFrame({"user": users, "stakedAmount": stakes}).sort_values("user").reset_index(drop=True)
+
+
+@pytest.fixture
+def written(tmp_path):
+    history = WalletHistory(tmp_path, keyframe_every=KEYFRAME_EVERY)
+    days = list(churning_days(17))
+    kinds = [history.write(date, users, stakes) for date, users, stakes in days]
+    return history, days, kinds
+
+
+def test_every_day_round_trips(written):
+    history, days, kinds = written
+    assert kinds == (["full"] + ["delta"] * (KEYFRAME_EVERY - 1)) * 3 + ["full", "delta"]
+    assert history.dates() == [date for date, _, _ in days]
+    for date, users, stakes in reversed(days):  # any order: each day rebuilds from its keyframe
+        got = history.load(date)
+        pd.testing.assert_frame_equal(as_table(got["user"], got["stakedAmount"]), as_table(users, stakes))
+
+
+def test_deltas_hold_only_changes(written):
+    history, days, kinds = written
+    manifest = history._manifest()
+    for day, (_, users, _), kind in zip(manifest["days"], days, kinds):
+        assert day["kind"] == kind
+        if kind == "full":
+            assert day["rows"] == len(users)
+        else:
+            assert day["rows"] < len(users) / 2
+
+
+def test_state_is_dense_by_wallet_id(written):
+    history, days, _ = written
+    date, users, stakes = days[7]
+    state = history.state(date)
+    ids = history.dictionary().encode(np.array(users, dtype=object))
+    assert np.array_equal(state[ids], stakes)
+    assert np.isnan(np.delete(state, ids)).all()  # everyone else: not listed that day
+
+
+def test_rerun_replaces_the_last_day(written):
+    history, days, _ = written
+    date, users, stakes = days[-1]
+    history.write(date, users[:-10], stakes[:-10] * 2)
+    assert history.dates()[-1] == date and len(history.dates()) == len(days)
+    got = history.load(date)
+    pd.testing.assert_frame_equal(as_table(got["user"], got["stakedAmount"]), as_table(users[:-10], stakes[:-10] * 2))
+    prev_date, prev_users, prev_stakes = days[-2]
+    got = history.load(prev_date)
+    pd.testing.assert_frame_equal(as_table(got["user"], got["stakedAmount"]), as_table(prev_users, prev_stakes))
+    with pytest.raises(ValueError):
+        history.write(days[0][0], users, stakes)  # older than the last stored day